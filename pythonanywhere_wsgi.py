@@ -6,6 +6,7 @@ For more information on this file, see:
 https://help.pythonanywhere.com/pages/Flask/
 """
 
+import importlib.util
 import os
 import sys
 
@@ -26,7 +27,16 @@ if src_path not in sys.path:
 os.environ["DASH_LITE_PORT"] = "8000"
 os.environ["DASH_LITE_DEBUG"] = "false"
 
-application = create_app().server
+application = create_app(
+    async_callbacks=os.getenv("DASH_LITE_ASYNC", "false").lower() == "true"
+).server
+
+# ASGI entry point (e.g. `uvicorn pythonanywhere_wsgi:asgi_application`),
+# available with the `async` extra installed
+if importlib.util.find_spec("asgiref") is not None:
+    from dash_lite.asgi import create_asgi_app
+
+    asgi_application = create_asgi_app(application)
 
 # For debugging (remove in production)
 # print(f"Python path: {sys.path}", file=sys.stderr)
@@ -0,0 +1,328 @@
+"""
+Admission control for the callback endpoint.
+
+Every callback request is accepted and queued by default, so a few
+clients sending requests in a tight loop can keep all worker threads busy
+and make everyone else wait longer and longer. :class:`AdmissionControl`
+checks each ``/_dash-update-component`` request before Dash reads it:
+
+- bodies larger than ``max_body_bytes`` get ``413``: declared ones right
+  away, chunked ones once that many bytes were read,
+- each client (address and session cookie) gets a token bucket of
+  ``burst`` requests refilled at ``rate`` per second, and each address
+  one ``per_address`` times larger, so that clients making up cookies
+  share their address's; requests beyond either get ``429`` with a
+  ``Retry-After`` header,
+- at most ``max_in_flight`` callbacks run at once; up to ``max_queue``
+  more wait up to ``queue_timeout`` seconds for a slot, and any others
+  get ``503`` right away.
+
+The checks run in front of Flask, so a refused request costs a few
+microseconds instead of a trip through Flask and Dash, and latency for
+well-behaved clients stays bounded. Counts of admitted and
+shed requests are in :attr:`AdmissionControl.counts` and, with metrics
+enabled, on ``/metrics``.
+
+Buckets and slots live in one process. With ``N`` workers
+(``dashlite --production --workers N``) a client may send up to ``N``
+times its rate, as each worker has its own bucket for it, and ``N``
+times ``max_in_flight`` callbacks run at once: divide the limits by the
+number of workers for server-wide bounds.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING
+
+from dash import Dash
+from werkzeug.http import parse_cookie
+from werkzeug.wsgi import ClosingIterator
+
+from .session import SESSION_COOKIE, install_session_cookie
+
+if TYPE_CHECKING:
+    from _typeshed.wsgi import StartResponse, WSGIEnvironment
+
+# Ways a request can end up, in the order they are checked
+OUTCOMES = ("too_large", "rate_limited", "overloaded", "admitted")
+
+_STATUS = {
+    "too_large": "413 Request Entity Too Large",
+    "rate_limited": "429 Too Many Requests",
+    "overloaded": "503 Service Unavailable",
+}
+
+
+def client_id(environ: WSGIEnvironment) -> str:
+    """
+    Return the id of the client sending a request.
+
+    It is the client address with the session cookie id, or the address
+    alone for requests without one: a new id handed out with the
+    response must not give cookie-less clients a fresh bucket per
+    request. Behind a reverse proxy, set ``REMOTE_ADDR`` to the client's
+    address, e.g. with werkzeug's ``ProxyFix``.
+    """
+    address = f"addr:{environ.get('REMOTE_ADDR')}"
+    session_id = parse_cookie(environ).get(SESSION_COOKIE)
+    return f"{address}/{session_id}" if session_id else address
+
+
+def _read_chunked_body(environ: WSGIEnvironment, limit: int) -> bool:
+    """
+    Buffer a body sent without ``Content-Length`` (chunked).
+
+    Returns:
+        ``False`` if the body is larger than ``limit`` bytes.
+    """
+    stream = environ["wsgi.input"]
+    body = bytearray()
+    while len(body) <= limit:
+        chunk = stream.read(limit + 1 - len(body))
+        if not chunk:
+            break
+        body += chunk
+    if len(body) > limit:
+        return False
+    environ["wsgi.input"] = io.BytesIO(body)
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return True
+
+
+class TokenBucket:
+    """
+    Per-key token buckets.
+
+    Args:
+        rate: Tokens added per second.
+        burst: Bucket capacity, i.e. requests allowed at once after a
+            quiet period.
+        max_keys: Buckets kept; the least recently used are dropped first
+            (a dropped bucket had been refilling and starts full again).
+        clock: Monotonic time source, in seconds.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> (tokens, time of last update)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """
+        Take a token from the bucket of ``key``.
+
+        Returns:
+            ``0.0`` if a token was taken, else the seconds until one is
+            available.
+        """
+        now = self.clock()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionControl:
+    """
+    Limits on the callback requests an app accepts, in one process.
+
+    Args:
+        rate: Callback requests per second allowed per client, or ``None``
+            for no per-client limit.
+        burst: Requests a client may send at once; defaults to twice
+            ``rate``.
+        max_body_bytes: Largest accepted request body.
+        max_in_flight: Callbacks running at once.
+        max_queue: Requests waiting for a running slot; more get ``503``.
+        queue_timeout: Seconds a request waits for a slot before ``503``.
+        client_key: Returns the id of the client sending a request, given
+            its WSGI environment, see :func:`client_id`.
+        per_address: Bucket of each client address, as a multiple of a
+            client's ``rate`` and ``burst``: the clients behind one
+            address (NAT), or the session ids one client makes up,
+            share it. ``None`` for no per-address limit.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = 20.0,
+        burst: int | None = None,
+        max_body_bytes: int = 1024 * 1024,
+        max_in_flight: int = 16,
+        max_queue: int = 64,
+        queue_timeout: float = 1.0,
+        client_key: Callable[[WSGIEnvironment], str] = client_id,
+        per_address: int | None = 10,
+    ) -> None:
+        if max_in_flight < 1 or max_queue < 0:
+            raise ValueError(
+                "max_in_flight must be at least 1 and max_queue at least 0"
+            )
+        self.buckets = self.address_buckets = None
+        if rate is not None:
+            burst = burst or max(1, math.ceil(rate * 2))
+            self.buckets = TokenBucket(rate, burst)
+            if per_address is not None:
+                self.address_buckets = TokenBucket(
+                    rate * per_address, burst * per_address
+                )
+        self.max_body_bytes = max_body_bytes
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.client_key = client_key
+        self.counts = dict.fromkeys(OUTCOMES, 0)
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.counts[outcome] += 1
+
+    @property
+    def shed(self) -> int:
+        """Number of requests refused so far."""
+        return sum(
+            count
+            for outcome, count in self.counts.items()
+            if outcome != "admitted"
+        )
+
+    def acquire(self) -> bool:
+        """Wait for a running slot; ``False`` if none became free."""
+        if self._slots.acquire(blocking=False):
+            return True
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self) -> None:
+        """Free a running slot taken by :meth:`acquire`."""
+        self._slots.release()
+
+    def admit(self, environ: WSGIEnvironment) -> tuple[str, float] | None:
+        """
+        Decide on a request.
+
+        Args:
+            environ: WSGI environment of the request.
+
+        Returns:
+            The outcome of a refused request and the seconds after which
+            to retry, or ``None`` once the request holds a running slot
+            (see :meth:`release`).
+        """
+        length = environ.get("CONTENT_LENGTH")
+        if length and length.isdigit() and int(length) > self.max_body_bytes:
+            return self._refuse("too_large", 0)
+        if self.address_buckets is not None:
+            wait = self.address_buckets.take(str(environ.get("REMOTE_ADDR")))
+            if wait:
+                return self._refuse("rate_limited", wait)
+        if self.buckets is not None:
+            wait = self.buckets.take(self.client_key(environ))
+            if wait:
+                return self._refuse("rate_limited", wait)
+        if (
+            not length
+            and environ.get("wsgi.input_terminated")
+            and not _read_chunked_body(environ, self.max_body_bytes)
+        ):
+            return self._refuse("too_large", 0)
+        if not self.acquire():
+            return self._refuse("overloaded", 1)
+        self._count("admitted")
+        return None
+
+    def _refuse(self, outcome: str, retry_after: float) -> tuple[str, float]:
+        self._count(outcome)
+        return outcome, retry_after
+
+    def render(self) -> str:
+        """Return the counts in Prometheus text exposition format."""
+        name = "dash_lite_admission_requests_total"
+        lines = [
+            f"# HELP {name} Callback requests by admission outcome.",
+            f"# TYPE {name} counter",
+        ]
+        lines.extend(
+            f'{name}{{outcome="{outcome}"}} {count}'
+            for outcome, count in self.counts.items()
+        )
+        return "\n".join(lines) + "\n"
+
+
+def install_admission_control(app: Dash, admission: AdmissionControl) -> None:
+    """
+    Apply ``admission`` to the callback requests of ``app``.
+
+    The check wraps the WSGI application, so a refused request never
+    reaches Flask's routing or Dash's JSON parsing.
+    """
+    server = app.server
+    path = app.config.routes_pathname_prefix + "_dash-update-component"
+    if admission.client_key is client_id:
+        install_session_cookie(server)
+    wsgi_app = server.wsgi_app
+
+    def admitting_app(
+        environ: WSGIEnvironment, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        if environ.get("PATH_INFO") != path or (
+            environ.get("REQUEST_METHOD") != "POST"
+        ):
+            return wsgi_app(environ, start_response)
+        refused = admission.admit(environ)
+        if refused is not None:
+            outcome, retry_after = refused
+            body = outcome.replace("_", " ").encode()
+            headers = [
+                ("Content-Type", "text/plain"),
+                ("Content-Length", str(len(body))),
+            ]
+            if retry_after:
+                headers.append(("Retry-After", str(math.ceil(retry_after))))
+            start_response(_STATUS[outcome], headers)
+            return [body]
+        try:
+            response = wsgi_app(environ, start_response)
+        except BaseException:
+            admission.release()
+            raise
+        return ClosingIterator(response, admission.release)
+
+    server.wsgi_app = admitting_app  # type: ignore[method-assign]
+    server.extensions["dash_lite.admission"] = admission
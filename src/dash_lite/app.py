@@ -1,34 +1,229 @@
+"""
+App factory and ``dashlite`` entry point.
+
+Importing this module (and so ``dash_lite``) is cheap: Dash, Mantine and
+the feature modules are only imported once :func:`create_app` runs, so
+tools that need nothing but the greeting helpers don't pay for them and
+autoscaled workers don't import them twice.
+"""
+
 from __future__ import annotations
 
+import argparse
 import os
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
 
-import dash_mantine_components as dmc
-from dash import Dash, Input, Output, clientside_callback
+if TYPE_CHECKING:
+    from dash import Dash
+    from dash.development.base_component import Component
 
-from .callbacks import register_callbacks
-from .layout import create_layout
+    from .admission import AdmissionControl
+    from .cache import CallbackCache
+    from .datastore import SessionDataStore
+    from .jobs import LocalJobManager
+    from .profiling import RequestProfiler
+    from .push import PushHub
+    from .ringbuffer import RingBuffer
+    from .tenants import Tenant
 
 
-def create_app() -> Dash:
+def create_app(
+    *,
+    title: str = "dash-lite starter (Mantine)",
+    url_prefix: str = "/",
+    layout: Component | None = None,
+    compress_layout: bool = False,
+    greeting_mode: str = "server",
+    name_debounce: int | bool = False,
+    coalesce_requests: bool = False,
+    callback_cache: CallbackCache | None = None,
+    metrics: bool = False,
+    metrics_log: bool = False,
+    compression: bool = False,
+    compression_min_size: int = 1024,
+    async_callbacks: bool = False,
+    job_manager: LocalJobManager | None = None,
+    pages: bool = False,
+    greeting_export: bool = False,
+    local_icons: bool = False,
+    prerender: bool = False,
+    admission: AdmissionControl | None = None,
+    profiler: RequestProfiler | None = None,
+    push: PushHub | None = None,
+    data_store: SessionDataStore | None = None,
+    live_feed: RingBuffer | None = None,
+    live_secret: str | None = None,
+) -> Dash:
     """
     Create and configure a minimal Dash app with Dash Mantine Components.
 
     This version uses DMC for a modern, beautiful UI without custom CSS.
+
+    Args:
+        title: Title of the browser tab.
+        url_prefix: URL prefix under which a WSGI dispatcher mounts the
+            app (e.g. ``"/acme/"``); its routes stay at ``/``. See
+            ``dash_lite.tenants``.
+        layout: Prebuilt layout to serve instead of building one, e.g.
+            shared between apps. Not used with ``pages``.
+        compress_layout: Also keep a gzip copy of the cached layout.
+        greeting_mode: Run the greeting callback on the ``"server"`` or
+            in the browser (``"client"``).
+        name_debounce: Debounce of the name input, see ``create_layout``.
+        coalesce_requests: Drop greeting requests superseded by a newer one
+            from the same browser session. The coalescer is available as
+            ``app.server.extensions["dash_lite.coalescer"]``.
+        callback_cache: Result cache applied to the pure callbacks. It is
+            available as ``app.server.extensions["dash_lite.callback_cache"]``.
+        metrics: Time every callback and serve latency and payload-size
+            histograms in Prometheus format at ``/metrics``.
+        metrics_log: Time every callback and log one JSON line per call.
+        compression: Compress responses (brotli if installed, else gzip),
+            serve component bundles precompressed from memory and cache
+            fingerprinted files for a year.
+        compression_min_size: Responses smaller than this many bytes are
+            not compressed.
+        async_callbacks: Allow ``async def`` callbacks, for callbacks that
+            wait on other services. Needs the ``async`` extra; serve the
+            app through :func:`dash_lite.asgi.create_asgi_app` so that
+            they run concurrently.
+        job_manager: Manager for long-running (``background=True``)
+            callbacks; it becomes the app's default manager and enables
+            the background job demo.
+        pages: Route the navbar links to separate pages, each rendered
+            on first request (see ``dash_lite.routing``).
+        greeting_export: Serve the streaming bulk greeting export at
+            ``/api/greetings`` (see ``dash_lite.export``).
+        local_icons: Serve the icons of the layout from the bundled icon
+            set in one immutable script, instead of letting the browser
+            fetch them from the Iconify API (see ``dash_lite.icons``).
+        prerender: Embed a static HTML rendering of the app shell in the
+            index page, shown until the app has loaded (see
+            ``dash_lite.prerender``).
+        admission: Limits on callback requests (per-client rate, body
+            size, callbacks in flight); requests beyond them are refused
+            fast. It is available as
+            ``app.server.extensions["dash_lite.admission"]``.
+        profiler: Sampling profiler for callback and layout requests,
+            idle until triggered by a signed header or its endpoint (see
+            ``dash_lite.profiling``).
+        push: Hub publishing server-initiated prop updates to the pages,
+            over a stream served by the ASGI entry point (see
+            ``dash_lite.push``). It is available as
+            ``app.server.extensions["dash_lite.push"]``.
+        data_store: Per-session server-side store, where callbacks keep
+            datasets and exchange their handles instead (see
+            ``dash_lite.datastore``). Callbacks find it with
+            ``get_data_store()``.
+        live_feed: Ring buffer of samples shown by a live chart on the
+            Dashboard, which receives only the samples added since its
+            last update (see ``dash_lite.live``).
+        live_secret: Bearer token for posting samples to ``live_feed`` at
+            ``/api/live``; the endpoint is only served with one.
+
+    Raises:
+        ValueError: A ``layout`` is given together with ``pages``, or a
+            callback uses a component id missing from the layout or
+            writes a prop another callback writes (see
+            ``dash_lite.dependencies``).
     """
+    if layout is not None and pages:
+        raise ValueError("pages build their own layout")
+
+    # Deferred so that importing dash_lite stays cheap
+    import dash_mantine_components as dmc
+    from dash import Dash, Input, Output
+
+    from .admission import install_admission_control
+    from .callbacks import register_callbacks
+    from .coalesce import RequestCoalescer
+    from .compression import install_compression
+    from .datastore import install_data_store
+    from .dependencies import install_dependency_cache, validate_dependencies
+    from .export import install_greeting_export
+    from .icons import install_icons
+    from .layout import create_layout
+    from .layout_cache import install_layout_cache
+    from .live import install_live_feed
+    from .metrics import CallbackMetrics, install_metrics_endpoint
+    from .prerender import install_prerender
+    from .profiling import install_profiler
+    from .push import install_push
+    from .routing import install_page_router
+    from .session import install_session_cookie
+
     app = Dash(
         __name__,
-        title="dash-lite starter (Mantine)",
-        suppress_callback_exceptions=False,
+        title=title,
+        requests_pathname_prefix=url_prefix,
+        routes_pathname_prefix="/",
+        # Page components are missing from the initial layout
+        suppress_callback_exceptions=pages,
+        # Explicit: Dash turns async on whenever asgiref is importable
+        use_async=async_callbacks,
+        background_callback_manager=job_manager,
     )
 
-    app.layout = dmc.MantineProvider(
-        create_layout(),
-        defaultColorScheme="dark",
+    if not pages:
+        app.layout = (
+            layout
+            if layout is not None
+            else dmc.MantineProvider(
+                create_layout(
+                    name_debounce=name_debounce,
+                    background_jobs=job_manager is not None,
+                    live_metrics=live_feed is not None,
+                ),
+                defaultColorScheme="dark",
+            )
+        )
+
+    coalescer = None
+    if coalesce_requests:
+        install_session_cookie(app.server)
+        coalescer = RequestCoalescer()
+        app.server.extensions["dash_lite.coalescer"] = coalescer
+
+    # Requests refused by admission control are not profiled
+    if profiler is not None:
+        install_profiler(app, profiler)
+    if admission is not None:
+        install_admission_control(app, admission)
+
+    if callback_cache is not None:
+        app.server.extensions["dash_lite.callback_cache"] = callback_cache
+    if data_store is not None:
+        install_data_store(app, data_store)
+
+    # Only wrap callbacks when asked to: disabled costs nothing per call
+    if metrics or metrics_log:
+        callback_metrics = CallbackMetrics(log=metrics_log)
+        callback_metrics.instrument(app)
+        app.server.extensions["dash_lite.metrics"] = callback_metrics
+        if metrics:
+            install_metrics_endpoint(
+                app,
+                callback_metrics,
+                *(
+                    collector
+                    for collector in (admission, push)
+                    if collector is not None
+                ),
+            )
+
+    register_callbacks(
+        app,
+        greeting_mode=greeting_mode,
+        coalescer=coalescer,
+        cache=callback_cache,
+        job_manager=job_manager,
+        live_feed=live_feed,
     )
-    register_callbacks(app)
 
-    # Theme switch callback
-    clientside_callback(
+    # Theme switch callback, on this app rather than Dash's global list,
+    # which only the first app to start serving picks up
+    app.clientside_callback(
         """
         (switchOn) => {
            document.documentElement.setAttribute('data-mantine-color-scheme', switchOn ? 'dark' : 'light');
@@ -39,15 +234,304 @@ def create_app() -> Dash:
         Input("color-scheme-switch", "checked"),
     )
 
+    if greeting_export:
+        install_greeting_export(app)
+    if live_feed is not None:
+        install_live_feed(app, live_feed, secret=live_secret)
+
+    if pages:
+        # Also serializes each page's layout once, on first request
+        router = install_page_router(
+            app,
+            compress=compress_layout or compression,
+            name_debounce=name_debounce,
+            background_jobs=job_manager is not None,
+            live_metrics=live_feed is not None,
+        )
+        # Page callbacks may use the shell and any page's components
+        validate_dependencies(app, router.complete_layout())
+    else:
+        # The layout is static, so serialize it once instead of per request
+        install_layout_cache(app, compress=compress_layout or compression)
+        validate_dependencies(app)
+    # Every callback is registered by now; later ones trigger a recompile
+    install_dependency_cache(
+        app,
+        compress=compress_layout or compression,
+        min_size=compression_min_size,
+    )
+
+    if local_icons:
+        install_icons(app)
+    if push is not None:
+        install_push(app, push)
+    if prerender:
+        install_prerender(app)
+    if compression:
+        install_compression(app, min_size=compression_min_size)
+
     return app
 
 
-def main() -> None:
+def _env_flag(name: str, default: bool) -> bool:
+    """Read a ``true``/``false`` environment variable."""
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+def _debounce_from_env() -> int | bool:
+    """Read ``DASH_LITE_NAME_DEBOUNCE``: ``blur``, milliseconds or off."""
+    value = os.getenv("DASH_LITE_NAME_DEBOUNCE", "").strip().lower()
+    if value in ("blur", "true"):
+        return True
+    if value.isdigit():
+        return int(value)
+    return False
+
+
+def _cache_from_env() -> CallbackCache | None:
+    """
+    Build the callback cache described by the environment.
+
+    ``DASH_LITE_CALLBACK_CACHE`` is ``memory`` for an in-process cache or a
+    SQLite file path to also share results between workers.
+    ``DASH_LITE_CACHE_SIZE`` and ``DASH_LITE_CACHE_TTL`` (seconds) bound it.
+    """
+    target = os.getenv("DASH_LITE_CALLBACK_CACHE", "").strip()
+    if not target:
+        return None
+
+    from .cache import CallbackCache, LRUCache, SQLiteCache
+
+    ttl = os.getenv("DASH_LITE_CACHE_TTL")
+    ttl_seconds = float(ttl) if ttl else None
+    local = LRUCache(
+        maxsize=int(os.getenv("DASH_LITE_CACHE_SIZE", "1024")),
+        ttl=ttl_seconds,
+    )
+    shared = None if target == "memory" else SQLiteCache(target, ttl_seconds)
+    return CallbackCache(local=local, shared=shared)
+
+
+def _jobs_from_env() -> LocalJobManager | None:
+    """
+    Build the background job manager described by the environment.
+
+    ``DASH_LITE_JOBS`` is ``local`` for the default SQLite file in the temp
+    directory, or the path of the file. ``DASH_LITE_JOB_WORKERS`` sets the
+    size of the process pool.
+    """
+    target = os.getenv("DASH_LITE_JOBS", "").strip()
+    if not target:
+        return None
+
+    from .jobs import DEFAULT_PATH, LocalJobManager
+
+    workers = os.getenv("DASH_LITE_JOB_WORKERS")
+    return LocalJobManager(
+        path=DEFAULT_PATH if target == "local" else target,
+        workers=int(workers) if workers else None,
+    )
+
+
+def _admission_from_env() -> AdmissionControl | None:
+    """
+    Build the admission control described by the environment.
+
+    It is enabled by ``DASH_LITE_RATE_LIMIT``, the callback requests per
+    second allowed per client (``0`` for no per-client limit), and tuned
+    by ``DASH_LITE_RATE_BURST``, ``DASH_LITE_MAX_BODY`` (bytes),
+    ``DASH_LITE_MAX_IN_FLIGHT`` and ``DASH_LITE_MAX_QUEUE``.
+    """
+    rate = os.getenv("DASH_LITE_RATE_LIMIT", "").strip()
+    if not rate:
+        return None
+
+    from .admission import AdmissionControl
+
+    options = {
+        name: int(value)
+        for name, variable in (
+            ("burst", "DASH_LITE_RATE_BURST"),
+            ("max_body_bytes", "DASH_LITE_MAX_BODY"),
+            ("max_in_flight", "DASH_LITE_MAX_IN_FLIGHT"),
+            ("max_queue", "DASH_LITE_MAX_QUEUE"),
+        )
+        if (value := os.getenv(variable))
+    }
+    return AdmissionControl(rate=float(rate) or None, **options)
+
+
+def _profiler_from_env() -> RequestProfiler | None:
+    """
+    Build the request profiler described by the environment.
+
+    ``DASH_LITE_PROFILE_SECRET`` enables it; profiles are written to
+    ``DASH_LITE_PROFILE_DIR`` (default: ``dash-lite-profiles`` in the temp
+    directory).
+    """
+    secret = os.getenv("DASH_LITE_PROFILE_SECRET", "")
+    if not secret:
+        return None
+
+    from .profiling import DEFAULT_DIRECTORY, RequestProfiler
+
+    return RequestProfiler(
+        secret, os.getenv("DASH_LITE_PROFILE_DIR") or DEFAULT_DIRECTORY
+    )
+
+
+def _data_store_from_env() -> SessionDataStore | None:
+    """
+    Build the session data store described by the environment.
+
+    ``DASH_LITE_DATA_STORE`` is ``memory`` to drop evicted entries, or
+    the directory to spill them to. ``DASH_LITE_DATA_STORE_MB`` bounds
+    its memory.
+    """
+    target = os.getenv("DASH_LITE_DATA_STORE", "").strip()
+    if not target:
+        return None
+
+    from .datastore import SessionDataStore
+
+    megabytes = os.getenv("DASH_LITE_DATA_STORE_MB")
+    return SessionDataStore(
+        max_bytes=int(float(megabytes) * 2**20) if megabytes else 256 * 2**20,
+        spill_dir=None if target == "memory" else target,
+    )
+
+
+def _live_feed_from_env() -> RingBuffer | None:
+    """
+    Open the live metrics feed described by the environment.
+
+    ``DASH_LITE_LIVE_FEED`` is the path of the ring buffer file, shared
+    by all workers; ``DASH_LITE_LIVE_CAPACITY`` is the number of samples
+    it keeps.
+    """
+    path = os.getenv("DASH_LITE_LIVE_FEED", "").strip()
+    if not path:
+        return None
+
+    from .ringbuffer import RingBuffer
+
+    capacity = os.getenv("DASH_LITE_LIVE_CAPACITY")
+    return RingBuffer(path, capacity=int(capacity) if capacity else 86_400)
+
+
+def _tenants_from_env(options: dict[str, Any]) -> list[Tenant]:
+    """
+    Read ``DASH_LITE_TENANTS``: comma-separated ``name=Title`` entries.
+
+    A tenant without a title is titled after its name. Every tenant gets
+    the same ``create_app`` options.
+    """
+    entries = os.getenv("DASH_LITE_TENANTS", "").strip()
+    if not entries:
+        return []
+
+    from .tenants import Tenant
+
+    tenants = []
+    for entry in entries.split(","):
+        name, _, title = entry.strip().partition("=")
+        if name:
+            tenants.append(Tenant(name, title.strip() or name, options))
+    return tenants
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    """Parse the command line options of the ``dashlite`` entry point."""
+    parser = argparse.ArgumentParser(prog="dashlite")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="serve with a multi-worker WSGI server instead of Flask's",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="worker processes (production only)"
+    )
+    parser.add_argument(
+        "--threads", type=int, help="threads per worker (production only)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
     """Entry point for the Mantine version."""
-    app = create_app()
+    args = _parse_args(argv)
+    production = (
+        args.production
+        or os.getenv("DASH_LITE_MODE", "development").lower() == "production"
+    )
 
     port = int(os.getenv("DASH_LITE_PORT", "8052"))
-    debug = os.getenv("DASH_LITE_DEBUG", "true").lower() == "true"
+    debug = _env_flag("DASH_LITE_DEBUG", default=not production)
+
+    options = {
+        "greeting_mode": os.getenv("DASH_LITE_GREETING_MODE", "server"),
+        "name_debounce": _debounce_from_env(),
+        "coalesce_requests": _env_flag("DASH_LITE_COALESCE", default=False),
+        "callback_cache": _cache_from_env(),
+        "metrics": _env_flag("DASH_LITE_METRICS", default=False),
+        "metrics_log": _env_flag("DASH_LITE_METRICS_LOG", default=False),
+        "compression": _env_flag("DASH_LITE_COMPRESSION", default=False),
+        "async_callbacks": _env_flag("DASH_LITE_ASYNC", default=False),
+        "job_manager": _jobs_from_env(),
+        "pages": _env_flag("DASH_LITE_PAGES", default=False),
+        "greeting_export": _env_flag("DASH_LITE_EXPORT", default=False),
+        "local_icons": _env_flag("DASH_LITE_LOCAL_ICONS", default=False),
+        "prerender": _env_flag("DASH_LITE_PRERENDER", default=False),
+        "admission": _admission_from_env(),
+        "profiler": _profiler_from_env(),
+        "data_store": _data_store_from_env(),
+        "live_feed": _live_feed_from_env(),
+        "live_secret": os.getenv("DASH_LITE_LIVE_SECRET") or None,
+    }
+
+    tenants = _tenants_from_env(options)
+    if tenants:
+        from .tenants import TenantDispatcher
+
+        # One app per tenant, all sharing the process and its bundles
+        dispatcher = TenantDispatcher(
+            tenants, compression=options["compression"]
+        )
+        if production:
+            from .server import build_options, run_production
+
+            run_production(
+                dispatcher,
+                build_options(
+                    "0.0.0.0", port, workers=args.workers, threads=args.threads
+                ),
+            )
+            return
+
+        from werkzeug.serving import run_simple
+
+        run_simple(
+            "0.0.0.0",
+            port,
+            dispatcher,
+            use_reloader=debug,
+            use_debugger=debug,
+            threaded=True,
+        )
+        return
+
+    app = create_app(**options)
+
+    if production:
+        from .server import build_options, run_production
+
+        if debug:
+            app.enable_dev_tools(debug=True)
+        options = build_options(
+            "0.0.0.0", port, workers=args.workers, threads=args.threads
+        )
+        run_production(app.server, options)
+        return
 
     app.run(host="0.0.0.0", port=port, debug=debug)
 
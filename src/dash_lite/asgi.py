@@ -0,0 +1,89 @@
+"""
+ASGI entry point for the Flask server of a Dash app.
+
+Dash runs on Flask, a WSGI framework. asgiref's ``WsgiToAsgi`` adapts it
+to ASGI servers such as uvicorn, but runs every request on one shared
+thread, so a single slow callback holds up all the others.
+:func:`create_asgi_app` runs each request on a thread of its own pool
+instead. ``async def`` callbacks (``create_app(async_callbacks=True)``)
+are then awaited on the ASGI server's event loop, so callbacks waiting on
+slow services overlap instead of queueing.
+
+The push stream of an app created with ``push=`` (see
+:mod:`dash_lite.push`) is served on the event loop itself, so idle
+connections hold no thread.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+DEFAULT_MAX_THREADS = 64
+
+
+def create_asgi_app(
+    wsgi_application: Any, max_threads: int = DEFAULT_MAX_THREADS
+) -> Any:
+    """
+    Wrap a WSGI application as an ASGI application.
+
+    Args:
+        wsgi_application: The WSGI callable, typically
+            ``create_app().server``.
+        max_threads: Requests handled at once. Threads serving ``async``
+            callbacks only wait for the event loop, so this can be well
+            above the number of cores.
+
+    Returns:
+        The ASGI application.
+
+    Raises:
+        RuntimeError: If asgiref is not installed.
+        ValueError: If ``max_threads`` is below 1.
+    """
+    try:
+        from asgiref.sync import sync_to_async
+        from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+    except ImportError as exc:
+        raise RuntimeError(
+            "The ASGI entry point requires asgiref. Install it with "
+            "`pip install dash-lite[async]`."
+        ) from exc
+    if max_threads < 1:
+        raise ValueError("max_threads must be at least 1")
+
+    hub = getattr(wsgi_application, "extensions", {}).get("dash_lite.push")
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_threads, thread_name_prefix="dash-lite-asgi"
+    )
+
+    class _PooledInstance(WsgiToAsgiInstance):
+        """One request, run on the pool rather than the shared thread."""
+
+        async def run_wsgi_app(self, body: Any) -> None:
+            # The parent's is sync_to_async(thread_sensitive=True). This
+            # and ``duplicate_header_limit`` are asgiref internals, so the
+            # ``async`` extra pins asgiref to the versions checked.
+            run = vars(WsgiToAsgiInstance)["run_wsgi_app"].func
+            await sync_to_async(
+                run, thread_sensitive=False, executor=executor
+            )(self, body)
+
+    class _Application(WsgiToAsgi):
+        """``WsgiToAsgi`` running requests on a thread pool."""
+
+        async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+            if (
+                hub is not None
+                and scope["type"] == "http"
+                and scope["path"] == hub.path
+            ):
+                await hub.serve(scope, receive, send)
+                return
+            await _PooledInstance(
+                self.wsgi_application, self.duplicate_header_limit
+            )(scope, receive, send)
+
+    return _Application(wsgi_application)
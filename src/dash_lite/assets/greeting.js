@@ -0,0 +1,55 @@
+/*
+ * Clientside twin of dash_lite.greeting.build_greeting / update_greeting.
+ *
+ * Used when the app runs with greeting_mode="client", so typing into
+ * `name-input` no longer costs a server round trip. Keep this file in
+ * lockstep with the Python implementation: both are checked against
+ * tests/greeting_cases.json.
+ */
+(function (root) {
+    "use strict";
+
+    function build_greeting(style, name) {
+        name = (name || "").trim() || "Friend";
+
+        if (style === "formal") {
+            return "Hello, " + name + ". It's a pleasure to meet you.";
+        }
+        if (style === "short") {
+            return "Hi, " + name + "!";
+        }
+        return "Hey " + name + ", welcome to dash-lite! 👋";
+    }
+
+    function update_greeting(style, name) {
+        var context = root.dash_clientside.callback_context;
+        var trigger = (context && context.triggered_id) || "initial-load";
+
+        // Same component the server callback returns (a dmc.Text)
+        return {
+            namespace: "dash_mantine_components",
+            type: "Text",
+            props: {
+                children: build_greeting(style, name || ""),
+                size: "lg",
+                fw: "bold",
+                "data-triggered-by": trigger,
+            },
+        };
+    }
+
+    var greeting = {
+        build_greeting: build_greeting,
+        update_greeting: update_greeting,
+    };
+
+    root.dash_clientside = root.dash_clientside || {};
+    root.dash_clientside.dash_lite = Object.assign(
+        root.dash_clientside.dash_lite || {},
+        greeting
+    );
+
+    if (typeof module !== "undefined" && module.exports) {
+        module.exports = greeting;
+    }
+})(typeof window !== "undefined" ? window : globalThis);
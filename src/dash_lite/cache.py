@@ -0,0 +1,248 @@
+"""
+Result cache for pure callbacks.
+
+A pure callback (like ``update_greeting``) returns the same output for the
+same inputs, so there is no need to run it again for inputs it has already
+seen. :class:`CallbackCache` wraps such a callback and keys its results on
+the input values. Results live in a bounded in-process :class:`LRUCache`
+and, optionally, in a shared :class:`SQLiteCache` file that several worker
+processes can read from.
+
+Callbacks that read ``ctx.triggered_id`` (``update_greeting`` renders it
+into ``data-triggered-by``) produce different outputs for the same inputs
+depending on which input fired, so the trigger is folded into the key by
+default.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Protocol
+
+from dash import ctx
+from dash.exceptions import MissingCallbackContextException
+from plotly.io.json import to_json_plotly
+
+#: Returned by :meth:`CacheBackend.get` for absent or expired keys.
+MISSING = object()
+
+
+class CacheBackend(Protocol):
+    """Storage used by :class:`CallbackCache`."""
+
+    def get(self, key: str) -> Any:
+        """Return the stored value, or :data:`MISSING` when absent/expired."""
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under ``key``."""
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction.
+
+    Args:
+        maxsize: Maximum number of entries kept.
+        ttl: Seconds an entry stays valid, or ``None`` for no expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires = (
+            time.monotonic() + self.ttl
+            if self.ttl is not None
+            else float("inf")
+        )
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCache:
+    """
+    Cache shared between processes through a local SQLite file.
+
+    Values are stored as JSON (components in their ``to_plotly_json``
+    form), which Dash sends to the browser unchanged. Expired rows are
+    deleted on every :meth:`set`, so the file does not keep growing.
+
+    Args:
+        path: Database file; created if missing.
+        ttl: Seconds an entry stays valid, or ``None`` for no expiry.
+    """
+
+    def __init__(self, path: str | Path, ttl: float | None = None) -> None:
+        self.path = str(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS callback_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS callback_cache_expires "
+                "ON callback_cache (expires)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads, nor with
+        # a forked child process
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Any:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT value, expires FROM callback_cache WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        # Wall clock, unlike LRUCache, since other processes share entries
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return MISSING
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires = now + self.ttl if self.ttl is not None else None
+        with self._connect() as conn:
+            # Rows written by any process, with any ttl
+            conn.execute(
+                "DELETE FROM callback_cache WHERE expires < ?", (now,)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO callback_cache VALUES (?, ?, ?)",
+                (key, to_json_plotly(value), expires),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM callback_cache WHERE key = ?", (key,))
+
+
+class CallbackCache:
+    """
+    Cache the results of pure callbacks, keyed on their input values.
+
+    Args:
+        local: In-process cache checked first.
+        shared: Optional cache shared between processes, checked on a
+            local miss. Hits are copied into ``local``.
+        include_trigger: Fold ``ctx.triggered_id`` into the key, for
+            callbacks whose output depends on which input fired.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache | None = None,
+        shared: CacheBackend | None = None,
+        include_trigger: bool = True,
+    ) -> None:
+        self.local = local if local is not None else LRUCache()
+        self.shared = shared
+        self.include_trigger = include_trigger
+        self.hits = 0
+        self.misses = 0
+        self._counter_lock = threading.Lock()
+
+    def stats(self) -> dict[str, int]:
+        """Return the hit/miss counters."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    def make_key(
+        self,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: dict[str, Any] | None = None,
+    ) -> str:
+        """Build the cache key for a call of ``func`` with these inputs."""
+        trigger = None
+        if self.include_trigger:
+            try:
+                trigger = ctx.triggered_id
+            except MissingCallbackContextException:
+                trigger = None
+        raw = to_json_plotly(
+            [
+                func.__module__,
+                func.__qualname__,
+                args,
+                sorted((kwargs or {}).items()),
+                trigger,
+            ]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Return ``func`` with its results cached.
+
+        Only use this for callbacks without side effects whose return value
+        is not mutated afterwards: cached values are handed out as-is.
+        """
+
+        @functools.wraps(func)
+        def cached(*args: Any, **kwargs: Any) -> Any:
+            key = self.make_key(func, args, kwargs)
+
+            value = self.local.get(key)
+            if value is MISSING and self.shared is not None:
+                value = self.shared.get(key)
+                if value is not MISSING:
+                    self.local.set(key, value)
+            if value is not MISSING:
+                with self._counter_lock:
+                    self.hits += 1
+                return value
+
+            with self._counter_lock:
+                self.misses += 1
+            value = func(*args, **kwargs)
+            self.local.set(key, value)
+            if self.shared is not None:
+                self.shared.set(key, value)
+            return value
+
+        return cached
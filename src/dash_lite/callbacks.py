@@ -1,25 +1,172 @@
+from __future__ import annotations
+
+import itertools
+import math
+from collections.abc import Callable
+
 import dash_mantine_components as dmc
-from dash import Dash, Input, Output, State, ctx
+from dash import (
+    ClientsideFunction,
+    Dash,
+    Input,
+    Output,
+    Patch,
+    State,
+    ctx,
+    no_update,
+)
+from dash.exceptions import PreventUpdate
 
+from .cache import CallbackCache
+from .coalesce import RequestCoalescer
+from .greeting import build_greeting as _build_greeting
+from .jobs import LocalJobManager
+from .live import LIVE_POINTS, extend_data, live_figure
+from .ringbuffer import RingBuffer
 
-def _build_greeting(style: str, name: str) -> str:
-    name = name.strip() or "Friend"
+GREETING_MODES = ("server", "client")
 
-    if style == "formal":
-        return f"Hello, {name}. It's a pleasure to meet you."
-    if style == "short":
-        return f"Hi, {name}!"
-    return f"Hey {name}, welcome to dash-lite! 👋"
+# Upper bound of the background job demo's prime count
+REPORT_LIMIT = 20_000_000
 
 
-def register_callbacks(app: Dash) -> None:
-    """Register all application callbacks."""
+def register_callbacks(
+    app: Dash,
+    *,
+    greeting_mode: str = "server",
+    coalescer: RequestCoalescer | None = None,
+    cache: CallbackCache | None = None,
+    job_manager: LocalJobManager | None = None,
+    live_feed: RingBuffer | None = None,
+) -> None:
+    """
+    Register all application callbacks.
 
-    @app.callback(
+    Args:
+        app: The Dash app to register the callbacks on.
+        greeting_mode: ``"server"`` runs ``update_greeting`` in Python,
+            ``"client"`` runs its JavaScript twin in ``assets/greeting.js``
+            in the browser, saving a round trip per keystroke.
+        coalescer: Drops queued ``update_greeting`` requests that a newer
+            request from the same session has superseded.
+        cache: Result cache for the pure server-side callbacks
+            (``update_greeting``).
+        job_manager: Runs the background job demo (``run_report``) off
+            the request thread. Without it the demo is not registered.
+        live_feed: Samples of the live metrics chart, sent to each
+            browser as they arrive. Without it the chart is not
+            registered.
+    """
+    if greeting_mode not in GREETING_MODES:
+        raise ValueError(
+            f"greeting_mode must be one of {GREETING_MODES}, "
+            f"got {greeting_mode!r}"
+        )
+
+    greeting_dependencies = (
         Output("greeting-output", "children"),
         Input("greeting-style", "value"),
         Input("name-input", "value"),
     )
+
+    if greeting_mode == "client":
+        app.clientside_callback(
+            ClientsideFunction("dash_lite", "update_greeting"),
+            *greeting_dependencies,
+        )
+    else:
+        _register_server_greeting(app, greeting_dependencies, coalescer, cache)
+
+    @app.callback(
+        Output("app-shell", "navbar"),
+        Input("burger-button", "opened"),
+        prevent_initial_call=True,
+    )
+    def toggle_navbar(opened: bool) -> Patch:
+        """Show the navbar on mobile while the burger button is open."""
+        # The burger flips ``opened`` itself; only the flag travels back,
+        # not the whole navbar configuration
+        navbar = Patch()
+        navbar["collapsed"]["mobile"] = not opened
+        return navbar
+
+    if job_manager is not None:
+        _register_report_job(app, job_manager)
+    if live_feed is not None:
+        _register_live_chart(app, live_feed)
+
+
+def _count_primes(limit: int, set_progress: Callable[[int], None]) -> int:
+    """Count the primes below ``limit``, reporting progress in percent."""
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+    # Cross out multiples of 2..sqrt(limit) in ten slices
+    root = math.isqrt(limit - 1)
+    bounds = [2 + (root - 1) * step // 10 for step in range(11)]
+    bounds[-1] = root + 1
+    for step, (low, high) in enumerate(itertools.pairwise(bounds), start=1):
+        for number in range(low, high):
+            if sieve[number]:
+                start = number * number
+                sieve[start::number] = bytes(len(range(start, limit, number)))
+        set_progress(step * 10)
+    return sum(sieve)
+
+
+def _register_report_job(app: Dash, job_manager: LocalJobManager) -> None:
+    """Register the long-running ``run_report`` demo callback."""
+
+    @app.callback(
+        Output("job-output", "children"),
+        Input("job-run", "n_clicks"),
+        background=True,
+        manager=job_manager,
+        progress=Output("job-progress", "value"),
+        running=[
+            (Output("job-run", "disabled"), True, False),
+            (Output("job-cancel", "disabled"), False, True),
+        ],
+        cancel=Input("job-cancel", "n_clicks"),
+        interval=500,
+        prevent_initial_call=True,
+    )
+    def run_report(
+        set_progress: Callable[[int], None], _n_clicks: int | None
+    ) -> str:
+        """Count primes in a worker process, reporting progress."""
+        count = _count_primes(REPORT_LIMIT, set_progress)
+        return f"There are {count:,} primes below {REPORT_LIMIT:,}."
+
+
+def _register_live_chart(app: Dash, feed: RingBuffer) -> None:
+    """Register the live chart, appending the samples since its cursor."""
+
+    @app.callback(
+        Output("live-chart", "figure"),
+        Output("live-chart", "extendData"),
+        Output("live-cursor", "data"),
+        Input("live-interval", "n_intervals"),
+        State("live-cursor", "data"),
+    )
+    def stream_samples(_n_intervals: int | None, cursor: int | None):
+        """Send the samples written since the browser's last poll."""
+        samples = feed.read(cursor, limit=LIVE_POINTS)
+        # A new page, or one that missed samples: draw the latest anew
+        if cursor is None or samples.skipped:
+            return live_figure(samples), no_update, samples.cursor
+        if not samples.timestamps:
+            raise PreventUpdate
+        return no_update, extend_data(samples), samples.cursor
+
+
+def _register_server_greeting(
+    app: Dash,
+    dependencies: tuple,
+    coalescer: RequestCoalescer | None = None,
+    cache: CallbackCache | None = None,
+) -> None:
+    """Register the Python implementation of ``update_greeting``."""
+
     def update_greeting(style: str, name: str) -> dmc.Text:
         # Minimal example: one clear transformation from inputs → output
         trigger = ctx.triggered_id if ctx.triggered_id else "initial-load"
@@ -33,17 +180,9 @@ def register_callbacks(app: Dash) -> None:
             **{"data-triggered-by": trigger},  # type: ignore
         )
 
-    @app.callback(
-        Output("burger-button", "opened"),
-        Output("app-shell", "navbar"),
-        Input("burger-button", "n_clicks"),
-        State("app-shell", "navbar"),
-    )
-    def toggle_navbar(n_clicks: int, navbar: dict) -> tuple[bool, dict]:
-        """Toggle the navbar collapsed state when burger button is clicked."""
-        if n_clicks:
-            # Toggle the mobile collapsed state
-            opened = not navbar["collapsed"]["mobile"]
-            navbar["collapsed"]["mobile"] = not opened
-            return opened, navbar
-        return False, navbar
+    if coalescer is not None:
+        update_greeting = coalescer.wrap(update_greeting)
+    # Outermost, so cache hits skip the coalescing queue entirely
+    if cache is not None:
+        update_greeting = cache.wrap(update_greeting)
+    app.callback(*dependencies)(update_greeting)
@@ -0,0 +1,73 @@
+"""
+Drop callback requests that a newer request has already superseded.
+
+While someone types, each keystroke posts a callback request. If the
+server is busy, several of them queue up, and by the time an older one
+runs a newer one from the same browser is already waiting: its result
+would be thrown away by the browser anyway. :class:`RequestCoalescer`
+runs requests of one session and callback one at a time and skips any
+request that is no longer the latest when its turn comes.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from collections.abc import Callable
+from typing import Any
+
+from dash.exceptions import PreventUpdate
+
+from .session import get_session_id
+
+
+class RequestCoalescer:
+    """
+    Per-session "latest request wins" gate for callbacks.
+
+    Args:
+        session_key: Returns the id of the session issuing the current
+            request. Defaults to the session cookie id.
+    """
+
+    def __init__(
+        self, session_key: Callable[[], str] = get_session_id
+    ) -> None:
+        self.session_key = session_key
+        self.executed = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        # Newest sequence number and run lock per (session, callback)
+        self._latest: dict[tuple[str, str], int] = {}
+        self._turns: dict[tuple[str, str], threading.Lock] = {}
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Return ``func`` gated so superseded calls are dropped."""
+
+        @functools.wraps(func)
+        def coalesced(*args: Any, **kwargs: Any) -> Any:
+            key = (self.session_key(), func.__qualname__)
+
+            with self._lock:
+                seq = self._latest.get(key, 0) + 1
+                self._latest[key] = seq
+                turn = self._turns.setdefault(key, threading.Lock())
+
+            with turn:
+                with self._lock:
+                    # A newer request arrived while this one was queued
+                    if self._latest.get(key) != seq:
+                        self.dropped += 1
+                        raise PreventUpdate
+                    self.executed += 1
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        # Nobody queued behind us: forget the session so
+                        # the bookkeeping does not grow without bound
+                        if self._latest.get(key) == seq:
+                            del self._latest[key]
+                            del self._turns[key]
+
+        return coalesced
@@ -0,0 +1,207 @@
+"""
+Response compression and long-lived caching of static bundles.
+
+Dash sends its JS bundles and callback responses uncompressed. This module
+adds:
+
+- compression (brotli when the optional ``brotli`` package is installed,
+  gzip otherwise) of dynamic responses above a size threshold,
+- component bundles (``/_dash-component-suites/...``) compressed once and
+  kept in memory, instead of read from disk and compressed per request,
+- ``immutable`` one-year caching for fingerprinted bundles and assets.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import pkgutil
+import re
+import threading
+
+import flask
+from dash import Dash, _validate
+from dash.fingerprint import check_fingerprint
+
+try:  # Optional: brotli compresses JS ~15-20% smaller than gzip
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/x-javascript",
+    "image/svg+xml",
+)
+
+_SUITES_URL = re.compile(
+    r'(?:src|href)="[^"]*/_dash-component-suites/([^/"]+)/([^"?]+)'
+)
+
+# (package, path) -> {encoding: body}; shared by every app in the process
+_bundle_cache: dict[tuple[str, str], dict[str, bytes]] = {}
+_bundle_lock = threading.Lock()
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the supported encodings, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the best encoding the client accepts.
+
+    Args:
+        accept_encoding: Value of the ``Accept-Encoding`` request header.
+
+    Returns:
+        ``"br"``, ``"gzip"`` or ``None`` for an uncompressed response.
+    """
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        # "gzip;q=0" explicitly refuses gzip
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00"):
+            continue
+        accepted.add(token.strip().lower())
+    for encoding in available_encodings():
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+def compress(data: bytes, encoding: str, static: bool = False) -> bytes:
+    """
+    Compress ``data``.
+
+    Static bundles are compressed once, so they get slower, smaller
+    settings; per-request bodies use faster ones. (Brotli's top quality
+    11 is left out: it takes ~15s for plotly.js for another 10%.)
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=9 if static else 5)
+    return gzip.compress(data, compresslevel=9 if static else 6, mtime=0)
+
+
+def _bundle(package_name: str, path: str) -> dict[str, bytes]:
+    """
+    Return the raw and compressed bodies of a package file, cached.
+
+    Raises:
+        NotFound: The package does not ship the file (e.g. source maps).
+    """
+    key = (package_name, path)
+    bodies = _bundle_cache.get(key)
+    if bodies is None:
+        try:
+            raw = pkgutil.get_data(package_name, path) or b""
+        except OSError:
+            flask.abort(404)
+        bodies = {"identity": raw}
+        for encoding in available_encodings():
+            bodies[encoding] = compress(raw, encoding, static=True)
+        with _bundle_lock:
+            bodies = _bundle_cache.setdefault(key, bodies)
+    return bodies
+
+
+def _is_compressible(response: flask.Response) -> bool:
+    """Tell whether a response is worth compressing."""
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        # Streamed bodies would have to be buffered whole
+        and not response.is_streamed
+        and "Content-Encoding" not in response.headers
+        and (response.mimetype or "").startswith(COMPRESSIBLE_TYPES)
+    )
+
+
+def install_compression(app: Dash, min_size: int = 1024) -> None:
+    """
+    Compress responses of ``app.server`` and cache static bundles.
+
+    Args:
+        app: The Dash app.
+        min_size: Bodies smaller than this many bytes are sent as-is;
+            compressing them costs more than it saves.
+    """
+    prefix = app.config.routes_pathname_prefix
+    suites_rule = (
+        prefix
+        + "_dash-component-suites/<string:package_name>/<path:fingerprinted_path>"
+    )
+    assets_prefix = prefix + app.config.assets_url_path.lstrip("/") + "/"
+
+    def serve_component_suites(
+        package_name: str, fingerprinted_path: str
+    ) -> flask.Response:
+        """Serve a component bundle from the in-memory cache."""
+        path, has_fingerprint = check_fingerprint(fingerprinted_path)
+        _validate.validate_js_path(app.registered_paths, package_name, path)
+
+        bodies = _bundle(package_name, path)
+        encoding = choose_encoding(
+            flask.request.headers.get("Accept-Encoding", "")
+        )
+        extension = "." + path.split(".")[-1]
+        response = flask.Response(
+            bodies[encoding or "identity"],
+            mimetype=mimetypes.types_map.get(
+                extension, "application/octet-stream"
+            ),
+        )
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+        if has_fingerprint:
+            # The URL changes with every release of the package
+            response.headers["Cache-Control"] = IMMUTABLE
+        else:
+            # One strong ETag per representation
+            etag = hashlib.sha256(bodies["identity"]).hexdigest()[:32]
+            response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+            response = response.make_conditional(flask.request)
+        return response
+
+    @app.server.after_request
+    def _compress_response(response: flask.Response) -> flask.Response:
+        request = flask.request
+        # Dash fingerprints asset URLs with their modification time
+        if request.path.startswith(assets_prefix) and "m" in request.args:
+            response.headers["Cache-Control"] = IMMUTABLE
+
+        if not _is_compressible(response):
+            return response
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding is None:
+            return response
+
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A strong ETag names one representation: tag the compressed
+            # one apart, and answer revalidations of it
+            response.set_etag(f"{etag}-{encoding}")
+            response = response.make_conditional(request)
+        return response
+
+    app.server.view_functions[suites_rule] = serve_component_suites
+
+    # Compress the bundles of the initial page load now, so no request
+    # waits for it. Lazily loaded chunks are compressed on first use.
+    index_tags = app._generate_scripts_html() + app._generate_css_dist_html()
+    for package_name, fingerprinted_path in _SUITES_URL.findall(index_tags):
+        _bundle(package_name, check_fingerprint(fingerprinted_path)[0])
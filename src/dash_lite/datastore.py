@@ -0,0 +1,375 @@
+"""
+Server-side data shared between callbacks, per browser session.
+
+Callbacks share data through the browser: one returns it into a
+``dcc.Store``, the next receives it as a ``State``. Fine for a flag, but a
+dataset is then serialized into the page and posted back with every
+request that reads it. With a :class:`SessionDataStore`, the data stays on
+the server and only a short handle travels::
+
+    @app.callback(Output("dataset", "data"), Input("upload", "contents"))
+    def load(contents):
+        return get_data_store().put(parse(contents))
+
+    @app.callback(Output("chart", "figure"), Input("dataset", "data"))
+    def plot(handle):
+        return figure(get_data_store().get(handle))
+
+Entries belong to the session that stored them (see
+:mod:`dash_lite.session`), so a handle is useless in another browser.
+They are kept in memory up to ``max_bytes``, least recently used first
+out. Evicted entries are spilled to ``spill_dir`` when one is given:
+NumPy arrays and tables (mappings of column names to arrays) as ``.npy``
+files read back memory-mapped, without copying; other values pickled.
+Without a spill directory, once it is full too, or when writing the
+file fails, the entry is gone and :meth:`~SessionDataStore.get` raises
+``KeyError``: recompute it.
+
+Entries live in one process; run a single worker, or route each session
+to the same worker.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+import re
+import secrets
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+import flask
+from dash import Dash
+
+from .session import get_session_id, install_session_cookie
+
+logger = logging.getLogger(__name__)
+
+_KEY = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+
+def _arrays(value: Any) -> dict[str, Any] | None:
+    """
+    The columns of an array or table that can be memory-mapped.
+
+    Returns:
+        ``{"": array}`` for an array, the columns of a table, or ``None``
+        for any other value.
+    """
+    numpy = _numpy()
+    if numpy is None:
+        return None
+    if isinstance(value, numpy.ndarray):
+        columns = {"": value}
+    elif (
+        isinstance(value, Mapping)
+        and value
+        and all(isinstance(column, numpy.ndarray) for column in value.values())
+        and all(isinstance(name, str) for name in value)
+    ):
+        columns = dict(value)
+    else:
+        return None
+    if any(column.dtype.hasobject for column in columns.values()):
+        return None
+    return columns
+
+
+def _numpy() -> Any:
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _size(value: Any) -> int:
+    """Bytes an entry takes: array data, or the pickle of other values."""
+    columns = _arrays(value)
+    if columns is not None:
+        return sum(column.nbytes for column in columns.values())
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+def _write(path: Path, value: Any) -> None:
+    """Spill ``value`` into the directory ``path``."""
+    path.mkdir(parents=True)
+    columns = _arrays(value)
+    if columns is None:
+        with open(path / "value.pickle", "wb") as file:
+            pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+        return
+    numpy = _numpy()
+    for index, column in enumerate(columns.values()):
+        numpy.save(path / f"{index}.npy", column, allow_pickle=False)
+    names = None if list(columns) == [""] else list(columns)
+    (path / "columns.json").write_text(json.dumps(names))
+
+
+def _read(path: Path) -> Any:
+    """Load a spilled value; arrays are memory-mapped read-only."""
+    if (path / "value.pickle").exists():
+        with open(path / "value.pickle", "rb") as file:
+            return pickle.load(file)
+    numpy = _numpy()
+    names = json.loads((path / "columns.json").read_text())
+    columns = [
+        numpy.load(path / f"{index}.npy", mmap_mode="r")
+        for index in range(len(names or [""]))
+    ]
+    return (
+        columns[0] if names is None else dict(zip(names, columns, strict=True))
+    )
+
+
+class SessionDataStore:
+    """
+    Per-session values behind short handles, bounded in memory.
+
+    Values are handed out as stored, and spilled arrays as read-only
+    memory maps: do not modify them, :meth:`put` a new value instead.
+
+    Args:
+        max_bytes: Memory taken by the entries of all sessions before the
+            least recently used ones are evicted.
+        spill_dir: Directory evicted entries are written to (in a new
+            subdirectory, removed with the store), ``True`` for the temp
+            directory, or ``None`` to drop them.
+        max_spill_bytes: Disk taken by spilled entries before the least
+            recently used ones are deleted.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 2**20,
+        spill_dir: str | Path | bool | None = None,
+        max_spill_bytes: int = 4 * 2**30,
+    ) -> None:
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_dir = None
+        if spill_dir is not None and spill_dir is not False:
+            self.spill_dir = Path(
+                tempfile.mkdtemp(
+                    prefix="dash-lite-data-",
+                    dir=None if spill_dir is True else spill_dir,
+                )
+            )
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        self.memory_bytes = 0
+        self.spill_bytes = 0
+        self.hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.spills = 0
+        # (session id, key) -> (size, value) / (size, spill path)
+        self._memory: OrderedDict[tuple[str, str], tuple[int, Any]] = (
+            OrderedDict()
+        )
+        # Evicted entries being written to disk, still served from memory
+        self._spilling: dict[tuple[str, str], tuple[int, Any]] = {}
+        self._spilled: OrderedDict[tuple[str, str], tuple[int, Path]] = (
+            OrderedDict()
+        )
+        self._serial = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._memory) + len(self._spilling) + len(self._spilled)
+
+    def stats(self) -> dict[str, int]:
+        """Return the entry, byte and hit/miss counters."""
+        return {
+            "entries": len(self._memory),
+            "spilled_entries": len(self._spilled),
+            "memory_bytes": self.memory_bytes,
+            "spill_bytes": self.spill_bytes,
+            "hits": self.hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "spills": self.spills,
+        }
+
+    def put(
+        self,
+        value: Any,
+        key: str | None = None,
+        session_id: str | None = None,
+    ) -> str:
+        """
+        Store ``value`` for the current session.
+
+        Args:
+            value: Any picklable value; arrays and tables of arrays spill
+                without copying.
+            key: Handle to store it under, replacing the previous value;
+                a new unique handle if ``None``.
+            session_id: Session to store it for; the current request's
+                if ``None``.
+
+        Returns:
+            The handle, to return from the callback instead of the value.
+
+        Raises:
+            ValueError: ``key`` is not 1-64 letters, digits, ``_`` or
+                ``-``, or the value is larger than the store.
+        """
+        if key is not None and not _KEY.fullmatch(key):
+            raise ValueError(f"invalid data store key: {key!r}")
+        session_id = session_id or get_session_id()
+        size = _size(value)
+        if size > self.max_bytes and self.spill_dir is None:
+            raise ValueError(
+                f"value of {size} bytes exceeds the store's {self.max_bytes}"
+            )
+        with self._lock:
+            key = key or secrets.token_urlsafe(12)
+            entry = (session_id, key)
+            self._discard(entry)
+            self._memory[entry] = (size, value)
+            self.memory_bytes += size
+            evicted = self._evict()
+        self._spill(evicted)
+        return key
+
+    def get(self, handle: str, session_id: str | None = None) -> Any:
+        """
+        Return the value stored under ``handle`` for the current session.
+
+        Raises:
+            KeyError: Nothing is stored under ``handle`` for the session:
+                it was never stored, was evicted, or belongs to another
+                session.
+        """
+        entry = (session_id or get_session_id(), handle)
+        with self._lock:
+            stored = self._memory.get(entry)
+            if stored is not None:
+                self._memory.move_to_end(entry)
+                self.hits += 1
+                return stored[1]
+            stored = self._spilling.get(entry)
+            if stored is not None:
+                self.hits += 1
+                return stored[1]
+            spilled = self._spilled.get(entry)
+            if spilled is None:
+                self.misses += 1
+                raise KeyError(handle)
+            self._spilled.move_to_end(entry)
+            self.spill_hits += 1
+        try:
+            # Memory maps stay valid should the files be deleted later
+            return _read(spilled[1])
+        except OSError:
+            # Deleted while being opened
+            raise KeyError(handle) from None
+
+    def delete(self, handle: str, session_id: str | None = None) -> None:
+        """Remove ``handle`` of the current session, if stored."""
+        with self._lock:
+            self._discard((session_id or get_session_id(), handle))
+
+    def clear_session(self, session_id: str | None = None) -> None:
+        """Remove every entry of a session, the current one by default."""
+        session_id = session_id or get_session_id()
+        with self._lock:
+            for entry in [
+                *(entry for entry in self._memory if entry[0] == session_id),
+                *(entry for entry in self._spilling if entry[0] == session_id),
+                *(entry for entry in self._spilled if entry[0] == session_id),
+            ]:
+                self._discard(entry)
+
+    def _discard(self, entry: tuple[str, str]) -> None:
+        """Drop an entry from memory and disk; hold the lock."""
+        stored = self._memory.pop(entry, None)
+        if stored is not None:
+            self.memory_bytes -= stored[0]
+        # A spill in progress sees the entry gone and drops its file
+        self._spilling.pop(entry, None)
+        spilled = self._spilled.pop(entry, None)
+        if spilled is not None:
+            self.spill_bytes -= spilled[0]
+            shutil.rmtree(spilled[1], ignore_errors=True)
+
+    def _evict(self) -> list[tuple[tuple[str, str], tuple[int, Any]]]:
+        """Pop entries beyond ``max_bytes``, those to spill; hold the lock."""
+        evicted = []
+        while self.memory_bytes > self.max_bytes:
+            entry, stored = self._memory.popitem(last=False)
+            self.memory_bytes -= stored[0]
+            if self.spill_dir is not None and (
+                stored[0] <= self.max_spill_bytes
+            ):
+                self._spilling[entry] = stored
+                evicted.append((entry, stored))
+        return evicted
+
+    def _spill(
+        self, evicted: list[tuple[tuple[str, str], tuple[int, Any]]]
+    ) -> None:
+        """Write evicted entries to disk, outside the lock."""
+        for entry, stored in evicted:
+            size, value = stored
+            with self._lock:
+                self._serial += 1
+                path = self.spill_dir / f"{self._serial}"
+            try:
+                _write(path, value)
+            except Exception:
+                # Disk full, say: the entry is evicted like one without a
+                # spill directory, and the rest of the batch still spills
+                logger.exception("could not spill data store entry")
+                with self._lock:
+                    if self._spilling.get(entry) is stored:
+                        del self._spilling[entry]
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            with self._lock:
+                if self._spilling.get(entry) is not stored:
+                    # Deleted, or stored again, while being written
+                    shutil.rmtree(path, ignore_errors=True)
+                    continue
+                del self._spilling[entry]
+                self._spilled[entry] = (size, path)
+                self.spill_bytes += size
+                self.spills += 1
+                while self.spill_bytes > self.max_spill_bytes:
+                    _, (old_size, old_path) = self._spilled.popitem(last=False)
+                    self.spill_bytes -= old_size
+                    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def install_data_store(app: Dash, store: SessionDataStore) -> None:
+    """
+    Make ``store`` available to the callbacks of ``app``.
+
+    Hands out session cookies and registers the store as
+    ``app.server.extensions["dash_lite.data_store"]``, where
+    :func:`get_data_store` finds it.
+    """
+    install_session_cookie(app.server)
+    app.server.extensions["dash_lite.data_store"] = store
+
+
+def get_data_store() -> SessionDataStore:
+    """
+    Return the data store of the app serving the current request.
+
+    Raises:
+        RuntimeError: The app was created without a data store.
+    """
+    store = flask.current_app.extensions.get("dash_lite.data_store")
+    if store is None:
+        raise RuntimeError("the app has no data store")
+    return store
@@ -0,0 +1,195 @@
+"""
+Serve ``/_dash-dependencies`` from bytes compiled once, and check them.
+
+Every page load fetches the callback graph, and Dash serializes it from
+``app._callback_list`` on each request although it only changes when a
+callback is registered. :class:`DependencyCache` serializes it once,
+keeps a gzip copy and answers revalidations with ``304 Not Modified``;
+it re-serializes when callbacks were registered after the app was
+created.
+
+A callback naming a component id the layout does not have, or two
+callbacks writing the same prop, only fail in the browser, and only once
+the callback fires. :func:`validate_dependencies` finds both when the
+app is created.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterator
+from typing import Any
+
+import flask
+from dash import Dash
+from dash._utils import split_callback_id, to_json
+from dash.development.base_component import Component
+
+from .layout_cache import LayoutCache
+
+
+class DependencyCache(LayoutCache):
+    """
+    Pre-serialized ``/_dash-dependencies`` response for a Dash app.
+
+    Args:
+        app: The Dash app whose callbacks are served.
+        compress: Also keep a gzip copy, sent to clients that accept it.
+        min_size: Callbacks serialized to fewer bytes are sent as-is.
+    """
+
+    def __init__(
+        self, app: Dash, compress: bool = False, min_size: int = 1024
+    ) -> None:
+        self.callbacks = 0
+        self.min_size = min_size
+        super().__init__(app, compress=compress)
+
+    def serialize(self) -> bytes:
+        """Serialize the callbacks exactly as ``Dash.dependencies`` would."""
+        callbacks = self.app._callback_list
+        # Dash fills in the default on its first request; do it already,
+        # so that the bytes (and ETag) stay the same after it
+        hidden = self.app.config.get("hide_all_callbacks", False)
+        return to_json(
+            [
+                (
+                    {**callback, "hidden": hidden}
+                    if callback.get("hidden") is None
+                    else callback
+                )
+                for callback in callbacks
+            ]
+        ).encode("utf-8")
+
+    def compressed(self, body: bytes) -> bytes | None:
+        """Return the gzip copy of ``body``, unless it is too small."""
+        return super().compressed(body) if len(body) >= self.min_size else None
+
+    def refresh(self) -> None:
+        """Re-serialize the callbacks, e.g. after some were added."""
+        # Counted first: callbacks added meanwhile trigger another refresh
+        callbacks = len(self.app._callback_list)
+        super().refresh()
+        self.callbacks = callbacks
+
+    def serve(self) -> flask.Response:
+        """Flask view replacing Dash's ``/_dash-dependencies`` handler."""
+        # Callbacks are only ever added
+        if len(self.app._callback_list) != self.callbacks:
+            self.refresh()
+        return super().serve()
+
+
+def _component_ids(layout: Any) -> Iterator[str]:
+    """Ids of every component in ``layout``, in any prop, not only children."""
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Component):
+            component_id = getattr(node, "id", None)
+            if isinstance(component_id, str):
+                yield component_id
+            stack.extend(
+                value
+                for prop in node._prop_names
+                if isinstance(
+                    value := getattr(node, prop, None),
+                    Component | list | tuple,
+                )
+            )
+        elif isinstance(node, list | tuple):
+            stack.extend(node)
+
+
+def _outputs(callback: dict[str, Any]) -> list[dict[str, str]]:
+    outputs = split_callback_id(callback["output"])
+    return outputs if isinstance(outputs, list) else [outputs]
+
+
+def dependency_problems(app: Dash, layout: Any) -> list[str]:
+    """
+    Find callbacks that cannot work with ``layout``.
+
+    Pattern-matching ids (dicts) match components created at runtime and
+    are not checked against the layout.
+
+    Args:
+        app: The Dash app whose callbacks are checked.
+        layout: Layout holding every component the callbacks use.
+
+    Returns:
+        One message per missing component or duplicated output.
+    """
+    present = set(_component_ids(layout))
+    problems = []
+    written: Counter[str] = Counter()
+    for callback in app._callback_list:
+        outputs = _outputs(callback)
+        missing = {
+            dependency["id"]
+            for dependency in (
+                *outputs,
+                *callback["inputs"],
+                *callback["state"],
+            )
+            if not dependency["id"].startswith("{")
+        } - present
+        problems.extend(
+            f"{callback['output']}: no component with id {component_id!r} "
+            "in the layout"
+            for component_id in sorted(missing)
+        )
+        for output in outputs:
+            # Outputs with allow_duplicate=True carry an "@<hash>" suffix
+            if "@" not in output["property"]:
+                written[f"{output['id']}.{output['property']}"] += 1
+    problems.extend(
+        f"{output}: written by {count} callbacks"
+        for output, count in written.items()
+        if count > 1
+    )
+    return problems
+
+
+def validate_dependencies(app: Dash, layout: Any = None) -> None:
+    """
+    Check the app's callbacks against its layout.
+
+    Args:
+        app: The Dash app.
+        layout: Layout holding every component the callbacks use;
+            ``app.layout`` if ``None``.
+
+    Raises:
+        ValueError: A callback uses a component the layout does not
+            have, or several callbacks write the same prop.
+    """
+    problems = dependency_problems(
+        app, layout if layout is not None else app.layout
+    )
+    if problems:
+        raise ValueError(
+            "invalid callbacks:\n" + "\n".join(f"  {p}" for p in problems)
+        )
+
+
+def install_dependency_cache(
+    app: Dash, compress: bool = False, min_size: int = 1024
+) -> DependencyCache:
+    """
+    Serialize the app's callbacks now and serve them from cache.
+
+    Args:
+        app: Dash app with its callbacks registered.
+        compress: Also store a gzip copy of the serialized callbacks.
+        min_size: Callbacks serialized to fewer bytes are not compressed.
+
+    Returns:
+        The installed cache.
+    """
+    cache = DependencyCache(app, compress=compress, min_size=min_size)
+    endpoint = app.config.routes_pathname_prefix + "_dash-dependencies"
+    app.server.view_functions[endpoint] = cache.serve
+    app.server.extensions["dash_lite.dependencies"] = cache
+    return cache
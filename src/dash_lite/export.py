@@ -0,0 +1,210 @@
+"""
+Bulk greeting export.
+
+``POST /api/greetings`` takes a list of names as CSV (first column; blank
+lines, and a first row that is the export's own ``name,greeting`` header,
+are skipped) or NDJSON (one JSON string, or object with a ``"name"`` key,
+per line) and streams back one greeting per name in the same format. The
+upload is the raw request body (e.g.
+``curl --data-binary @names.csv -H "Content-Type: text/csv"``).
+
+Names are read, formatted and written in batches by a chain of
+generators, so memory use does not depend on the size of the list and
+the first greetings are sent before the upload has been fully read.
+
+An invalid upload (bad UTF-8, or an NDJSON line without a name) found in
+the first batch gets ``400``. Found later, once the response has started,
+it ends the stream with an error record instead: ``{"error": ...}`` in
+NDJSON, a row of the single field ``error: ...`` in CSV (greeting rows
+always have two).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import itertools
+import json
+from collections.abc import Iterable, Iterator
+from json.encoder import encode_basestring
+
+import flask
+from dash import Dash
+
+from .greeting import build_greetings
+
+FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# First row of a CSV export, skipped when an export is uploaded again
+CSV_HEADER = ["name", "greeting"]
+
+# What reading a malformed upload raises
+UPLOAD_ERRORS = (ValueError, csv.Error)
+
+# Names formatted per step: large enough to amortize the per-batch work,
+# small enough to keep chunks (and memory) small
+BATCH_SIZE = 8192
+
+
+def read_names(lines: Iterable[str], fmt: str) -> Iterator[str]:
+    """
+    Parse names from the lines of an upload.
+
+    Args:
+        lines: Text lines, e.g. a file opened with ``newline=""``.
+        fmt: ``"csv"`` or ``"ndjson"``.
+
+    Raises:
+        ValueError: A NDJSON line is not a string or an object with a
+            ``"name"``, or the upload is not valid UTF-8.
+    """
+    if fmt == "csv":
+        rows = (row for row in csv.reader(lines) if row)
+        first = next(rows, None)
+        if first is not None and first != CSV_HEADER:
+            yield first[0]
+        yield from (row[0] for row in rows)
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"line {number}: {error}") from None
+        if isinstance(value, dict):
+            value = value.get("name")
+        if not isinstance(value, str):
+            raise ValueError(f"line {number}: expected a name, got {line!r}")
+        yield value
+
+
+def batched(names: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Split ``names`` into lists of ``size`` (the last may be shorter)."""
+    names = iter(names)
+    while batch := list(itertools.islice(names, size)):
+        yield batch
+
+
+def export_greetings(
+    names: Iterable[str],
+    style: str,
+    fmt: str,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    Format greetings for ``names`` and encode them chunk by chunk.
+
+    Args:
+        names: Names to greet.
+        style: Greeting style, see :func:`dash_lite.greeting.build_greeting`.
+        fmt: ``"csv"`` (``name,greeting`` rows after a header) or
+            ``"ndjson"`` (``{"name": ..., "greeting": ...}`` lines).
+        batch_size: Names per chunk.
+
+    Yields:
+        UTF-8 encoded chunks of the output.
+    """
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(CSV_HEADER)
+        for batch in batched(names, batch_size):
+            writer.writerows(
+                zip(batch, build_greetings(style, batch), strict=True)
+            )
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+        return
+
+    for batch in batched(names, batch_size):
+        greetings = build_greetings(style, batch)
+        yield "".join(
+            f'{{"name":{encode_basestring(name)},'
+            f'"greeting":{encode_basestring(greeting)}}}\n'
+            for name, greeting in zip(batch, greetings, strict=True)
+        ).encode("utf-8")
+
+
+def error_record(message: str, fmt: str) -> bytes:
+    """Encode the record ending an export whose upload turned out invalid."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow([f"error: {message}"])
+        return buffer.getvalue().encode("utf-8")
+    return f'{{"error":{encode_basestring(message)}}}\n'.encode()
+
+
+def _ending_with_error_record(
+    chunks: Iterator[bytes], fmt: str
+) -> Iterator[bytes]:
+    """Pass ``chunks`` on, ending with an error record if reading fails."""
+    try:
+        yield from chunks
+    except UPLOAD_ERRORS as error:
+        yield error_record(str(error), fmt)
+
+
+def _upload_format() -> str:
+    """
+    Return the format of the uploaded name list.
+
+    It is the ``format`` query parameter, else derived from the request's
+    content type.
+    """
+    request = flask.request
+    fmt = request.args.get("format")
+    if fmt is None:
+        fmt = next(
+            (
+                name
+                for name, mimetype in FORMATS.items()
+                if mimetype == request.mimetype
+            ),
+            None,
+        )
+    if fmt not in FORMATS:
+        flask.abort(
+            415,
+            "Send text/csv or application/x-ndjson, or set ?format= to "
+            + " or ".join(FORMATS),
+        )
+    return fmt
+
+
+def install_greeting_export(app: Dash) -> None:
+    """Serve the bulk greeting export at ``/api/greetings``."""
+
+    def serve_greetings() -> flask.Response:
+        fmt = _upload_format()
+        style = flask.request.args.get("style", "friendly")
+        # Read while the response is sent, not buffered up front
+        lines = io.TextIOWrapper(
+            flask.request.stream, encoding="utf-8", newline=""
+        )
+        chunks = export_greetings(read_names(lines, fmt), style, fmt)
+        # The first batch is read before the status is sent, so that most
+        # invalid uploads get a plain 400
+        try:
+            first = next(chunks, b"")
+        except UPLOAD_ERRORS as error:
+            flask.abort(400, str(error))
+        return flask.Response(
+            flask.stream_with_context(
+                itertools.chain(
+                    [first], _ending_with_error_record(chunks, fmt)
+                )
+            ),
+            mimetype=FORMATS[fmt],
+        )
+
+    app.server.add_url_rule(
+        app.config.routes_pathname_prefix + "api/greetings",
+        endpoint="dash_lite_greetings",
+        view_func=serve_greetings,
+        methods=["POST"],
+    )
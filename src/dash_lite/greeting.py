@@ -0,0 +1,51 @@
+"""
+Greeting text, without any Dash dependency.
+
+Kept apart from :mod:`dash_lite.callbacks` so that tools needing only the
+text (and ``assets/greeting.js``' parity tests) can import it without
+loading Dash.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+# Style -> text before and after the name
+_TEMPLATES = {
+    "formal": ("Hello, ", ". It's a pleasure to meet you."),
+    "short": ("Hi, ", "!"),
+}
+_FRIENDLY = ("Hey ", ", welcome to dash-lite! 👋")
+
+
+def build_greeting(style: str, name: str) -> str:
+    """
+    Build the greeting for a style and name.
+
+    Args:
+        style: ``"formal"``, ``"short"`` or anything else for friendly.
+        name: Name to greet; blank means "Friend".
+
+    Returns:
+        The greeting text.
+    """
+    prefix, suffix = _TEMPLATES.get(style, _FRIENDLY)
+    return prefix + (name.strip() or "Friend") + suffix
+
+
+def build_greetings(style: str, names: Iterable[str]) -> list[str]:
+    """
+    Build the greetings of many names in one style.
+
+    Same result as :func:`build_greeting` per name, with the style looked
+    up once instead of per call.
+
+    Args:
+        style: See :func:`build_greeting`.
+        names: Names to greet.
+
+    Returns:
+        The greeting texts, in the order of ``names``.
+    """
+    prefix, suffix = _TEMPLATES.get(style, _FRIENDLY)
+    return [prefix + (name.strip() or "Friend") + suffix for name in names]
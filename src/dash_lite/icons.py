@@ -0,0 +1,170 @@
+"""
+Icons served from local icon sets instead of the Iconify API.
+
+``DashIconify`` downloads the data of every icon from api.iconify.design
+when it first renders it: one request per icon set, made late (the
+component's code is itself loaded on demand), and failing where the
+browser has no internet access.
+
+At startup, :func:`install_icons` collects the icon names used in the
+layout, resolves them from local Iconify JSON icon sets (the ``tabler``
+subset in ``icon_sets/`` by default) and serves their data as a single
+script with a content-hashed URL, cached as immutable. The script fills
+Iconify's ``window.IconifyPreload`` before any icon renders, so
+``DashIconify`` finds every icon locally and makes no request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+import flask
+from dash import Dash
+from dash.development.base_component import Component
+
+from .compression import IMMUTABLE
+
+ICON_SETS_DIR = Path(__file__).parent / "icon_sets"
+
+
+def collect_icons(layout: Any) -> set[str]:
+    """
+    Return the names of the ``DashIconify`` icons in a layout.
+
+    Args:
+        layout: Component tree; icons in any component-valued property
+            (``children``, ``leftSection``, ...) are found.
+    """
+    return {
+        component.icon
+        for component in _walk(layout)
+        if component._type == "DashIconify"
+    }
+
+
+def _walk(node: Any) -> Iterator[Component]:
+    """Yield every component in a tree, following all properties."""
+    if isinstance(node, Component):
+        yield node
+        for name in node._prop_names:
+            yield from _walk(getattr(node, name, None))
+    elif isinstance(node, (list, tuple)):
+        for item in node:
+            yield from _walk(item)
+
+
+def load_icon_sets(
+    directories: Iterable[str | Path] = (ICON_SETS_DIR,),
+) -> dict[str, dict]:
+    """
+    Read Iconify JSON icon sets (``@iconify/json`` format).
+
+    Args:
+        directories: Folders holding one ``<prefix>.json`` file per set;
+            for a prefix found in several, the first folder wins.
+
+    Returns:
+        Icon sets by prefix.
+    """
+    sets: dict[str, dict] = {}
+    for directory in directories:
+        for path in sorted(Path(directory).glob("*.json")):
+            icon_set = json.loads(path.read_text(encoding="utf-8"))
+            sets.setdefault(icon_set["prefix"], icon_set)
+    return sets
+
+
+def build_preload(names: Iterable[str], icon_sets: dict[str, dict]) -> str:
+    """
+    Build the script preloading icons into Iconify.
+
+    Args:
+        names: Icon names, ``"prefix:name"``.
+        icon_sets: Icon sets by prefix, see :func:`load_icon_sets`.
+
+    Returns:
+        JavaScript source setting ``window.IconifyPreload``.
+
+    Raises:
+        ValueError: Some icons are in none of the icon sets.
+    """
+    preload: dict[str, dict] = {}
+    missing = []
+    for name in sorted(names):
+        prefix, _, icon = name.partition(":")
+        icon_set = icon_sets.get(prefix)
+        if icon_set is None or icon not in icon_set["icons"]:
+            missing.append(name)
+            continue
+        entry = preload.setdefault(
+            prefix,
+            {
+                "prefix": prefix,
+                "icons": {},
+                # Set-wide defaults the icons rely on
+                **{
+                    key: icon_set[key]
+                    for key in ("width", "height", "left", "top")
+                    if key in icon_set
+                },
+            },
+        )
+        entry["icons"][icon] = icon_set["icons"][icon]
+    if missing:
+        raise ValueError(
+            f"Icons not found in the local icon sets: {', '.join(missing)}"
+        )
+    payload = json.dumps(
+        list(preload.values()), separators=(",", ":"), ensure_ascii=False
+    )
+    return (
+        "window.IconifyPreload=(window.IconifyPreload||[])"
+        f".concat({payload});\n"
+    )
+
+
+def install_icons(
+    app: Dash,
+    names: Iterable[str] | None = None,
+    directories: Iterable[str | Path] = (ICON_SETS_DIR,),
+) -> str:
+    """
+    Serve the app's icons from local icon sets.
+
+    Call this once the layout is assigned.
+
+    Args:
+        app: The Dash app.
+        names: Icons to serve; by default those in ``app.layout``.
+        directories: Folders of Iconify JSON icon sets, see
+            :func:`load_icon_sets`.
+
+    Returns:
+        URL of the preload script.
+
+    Raises:
+        ValueError: Some icons are in none of the icon sets.
+    """
+    if names is None:
+        names = collect_icons(app.layout)
+    script = build_preload(names, load_icon_sets(directories)).encode()
+    digest = hashlib.sha256(script).hexdigest()[:16]
+    rule = f"{app.config.routes_pathname_prefix}_dash-lite/icons.{digest}.js"
+
+    def serve_icons() -> flask.Response:
+        response = flask.Response(script, mimetype="application/javascript")
+        # The URL changes whenever the icons do
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    app.server.add_url_rule(
+        rule, endpoint="dash_lite_icons", view_func=serve_icons
+    )
+    url = f"{app.config.requests_pathname_prefix}_dash-lite/icons.{digest}.js"
+    # Before the component scripts, so the data is there when icons render
+    app.config.external_scripts.append(url)
+    return url
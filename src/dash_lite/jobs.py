@@ -0,0 +1,378 @@
+"""
+Local manager for Dash background (long-running) callbacks.
+
+A callback registered with ``background=True`` returns right away with a
+job id; the browser then polls until the result is ready, showing the
+callback's ``progress`` outputs meanwhile and stopping the job when a
+``cancel`` input fires.
+
+Dash ships managers backed by diskcache (one new process per job) and
+Celery (Redis). :class:`LocalJobManager` needs neither: jobs run on a
+fixed pool of worker processes, and job state, progress and results are
+kept in a SQLite file, so any worker process of the web server can answer
+the polls. Everything stays on one machine.
+
+Worker processes are forked from the app process, so they see every
+callback registered on it, including closures that a spawned process
+could not import. Forking is only safe on Linux: Windows cannot fork,
+and macOS system libraries may crash in a forked child, so the manager
+refuses to start elsewhere. The pool is forked once, on the first job,
+by the request thread queuing it; other threads are not copied, so
+callbacks must not rely on locks held by other threads at that moment.
+Cancellation is cooperative: a queued job never starts, a running one is
+stopped the next time it reports progress.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+from typing import Any
+
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+from dash.background_callback._proxy_set_props import ProxySetProps
+from dash.background_callback.managers import BaseBackgroundCallbackManager
+from dash.exceptions import PreventUpdate
+
+from .cache import MISSING, SQLiteCache
+
+DEFAULT_PATH = Path(tempfile.gettempdir()) / "dash_lite_jobs.sqlite"
+
+# Worker processes are forked, which is only safe on Linux
+SUPPORTED = sys.platform.startswith("linux")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "cancelled",
+)
+
+# Managers by token, for looking them up again in the worker processes
+_managers: dict[str, LocalJobManager] = {}
+
+
+class JobCancelled(Exception):
+    """Raised from ``set_progress`` when the job has been cancelled."""
+
+
+class JobStore(SQLiteCache):
+    """
+    SQLite file holding job states next to results and progress values.
+
+    Args:
+        path: Database file; created if missing.
+        ttl: Seconds results and finished jobs are kept.
+    """
+
+    def __init__(self, path: str | Path, ttl: float | None = None) -> None:
+        super().__init__(path, ttl)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS background_jobs ("
+                "job TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                "enqueued REAL NOT NULL, started REAL, finished REAL)"
+            )
+
+    def add_job(self, job: str) -> None:
+        """Record a newly queued job and drop long finished ones."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO background_jobs VALUES (?, ?, ?, NULL, NULL)",
+                (job, QUEUED, now),
+            )
+            if self.ttl is not None:
+                conn.execute(
+                    "DELETE FROM background_jobs WHERE finished < ?",
+                    (now - self.ttl,),
+                )
+
+    def _transition(self, job: str, old: tuple[str, ...], new: str) -> bool:
+        """Move ``job`` from one of the ``old`` states to ``new``."""
+        column = "started" if new == RUNNING else "finished"
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE background_jobs SET status = ?, {column} = ? "
+                f"WHERE job = ? AND status IN ({','.join('?' * len(old))})",
+                (new, time.time(), job, *old),
+            )
+        return cursor.rowcount == 1
+
+    def start(self, job: str) -> bool:
+        """Mark a queued job as running; ``False`` if it was cancelled."""
+        return self._transition(job, (QUEUED,), RUNNING)
+
+    def finish(self, job: str, status: str) -> bool:
+        """Mark a running job as done or failed."""
+        return self._transition(job, (RUNNING,), status)
+
+    def cancel(self, job: str) -> bool:
+        """Mark a queued or running job as cancelled."""
+        return self._transition(job, (QUEUED, RUNNING), CANCELLED)
+
+    def job(self, job: str) -> dict[str, Any] | None:
+        """Return the status and timestamps of a job."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT status, enqueued, started, finished "
+                "FROM background_jobs WHERE job = ?",
+                (job,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return dict(
+            zip(
+                ("status", "enqueued", "started", "finished"), row, strict=True
+            )
+        )
+
+
+class LocalJobManager(BaseBackgroundCallbackManager):
+    """
+    Background callback manager running jobs on a local process pool.
+
+    Pass it as ``manager=`` to ``app.callback(..., background=True)``, or
+    to ``create_app(job_manager=...)`` to make it the app's default.
+
+    Args:
+        path: SQLite file shared by every process serving the app.
+        workers: Size of the process pool (default: number of cores).
+            Jobs beyond that wait in the queue.
+        expire: Seconds results and finished jobs are kept.
+        cache_by: Dash's ``cache_by``: zero-argument functions whose
+            results are added to the cache key. When given, results are
+            kept and reused instead of recomputed.
+
+    Raises:
+        RuntimeError: Not running on Linux, where worker processes
+            cannot be forked safely.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_PATH,
+        workers: int | None = None,
+        expire: float | None = 3600,
+        cache_by: list[Callable[[], Any]] | None = None,
+    ) -> None:
+        if not SUPPORTED:
+            raise RuntimeError(
+                "LocalJobManager forks its worker processes, which is only "
+                f"supported on Linux, not {sys.platform}; use Dash's "
+                "DiskcacheManager or CeleryManager instead"
+            )
+        self.store = JobStore(path, ttl=expire)
+        self.workers = workers or os.cpu_count() or 1
+        self.token = uuid.uuid4().hex
+        # registry key -> (callback function, has progress outputs)
+        self._functions: dict[str, tuple[Callable[..., Any], bool]] = {}
+        self._futures: dict[str, Future] = {}
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+        _managers[self.token] = self
+        super().__init__(cache_by)
+
+    def worker_pids(self) -> list[int]:
+        """Return the process ids of the pool's worker processes."""
+        if self._pool is None:
+            return []
+        return list(self._pool._processes)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; queued jobs are dropped."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Created on first use, so workers are forked after the callbacks
+        # were registered (and, under gunicorn, inside each worker)
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("fork"),
+                )
+            return self._pool
+
+    # Dash's manager interface
+
+    def make_job_fn(
+        self, fn: Callable[..., Any], progress: bool, key: str | None = None
+    ) -> str:
+        # Dash hands this back to call_job_fn. A key, rather than a
+        # closure, can be sent to the worker processes.
+        self._functions[key] = (fn, bool(progress))
+        with self._pool_lock:
+            # Workers forked earlier don't know the new function: retire
+            # them once their jobs are done
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+        return key
+
+    def call_job_fn(
+        self, key: str, job_fn: str, args: Any, context: dict
+    ) -> str:
+        job = uuid.uuid4().hex
+        self.store.add_job(job)
+        future = self._executor().submit(
+            _run_job, self.token, job_fn, job, key, args, dict(context)
+        )
+        self._futures[job] = future
+        future.add_done_callback(lambda f: self._job_ended(job, key, f))
+        return job
+
+    def _job_ended(self, job: str, key: str, future: Future) -> None:
+        """Record jobs whose worker process died without a result."""
+        self._futures.pop(job, None)
+        if future.cancelled() or future.exception() is None:
+            return
+        if self.store.finish(job, FAILED):
+            self.store.set(key, _error_result(future.exception()))
+
+    def terminate_job(self, job: str | None) -> None:
+        if not job:
+            return
+        self.store.cancel(job)
+        future = self._futures.pop(job, None)
+        if future is not None:
+            future.cancel()
+
+    def terminate_unhealthy_job(self, job: str | None) -> bool:
+        if job and not self.job_running(job):
+            self.terminate_job(job)
+            return True
+        return False
+
+    def job_running(self, job: str | None) -> bool:
+        record = self.store.job(job) if job else None
+        return record is not None and record["status"] in (QUEUED, RUNNING)
+
+    def get_progress(self, key: str) -> Any:
+        progress_key = self._make_progress_key(key)
+        progress = self.store.get(progress_key)
+        if progress is MISSING:
+            return None
+        self.store.delete(progress_key)
+        return progress
+
+    def result_ready(self, key: str) -> bool:
+        return self.store.get(key) is not MISSING
+
+    def get_result(self, key: str, _job: str | None) -> Any:
+        result = self.store.get(key)
+        if result is MISSING:
+            return self.UNDEFINED
+        if self.cache_by is None:
+            self.store.delete(key)
+        self.store.delete(self._make_progress_key(key))
+        return result
+
+    def get_updated_props(self, key: str) -> dict:
+        set_props_key = self._make_set_props_key(key)
+        props = self.store.get(set_props_key)
+        if props is MISSING:
+            return {}
+        self.store.delete(set_props_key)
+        return props
+
+    def clear_cache_entry(self, key: str) -> None:
+        self.store.delete(key)
+
+    # Worker side
+
+    def _run(
+        self, registry_key: str, job: str, key: str, args: Any, context: dict
+    ) -> None:
+        """Run one job in a worker process and store its outcome."""
+        store = self.store
+        if not store.start(job):
+            return  # Cancelled while queued
+        fn, has_progress = self._functions[registry_key]
+
+        def set_progress(value: Any) -> None:
+            record = store.job(job)
+            if record is not None and record["status"] == CANCELLED:
+                raise JobCancelled(job)
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            store.set(self._make_progress_key(key), value)
+
+        def set_props(component_id: str, props: dict) -> None:
+            store.set(self._make_set_props_key(key), {component_id: props})
+
+        def run() -> Any:
+            callback_context = AttributeDict(**context)
+            callback_context.ignore_register_page = False
+            callback_context.updated_props = ProxySetProps(set_props)
+            context_value.set(callback_context)
+
+            progress = [set_progress] if has_progress else []
+            if isinstance(args, dict):
+                result = fn(*progress, **args)
+            elif isinstance(args, (list, tuple)):
+                result = fn(*progress, *args)
+            else:
+                result = fn(*progress, args)
+            if inspect.iscoroutine(result):
+                result = asyncio.run(result)
+            return result
+
+        status = DONE
+        try:
+            result = copy_context().run(run)
+        except JobCancelled:
+            return
+        except PreventUpdate:
+            result = {"_dash_no_update": "_dash_no_update"}
+        except Exception as exc:
+            status = FAILED
+            result = _error_result(exc)
+
+        # The result goes first: a poll seeing a finished job without a
+        # result takes the job for cancelled
+        if store.job(job)["status"] == RUNNING:
+            store.set(key, result)
+            store.finish(job, status)
+
+
+def _run_job(
+    token: str,
+    registry_key: str,
+    job: str,
+    key: str,
+    args: Any,
+    context: dict,
+) -> None:
+    """Entry point of a job in a worker process."""
+    _managers[token]._run(registry_key, job, key, args, context)
+
+
+def _error_result(exc: BaseException) -> dict:
+    """Build the error value Dash's poll handler raises in the browser."""
+    return {
+        "background_callback_error": {
+            "msg": str(exc),
+            "tb": "".join(traceback.format_exception(exc)),
+        }
+    }
@@ -1,23 +1,49 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+
 import dash_mantine_components as dmc
-from dash import html
+from dash import dcc, html
+from dash.development.base_component import Component
 from dash_iconify import DashIconify
 
+from .live import LIVE_INTERVAL
+from .pages import PAGES, Page
 
-def create_layout() -> dmc.AppShell:
+
+def create_layout(
+    name_debounce: int | bool = False,
+    background_jobs: bool = False,
+    live_metrics: bool = False,
+    *,
+    content: Component | None = None,
+    nav_links: list[dmc.NavLink] | None = None,
+) -> dmc.AppShell:
     """
     Dashboard layout using AppShell with header, navbar, footer, and main content.
 
     Responsive design that collapses navbar on mobile devices.
+
+    Args:
+        name_debounce: When ``name-input`` sends its value. ``False`` sends
+            every keystroke, a number waits that many milliseconds after
+            the last keystroke, ``True`` sends on blur or Enter only.
+        background_jobs: Add the background job demo (needs a job
+            manager, see ``dash_lite.jobs``).
+        live_metrics: Add the live metrics chart (needs a feed, see
+            ``dash_lite.live``).
+        content: Main content; the dashboard by default.
+        nav_links: Navbar links, see :func:`create_nav_links`.
     """
     # Theme toggle switch
     theme_switch = dmc.Switch(
         offLabel=DashIconify(
-            icon="radix-icons:sun",
+            icon="tabler:sun",
             width=15,
             color=dmc.DEFAULT_THEME["colors"]["yellow"][8],
         ),
         onLabel=DashIconify(
-            icon="radix-icons:moon",
+            icon="tabler:moon",
             width=15,
             color=dmc.DEFAULT_THEME["colors"]["yellow"][6],
         ),
@@ -60,22 +86,10 @@ def create_layout() -> dmc.AppShell:
                 gap="sm",
                 children=[
                     dmc.Text("Navigation", fw="bold", size="sm", c="gray"),
-                    dmc.NavLink(
-                        label="Dashboard",
-                        leftSection=DashIconify(icon="tabler:home", width=20),
-                        variant="filled",
-                    ),
-                    dmc.NavLink(
-                        label="Analytics",
-                        leftSection=DashIconify(
-                            icon="tabler:chart-bar", width=20
-                        ),
-                    ),
-                    dmc.NavLink(
-                        label="Settings",
-                        leftSection=DashIconify(
-                            icon="tabler:settings", width=20
-                        ),
+                    *(
+                        nav_links
+                        if nav_links is not None
+                        else create_nav_links()
                     ),
                     dmc.Divider(my="sm"),
                     dmc.Text("Demo Controls", fw="bold", size="sm", c="gray"),
@@ -90,78 +104,12 @@ def create_layout() -> dmc.AppShell:
             size="xl",
             py="xl",
             children=[
-                dmc.Stack(
-                    gap="xl",
-                    children=[
-                        # Page header
-                        dmc.Stack(
-                            gap="xs",
-                            children=[
-                                dmc.Title(
-                                    "Welcome to Your Dashboard", order=1
-                                ),
-                                dmc.Text(
-                                    "A flexible, responsive starter template with header, sidebar, and footer",
-                                    size="lg",
-                                    c="gray",
-                                ),
-                            ],
-                        ),
-                        # Controls Section
-                        dmc.Paper(
-                            shadow="xs",
-                            p="lg",
-                            radius="md",
-                            withBorder=True,
-                            children=[
-                                dmc.Stack(
-                                    gap="md",
-                                    children=[
-                                        dmc.Title(
-                                            "Interactive Demo",
-                                            order=2,
-                                            size="h3",
-                                        ),
-                                        dmc.Select(
-                                            id="greeting-style",
-                                            label="Choose a greeting style:",
-                                            data=[
-                                                "friendly",
-                                                "formal",
-                                                "short",
-                                            ],
-                                            value="friendly",
-                                            clearable=False,
-                                        ),
-                                        dmc.TextInput(
-                                            id="name-input",
-                                            label="Your name:",
-                                            placeholder="Type your name",
-                                            value="Friend",
-                                        ),
-                                    ],
-                                ),
-                            ],
-                        ),
-                        # Output Section
-                        dmc.Paper(
-                            shadow="xs",
-                            p="lg",
-                            radius="md",
-                            withBorder=True,
-                            children=[
-                                dmc.Stack(
-                                    gap="md",
-                                    children=[
-                                        dmc.Title(
-                                            "Preview", order=2, size="h3"
-                                        ),
-                                        html.Div(id="greeting-output"),
-                                    ],
-                                ),
-                            ],
-                        ),
-                    ],
+                (
+                    content
+                    if content is not None
+                    else create_dashboard(
+                        name_debounce, background_jobs, live_metrics
+                    )
                 ),
             ],
         ),
@@ -217,3 +165,172 @@ def create_layout() -> dmc.AppShell:
         footer={"height": 60},
         padding="md",
     )
+
+
+def create_dashboard(
+    name_debounce: int | bool = False,
+    background_jobs: bool = False,
+    live_metrics: bool = False,
+) -> dmc.Stack:
+    """
+    Content of the Dashboard page: the greeting demo.
+
+    Args:
+        name_debounce: See :func:`create_layout`.
+        background_jobs: See :func:`create_layout`.
+        live_metrics: See :func:`create_layout`.
+    """
+    # Background job demo
+    job_section = dmc.Paper(
+        shadow="xs",
+        p="lg",
+        radius="md",
+        withBorder=True,
+        children=[
+            dmc.Stack(
+                gap="md",
+                children=[
+                    dmc.Title("Background Job", order=2, size="h3"),
+                    dmc.Group(
+                        gap="sm",
+                        children=[
+                            dmc.Button("Run report", id="job-run"),
+                            dmc.Button(
+                                "Cancel",
+                                id="job-cancel",
+                                variant="outline",
+                                color="red",
+                                disabled=True,
+                            ),
+                        ],
+                    ),
+                    dmc.Progress(id="job-progress", value=0),
+                    dmc.Text(id="job-output", c="gray"),
+                ],
+            ),
+        ],
+    )
+
+    # Live metrics chart, extended with new samples every interval
+    live_section = dmc.Paper(
+        shadow="xs",
+        p="lg",
+        radius="md",
+        withBorder=True,
+        children=[
+            dmc.Title("Live Metrics", order=2, size="h3"),
+            dcc.Graph(
+                id="live-chart",
+                style={"height": 260},
+                config={"displayModeBar": False},
+            ),
+            dcc.Interval(id="live-interval", interval=LIVE_INTERVAL),
+            # Samples the browser has received, per the feed's count
+            dcc.Store(id="live-cursor"),
+        ],
+    )
+
+    return dmc.Stack(
+        gap="xl",
+        children=[
+            # Page header
+            dmc.Stack(
+                gap="xs",
+                children=[
+                    dmc.Title("Welcome to Your Dashboard", order=1),
+                    dmc.Text(
+                        "A flexible, responsive starter template with header, sidebar, and footer",
+                        size="lg",
+                        c="gray",
+                    ),
+                ],
+            ),
+            # Controls Section
+            dmc.Paper(
+                shadow="xs",
+                p="lg",
+                radius="md",
+                withBorder=True,
+                children=[
+                    dmc.Stack(
+                        gap="md",
+                        children=[
+                            dmc.Title(
+                                "Interactive Demo",
+                                order=2,
+                                size="h3",
+                            ),
+                            dmc.Select(
+                                id="greeting-style",
+                                label="Choose a greeting style:",
+                                data=[
+                                    "friendly",
+                                    "formal",
+                                    "short",
+                                ],
+                                value="friendly",
+                                clearable=False,
+                            ),
+                            dmc.TextInput(
+                                id="name-input",
+                                label="Your name:",
+                                placeholder="Type your name",
+                                value="Friend",
+                                debounce=name_debounce,
+                            ),
+                        ],
+                    ),
+                ],
+            ),
+            # Output Section
+            dmc.Paper(
+                shadow="xs",
+                p="lg",
+                radius="md",
+                withBorder=True,
+                children=[
+                    dmc.Stack(
+                        gap="md",
+                        children=[
+                            dmc.Title("Preview", order=2, size="h3"),
+                            html.Div(id="greeting-output"),
+                        ],
+                    ),
+                ],
+            ),
+            *([job_section] if background_jobs else []),
+            *([live_section] if live_metrics else []),
+        ],
+    )
+
+
+def create_nav_links(
+    current: Page | None = None, href: Callable[[str], str] | None = None
+) -> list[dmc.NavLink]:
+    """
+    Navbar links, one per page in :data:`dash_lite.pages.PAGES`.
+
+    Args:
+        current: Page shown, highlighted in the navbar.
+        href: Maps a page path to its URL. Without it the links lead
+            nowhere (single-page app).
+    """
+    links = []
+    for page in PAGES:
+        link = dmc.NavLink(
+            label=page.label,
+            leftSection=DashIconify(icon=page.icon, width=20),
+        )
+        if href is None:
+            # Single-page app: the dashboard is always the one shown
+            if page is PAGES[0]:
+                link.variant = "filled"
+        else:
+            link.href = href(page.path)
+            link.active = page == current
+            link.variant = "filled"
+            # Load pages in full, so that the page's layout is sent with
+            # its content instead of being swapped in by the router
+            link.refresh = True
+        links.append(link)
+    return links
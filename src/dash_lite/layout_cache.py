@@ -0,0 +1,124 @@
+"""
+Serve ``/_dash-layout`` from bytes serialized once at startup.
+
+Dash re-serializes ``app.layout`` with ``to_plotly_json`` on every layout
+request, walking the whole component tree each time even though the
+layout is static. :class:`LayoutCache` serializes it once, keeps the
+bytes (and optionally a gzip copy), and answers repeat requests carrying a
+matching ``If-None-Match`` with ``304 Not Modified``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from typing import Any
+
+import flask
+from dash import Dash
+from dash._utils import to_json
+
+
+class LayoutCache:
+    """
+    Pre-serialized layout response for a Dash app.
+
+    Args:
+        app: The Dash app whose layout is served.
+        compress: Also keep a gzip copy, sent to clients that accept it.
+        layout: Layout to serve instead of ``app.layout``.
+    """
+
+    def __init__(
+        self, app: Dash, compress: bool = False, layout: Any = None
+    ) -> None:
+        self.app = app
+        self.compress = compress
+        self.layout = layout
+        # (body, ETag, gzip body), replaced as a whole so that requests
+        # never pair a body with another one's ETag
+        self._response: tuple[bytes, str, bytes | None] = (b"", "", None)
+        self._lock = threading.Lock()
+        self.refresh()
+
+    @property
+    def body(self) -> bytes:
+        """The serialized layout."""
+        return self._response[0]
+
+    @property
+    def etag(self) -> str:
+        """Strong ETag of :attr:`body`."""
+        return self._response[1]
+
+    @property
+    def gzip_body(self) -> bytes | None:
+        """gzip copy of :attr:`body`, if kept."""
+        return self._response[2]
+
+    def serialize(self) -> bytes:
+        """Serialize the layout exactly as ``Dash.serve_layout`` would."""
+        layout = (
+            self.layout
+            if self.layout is not None
+            else self.app._layout_value()
+        )
+        for hook in self.app._hooks.get_hooks("layout"):
+            layout = hook(layout)
+        return to_json(layout).encode("utf-8")
+
+    def compressed(self, body: bytes) -> bytes | None:
+        """Return the gzip copy of ``body`` to keep, if any."""
+        return gzip.compress(body, mtime=0) if self.compress else None
+
+    def refresh(self) -> None:
+        """
+        Re-serialize the layout, e.g. after ``app.layout`` changed.
+
+        Requests served meanwhile get the previous bytes.
+        """
+        with self._lock:
+            body = self.serialize()
+            self._response = (
+                body,
+                hashlib.sha256(body).hexdigest(),
+                self.compressed(body),
+            )
+
+    def serve(self) -> flask.Response:
+        """Flask view replacing Dash's ``/_dash-layout`` handler."""
+        request = flask.request
+        body, etag, gzip_body = self._response
+        use_gzip = gzip_body is not None and "gzip" in request.headers.get(
+            "Accept-Encoding", ""
+        )
+        response = flask.Response(
+            gzip_body if use_gzip else body,
+            mimetype="application/json",
+        )
+        if use_gzip:
+            response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+        # Always revalidate, but let the ETag turn repeats into 304s. A
+        # strong ETag names one representation: the gzip copy has its own
+        response.cache_control.no_cache = True
+        response.set_etag(f"{etag}-gzip" if use_gzip else etag)
+        return response.make_conditional(request)
+
+
+def install_layout_cache(app: Dash, compress: bool = False) -> LayoutCache:
+    """
+    Serialize the app layout now and serve it from cache from then on.
+
+    Args:
+        app: Dash app with its layout already assigned.
+        compress: Also store a gzip copy of the serialized layout.
+
+    Returns:
+        The installed cache, so callers can ``refresh()`` it.
+    """
+    cache = LayoutCache(app, compress=compress)
+    endpoint = app.config.routes_pathname_prefix + "_dash-layout"
+    app.server.view_functions[endpoint] = cache.serve
+    return cache
@@ -0,0 +1,125 @@
+"""
+Live metrics chart fed from a :class:`~dash_lite.ringbuffer.RingBuffer`.
+
+Samples reach the buffer from any process that opens its file, or over
+HTTP when the feed is given a secret: ``POST /api/live`` with
+``Authorization: Bearer <secret>`` takes one sample or a list of them as
+JSON::
+
+    {"values": [12.5], "timestamp": 1717171717000}
+
+(``values`` may be a single number, ``timestamp`` is optional and in
+milliseconds since the epoch). Every viewer and worker shares the
+buffer, so without a secret there is no HTTP endpoint at all. The Dashboard's live chart then polls
+the buffer with its cursor and receives only the samples written since,
+appended to its traces with ``extendData`` instead of a new figure (see
+:func:`dash_lite.callbacks.register_callbacks`).
+"""
+
+from __future__ import annotations
+
+import hmac
+from typing import Any
+
+import flask
+from dash import Dash
+
+from .ringbuffer import RingBuffer, Samples
+
+# Samples shown by the chart; older ones scroll out
+LIVE_POINTS = 3600
+
+# Milliseconds between two polls of the chart
+LIVE_INTERVAL = 1000
+
+
+def live_figure(samples: Samples) -> dict[str, Any]:
+    """Figure of one trace per column, holding ``samples``."""
+    return {
+        "data": [
+            {
+                "type": "scattergl",
+                "mode": "lines",
+                "x": samples.timestamps,
+                "y": values,
+                "line": {"width": 1},
+            }
+            for values in samples.values
+        ],
+        "layout": {
+            "xaxis": {"type": "date"},
+            "showlegend": len(samples.values) > 1,
+            "margin": {"l": 40, "r": 10, "t": 10, "b": 30},
+            "paper_bgcolor": "rgba(0,0,0,0)",
+            "plot_bgcolor": "rgba(0,0,0,0)",
+            "font": {"color": "#909296"},
+        },
+    }
+
+
+def extend_data(samples: Samples) -> list[Any]:
+    """``extendData`` appending ``samples`` to the figure's traces."""
+    return [
+        {
+            "x": [samples.timestamps] * len(samples.values),
+            "y": samples.values,
+        },
+        list(range(len(samples.values))),
+        LIVE_POINTS,
+    ]
+
+
+def _parse_samples(body: Any) -> list[tuple[float | None, Any]]:
+    """
+    Read the samples of an ingestion request.
+
+    Raises:
+        ValueError: The body is not a sample or a list of samples.
+    """
+    entries = body if isinstance(body, list) else [body]
+    samples = []
+    for entry in entries:
+        if not isinstance(entry, dict) or "values" not in entry:
+            raise ValueError(f"expected {{'values': ...}}, got {entry!r}")
+        samples.append((entry.get("timestamp"), entry["values"]))
+    return samples
+
+
+def install_live_feed(
+    app: Dash, feed: RingBuffer, secret: str | None = None
+) -> None:
+    """
+    Make ``feed`` available to the live chart, and to writers over HTTP.
+
+    The feed is available as ``app.server.extensions["dash_lite.live"]``.
+
+    Args:
+        app: The Dash app.
+        feed: Ring buffer shown by the chart.
+        secret: Bearer token of the ingestion endpoint at ``/api/live``,
+            which is only served when one is given.
+    """
+    app.server.extensions["dash_lite.live"] = feed
+    if not secret:
+        return
+
+    def ingest() -> flask.Response:
+        authorization = flask.request.headers.get("Authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode(), f"Bearer {secret}".encode()
+        ):
+            flask.abort(401)
+        try:
+            written = feed.extend(
+                _parse_samples(flask.request.get_json(force=True))
+            )
+        except (TypeError, ValueError) as error:
+            flask.abort(400, str(error))
+        return flask.jsonify({"written": written})
+
+    app.server.add_url_rule(
+        app.config.routes_pathname_prefix + "api/live",
+        endpoint="dash_lite_live",
+        view_func=ingest,
+        methods=["POST"],
+    )
@@ -0,0 +1,333 @@
+"""
+Per-callback latency and payload-size instrumentation.
+
+:class:`CallbackMetrics` hooks into ``app.callback`` so every callback
+registered afterwards is timed. For each call it records
+
+- wall time of the whole callback (user code plus Dash's output handling),
+- serialization time (the part spent after the user function returned,
+  mostly turning the result into JSON),
+- request and response body sizes,
+
+into histograms labelled with the callback function name. They can be
+scraped in Prometheus text format from ``/metrics`` and/or written as one
+structured log line per call.
+
+Nothing is wrapped unless instrumentation is enabled, so a disabled app
+runs exactly the callables Dash registered.
+"""
+
+from __future__ import annotations
+
+import bisect
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any
+
+import flask
+from dash import Dash
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Time spent in the user function of the callback currently running
+_compute_seconds: contextvars.ContextVar[list[float] | None] = (
+    contextvars.ContextVar("dash_lite_compute_seconds", default=None)
+)
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram with one label.
+
+    Args:
+        name: Metric name.
+        documentation: ``# HELP`` text.
+        buckets: Sorted upper bounds; ``+Inf`` is added automatically.
+        label: Name of the label distinguishing series.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        label: str = "callback",
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.label = label
+        # label value -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: dict[str, tuple[list[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        """Record one observation."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._series.get(
+                label_value, ([0] * (len(self.buckets) + 1), 0.0, 0)
+            )
+            counts[index] += 1
+            self._series[label_value] = (counts, total + value, count + 1)
+
+    def count(self, label_value: str) -> int:
+        """Return the number of observations for a label value."""
+        with self._lock:
+            series = self._series.get(label_value)
+        return series[2] if series else 0
+
+    def render(self) -> list[str]:
+        """Return the metric in Prometheus text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_value, (counts, total, count) in series:
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            bounds = [*map(_format_bound, self.buckets), "+Inf"]
+            for bound, bucket_count in zip(bounds, counts, strict=True):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+def _format_bound(bound: float) -> str:
+    """Format a bucket bound the way Prometheus clients do."""
+    return str(float(bound))
+
+
+class CallbackMetrics:
+    """
+    Latency and payload histograms for the callbacks of one app.
+
+    Args:
+        log: Also write one JSON log line per callback call to the
+            ``dash_lite.metrics`` logger.
+    """
+
+    def __init__(self, log: bool = False) -> None:
+        self.log = log
+        self.duration = Histogram(
+            "dash_lite_callback_duration_seconds",
+            "Wall time of a callback request.",
+            DURATION_BUCKETS,
+        )
+        self.serialization = Histogram(
+            "dash_lite_callback_serialization_seconds",
+            "Time spent preparing and serializing the callback response.",
+            DURATION_BUCKETS,
+        )
+        self.request_bytes = Histogram(
+            "dash_lite_callback_request_bytes",
+            "Size of the callback request body.",
+            SIZE_BUCKETS,
+        )
+        self.response_bytes = Histogram(
+            "dash_lite_callback_response_bytes",
+            "Size of the callback response body.",
+            SIZE_BUCKETS,
+        )
+
+    def render(self) -> str:
+        """Return all metrics in Prometheus text exposition format."""
+        lines: list[str] = []
+        for histogram in (
+            self.duration,
+            self.serialization,
+            self.request_bytes,
+            self.response_bytes,
+        ):
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+    def record(
+        self,
+        name: str,
+        duration: float,
+        serialization: float,
+        request_bytes: int,
+        response_bytes: int,
+    ) -> None:
+        """Record one callback call."""
+        self.duration.observe(name, duration)
+        self.serialization.observe(name, serialization)
+        self.request_bytes.observe(name, request_bytes)
+        self.response_bytes.observe(name, response_bytes)
+        if self.log:
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "callback",
+                        "callback": name,
+                        "duration_ms": round(duration * 1000, 3),
+                        "serialization_ms": round(serialization * 1000, 3),
+                        "request_bytes": request_bytes,
+                        "response_bytes": response_bytes,
+                    }
+                )
+            )
+
+    def instrument(self, app: Dash) -> None:
+        """
+        Time every callback registered on ``app`` from now on.
+
+        Call this before the callbacks are registered.
+        """
+        register = app.callback
+
+        @functools.wraps(register)
+        def callback(*args: Any, **kwargs: Any) -> Callable:
+            decorator = register(*args, **kwargs)
+
+            def instrumented(func: Callable[..., Any]) -> Callable[..., Any]:
+                result = decorator(_time_compute(func))
+                # Dash stored its request handler for the callback just
+                # registered under the newest callback id
+                callback_id = app._callback_list[-1]["output"]
+                entry = app.callback_map[callback_id]
+                entry["callback"] = self._time_request(
+                    entry["callback"], func.__name__
+                )
+                return result
+
+            return instrumented
+
+        app.callback = callback  # type: ignore[method-assign]
+
+    def _time_request(
+        self, handler: Callable[..., Any], name: str
+    ) -> Callable[..., Any]:
+        """Wrap Dash's per-callback request handler."""
+
+        @contextlib.contextmanager
+        def timing() -> Iterator[list[Any]]:
+            compute: list[float] = []
+            token = _compute_seconds.set(compute)
+            start = time.perf_counter()
+            # Handlers put their response in here
+            response: list[Any] = []
+            try:
+                yield response
+            finally:
+                duration = time.perf_counter() - start
+                _compute_seconds.reset(token)
+                self.record(
+                    name,
+                    duration,
+                    max(duration - sum(compute), 0.0) if compute else 0.0,
+                    flask.request.content_length or 0,
+                    (
+                        len(response[0].encode("utf-8"))
+                        if response and isinstance(response[0], str)
+                        else 0
+                    ),
+                )
+
+        # Dash registers a coroutine handler for ``async def`` callbacks
+        if inspect.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def timed_async(*args: Any, **kwargs: Any) -> Any:
+                with timing() as response:
+                    response.append(await handler(*args, **kwargs))
+                    return response[0]
+
+            return timed_async
+
+        @functools.wraps(handler)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with timing() as response:
+                response.append(handler(*args, **kwargs))
+                return response[0]
+
+        return timed
+
+
+def _time_compute(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a user callback to report how long it ran."""
+
+    def report(start: float) -> None:
+        compute = _compute_seconds.get()
+        if compute is not None:
+            compute.append(time.perf_counter() - start)
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def timed_async(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                report(start)
+
+        return timed_async
+
+    @functools.wraps(func)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            report(start)
+
+    return timed
+
+
+def install_metrics_endpoint(
+    app: Dash, metrics: CallbackMetrics, *collectors: Any
+) -> None:
+    """
+    Serve ``metrics`` in Prometheus text format at ``/metrics``.
+
+    Args:
+        app: The Dash app.
+        metrics: Callback metrics.
+        collectors: More objects whose ``render()`` returns metrics in
+            the same format, e.g. an ``AdmissionControl``.
+    """
+
+    def serve_metrics() -> flask.Response:
+        return flask.Response(
+            "".join(source.render() for source in (metrics, *collectors)),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    app.server.add_url_rule(
+        app.config.routes_pathname_prefix + "metrics",
+        endpoint="dash_lite_metrics",
+        view_func=serve_metrics,
+    )
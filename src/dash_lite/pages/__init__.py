@@ -0,0 +1,46 @@
+"""
+Pages behind the navbar links.
+
+Each page is a module of this package with a ``layout(**options)``
+factory and, optionally, a ``register_callbacks(app)`` function.
+:class:`dash_lite.routing.PageRouter` registers every page's callbacks
+when it is installed, and builds a page's layout when the page is first
+requested.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Page:
+    """
+    A navbar entry and the module rendering it.
+
+    Args:
+        path: URL path, relative to the app's prefix.
+        label: Navbar label.
+        icon: Iconify icon name of the navbar link.
+        module: Module with the ``layout`` factory.
+    """
+
+    path: str
+    label: str
+    icon: str
+    module: str
+
+
+# The first page is the home page, also shown for unknown paths
+PAGES = (
+    Page("/", "Dashboard", "tabler:home", "dash_lite.pages.dashboard"),
+    Page(
+        "/analytics",
+        "Analytics",
+        "tabler:chart-bar",
+        "dash_lite.pages.analytics",
+    ),
+    Page(
+        "/settings", "Settings", "tabler:settings", "dash_lite.pages.settings"
+    ),
+)
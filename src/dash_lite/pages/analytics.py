@@ -0,0 +1,269 @@
+"""Analytics page: weekly traffic chart and the full traffic history."""
+
+from __future__ import annotations
+
+import importlib.util
+import math
+import threading
+from typing import TYPE_CHECKING, Any
+
+import dash_mantine_components as dmc
+from dash import Dash, Input, Output, State, dcc, no_update
+
+if TYPE_CHECKING:
+    from dash_lite.timeseries import Pyramid
+
+METRICS = {
+    "visits": ("Visits", "blue.6"),
+    "signups": ("Sign-ups", "teal.6"),
+}
+
+WEEKLY_TRAFFIC = [
+    {"day": "Mon", "visits": 1200, "signups": 32},
+    {"day": "Tue", "visits": 1350, "signups": 41},
+    {"day": "Wed", "visits": 1280, "signups": 38},
+    {"day": "Thu", "visits": 1510, "signups": 52},
+    {"day": "Fri", "visits": 1440, "signups": 47},
+    {"day": "Sat", "visits": 860, "signups": 19},
+    {"day": "Sun", "visits": 790, "signups": 17},
+]
+
+# The history chart needs NumPy, from the `timeseries` extra
+HISTORY = importlib.util.find_spec("numpy") is not None
+
+# One point per second, about 23 days
+HISTORY_POINTS = 2_000_000
+HISTORY_START_MS = 1_704_067_200_000.0  # 2024-01-01
+
+# Chart widths in pixels; the browser reports it, so it is bounded here
+MIN_WIDTH = 100
+MAX_WIDTH = 4096
+
+_histories: dict[str, Pyramid] = {}
+_histories_lock = threading.Lock()
+
+
+def layout(**_options: Any) -> dmc.Stack:
+    """Build the page."""
+    return dmc.Stack(
+        gap="xl",
+        children=[
+            dmc.Title("Analytics", order=1),
+            dmc.Paper(
+                shadow="xs",
+                p="lg",
+                radius="md",
+                withBorder=True,
+                children=dmc.Stack(
+                    gap="md",
+                    children=[
+                        dmc.SegmentedControl(
+                            id="analytics-metric",
+                            data=[
+                                {"value": key, "label": label}
+                                for key, (label, _) in METRICS.items()
+                            ],
+                            value="visits",
+                        ),
+                        dmc.BarChart(
+                            id="analytics-chart",
+                            h=300,
+                            dataKey="day",
+                            data=WEEKLY_TRAFFIC,
+                            series=_series("visits"),
+                        ),
+                    ],
+                ),
+            ),
+            *([_history_panel()] if HISTORY else []),
+        ],
+    )
+
+
+def _history_panel() -> dmc.Paper:
+    """Chart of the full history, downsampled to its width on each zoom."""
+    return dmc.Paper(
+        shadow="xs",
+        p="lg",
+        radius="md",
+        withBorder=True,
+        children=[
+            dcc.Graph(id="analytics-history", style={"height": 320}),
+            # The visible range and width, set in the browser
+            dcc.Store(id="analytics-history-view"),
+        ],
+    )
+
+
+def _series(metric: str) -> list[dict[str, str]]:
+    """Chart series showing one metric."""
+    label, color = METRICS[metric]
+    return [{"name": metric, "label": label, "color": color}]
+
+
+def register_callbacks(app: Dash) -> None:
+    """Register the callbacks of the page."""
+
+    @app.callback(
+        Output("analytics-chart", "series"),
+        Input("analytics-metric", "value"),
+        prevent_initial_call=True,
+    )
+    def select_metric(metric: str) -> list[dict[str, str]]:
+        """Show the chosen metric."""
+        return _series(metric)
+
+    if not HISTORY:
+        return
+
+    # Zooming and panning report the new x range; autoscale resets it
+    app.clientside_callback(
+        """
+        (relayout, view) => {
+            relayout = relayout || {};
+            let range = relayout['xaxis.range'];
+            if (range === undefined && 'xaxis.range[0]' in relayout) {
+                range = [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']];
+            }
+            if (range === undefined && !relayout['xaxis.autorange'] && view) {
+                return window.dash_clientside.no_update;
+            }
+            const graph = document.getElementById('analytics-history');
+            return {dates: range || null, width: graph ? graph.offsetWidth : 1000};
+        }
+        """,
+        Output("analytics-history-view", "data"),
+        Input("analytics-history", "relayoutData"),
+        State("analytics-history-view", "data"),
+    )
+
+    @app.callback(
+        Output("analytics-history", "figure"),
+        Input("analytics-history-view", "data"),
+        Input("analytics-metric", "value"),
+    )
+    def show_history(view: Any, metric: Any) -> dict[str, Any]:
+        """Downsample the visible part of the history to the chart width."""
+        read = _read_view(view)
+        if read is None or metric not in METRICS:
+            return no_update
+        try:
+            return history_figure(metric, *read)
+        except ValueError:
+            # Dates that do not parse
+            return no_update
+
+
+def _read_view(view: Any) -> tuple[list[str] | None, int] | None:
+    """
+    The dates and width of the history view the browser stored.
+
+    Returns:
+        ``(dates, width)``, or ``None`` if ``view`` is not a view: the
+        store can be written by the client.
+    """
+    if view is None:
+        return None, 1000
+    if not isinstance(view, dict):
+        return None
+    dates, width = view.get("dates"), view.get("width", 1000)
+    if dates is not None and not (
+        isinstance(dates, list)
+        and len(dates) == 2
+        and all(isinstance(date, str) for date in dates)
+    ):
+        return None
+    if (
+        isinstance(width, bool)
+        or not isinstance(width, int | float)
+        or not math.isfinite(width)
+    ):
+        return None
+    return dates, int(width)
+
+
+def history(metric: str) -> Pyramid:
+    """
+    Return the history of a metric, generated and indexed on first use.
+
+    Demo data: a daily cycle, a weekend dip, noise and rare spikes.
+    """
+    pyramid = _histories.get(metric)
+    if pyramid is not None:
+        return pyramid
+
+    import numpy as np
+
+    from dash_lite.timeseries import Pyramid
+
+    rng = np.random.default_rng(list(METRICS).index(metric))
+    seconds = np.arange(HISTORY_POINTS, dtype=np.float64)
+    days = seconds / 86_400
+    scale = 40.0 if metric == "visits" else 1.2
+    values = scale * (
+        1.0
+        + 0.6 * np.sin(2 * np.pi * (days - 0.3))
+        - 0.4 * (np.floor(days) % 7 >= 5)
+        + 0.15 * rng.standard_normal(HISTORY_POINTS)
+    )
+    spikes = rng.integers(0, HISTORY_POINTS, 50)
+    values[spikes] += scale * rng.uniform(2, 6, spikes.size)
+    pyramid = Pyramid(HISTORY_START_MS + seconds * 1000, values.clip(0))
+    with _histories_lock:
+        return _histories.setdefault(metric, pyramid)
+
+
+def history_figure(
+    metric: str,
+    dates: list[str] | None = None,
+    width: int = 1000,
+) -> dict[str, Any]:
+    """
+    Figure of the history of ``metric`` between two dates.
+
+    Args:
+        metric: Key of :data:`METRICS`.
+        dates: First and last visible date as plotly reports them, or
+            ``None`` for all.
+        width: Chart width in pixels, clamped to ``MIN_WIDTH`` to
+            ``MAX_WIDTH``.
+    """
+    import numpy as np
+
+    from dash_lite.timeseries import typed_array
+
+    start = end = None
+    if dates:
+        start, end = (
+            float(np.datetime64(date.replace(" ", "T"), "ms").astype(np.int64))
+            for date in dates
+        )
+    width = min(max(int(width), MIN_WIDTH), MAX_WIDTH)
+    x, y = history(metric).view(start, end, width=width)
+    label, color = METRICS[metric]
+    return {
+        "data": [
+            {
+                "type": "scattergl",
+                "mode": "lines",
+                "name": label,
+                "x": typed_array(x),
+                "y": typed_array(y, "f4"),
+                "line": {"width": 1, "color": _PLOT_COLORS[color]},
+            }
+        ],
+        "layout": {
+            # Keeps the user's zoom when the data is replaced
+            "uirevision": metric,
+            "xaxis": {"type": "date"},
+            "yaxis": {"title": {"text": label}, "rangemode": "tozero"},
+            "margin": {"l": 50, "r": 10, "t": 10, "b": 30},
+            "paper_bgcolor": "rgba(0,0,0,0)",
+            "plot_bgcolor": "rgba(0,0,0,0)",
+            "font": {"color": "#909296"},
+        },
+    }
+
+
+# Mantine palette colors used by METRICS, for plotly
+_PLOT_COLORS = {"blue.6": "#228be6", "teal.6": "#12b886"}
@@ -0,0 +1,22 @@
+"""Dashboard page: the greeting demo."""
+
+from __future__ import annotations
+
+import dash_mantine_components as dmc
+
+from ..layout import create_dashboard
+
+
+def layout(
+    name_debounce: int | bool = False,
+    background_jobs: bool = False,
+    live_metrics: bool = False,
+) -> dmc.Stack:
+    """
+    Build the page.
+
+    Its callbacks are registered with the app's by
+    :func:`dash_lite.callbacks.register_callbacks`, since they depend on
+    the app options (coalescing, caching, greeting mode, live feed).
+    """
+    return create_dashboard(name_debounce, background_jobs, live_metrics)
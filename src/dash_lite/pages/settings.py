@@ -0,0 +1,63 @@
+"""Settings page: demo preferences form."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import dash_mantine_components as dmc
+from dash import Dash, Input, Output, State
+
+
+def layout(**_options: Any) -> dmc.Stack:
+    """Build the page."""
+    return dmc.Stack(
+        gap="xl",
+        children=[
+            dmc.Title("Settings", order=1),
+            dmc.Paper(
+                shadow="xs",
+                p="lg",
+                radius="md",
+                withBorder=True,
+                children=dmc.Stack(
+                    gap="md",
+                    children=[
+                        dmc.TextInput(
+                            id="settings-display-name",
+                            label="Display name:",
+                            value="Friend",
+                        ),
+                        dmc.Switch(
+                            id="settings-notifications",
+                            label="Email notifications",
+                            checked=False,
+                        ),
+                        dmc.Group(
+                            children=[
+                                dmc.Button("Save", id="settings-save"),
+                                dmc.Text(id="settings-status", c="gray"),
+                            ]
+                        ),
+                    ],
+                ),
+            ),
+        ],
+    )
+
+
+def register_callbacks(app: Dash) -> None:
+    """Register the callbacks of the page."""
+
+    @app.callback(
+        Output("settings-status", "children"),
+        Input("settings-save", "n_clicks"),
+        State("settings-display-name", "value"),
+        State("settings-notifications", "checked"),
+        prevent_initial_call=True,
+    )
+    def save_settings(
+        _n_clicks: int, display_name: str, notifications: bool
+    ) -> str:
+        """Confirm the (demo, not persisted) settings."""
+        state = "on" if notifications else "off"
+        return f"Saved for {display_name or 'Friend'}, notifications {state}."
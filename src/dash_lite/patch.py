@@ -0,0 +1,78 @@
+"""
+Send only the changed parts of large callback outputs.
+
+A callback returning a whole dict or list makes Dash serialize and send
+all of it, even when one nested key changed. Dash's ``Patch`` describes
+in-place updates instead; :func:`diff_patch` builds one from the previous
+and the new value of an output, so a callback can keep computing the full
+value and still send just the delta.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from dash import Patch, no_update
+
+
+def diff_patch(old: Any, new: Any) -> Any:
+    """
+    Describe the change from ``old`` to ``new`` as small as possible.
+
+    Dicts are compared key by key and lists item by item, recursively;
+    added list items are appended and removed ones deleted. Anything else
+    is sent whole.
+
+    Args:
+        old: Previous value of the output, e.g. from a ``State``.
+        new: Value the callback would return.
+
+    Returns:
+        ``no_update`` if nothing changed, a ``Patch`` if ``old`` and ``new``
+        are both dicts or both lists, otherwise ``new``.
+    """
+    if old == new:
+        return no_update
+    if not _patchable(old, new):
+        return new
+    patch = Patch()
+    _diff_into(patch, old, new)
+    return patch
+
+
+def _patchable(old: Any, new: Any) -> bool:
+    """Tell whether ``old`` can be turned into ``new`` in place."""
+    return (isinstance(old, dict) and isinstance(new, dict)) or (
+        isinstance(old, list) and isinstance(new, list)
+    )
+
+
+def _diff_into(patch: Patch, old: Any, new: Any) -> None:
+    """Add the operations turning ``old`` into ``new`` to ``patch``."""
+    if isinstance(old, dict):
+        for key in old.keys() - new.keys():
+            del patch[key]
+        for key, value in new.items():
+            if key not in old:
+                patch[key] = value
+            elif old[key] != value:
+                _diff_item(patch, key, old[key], value)
+        return
+
+    common = min(len(old), len(new))
+    for index in range(common):
+        if old[index] != new[index]:
+            _diff_item(patch, index, old[index], new[index])
+    if len(new) > common:
+        patch.extend(new[common:])
+    # Last first, so the remaining indexes stay valid
+    for index in reversed(range(common, len(old))):
+        del patch[index]
+
+
+def _diff_item(patch: Patch, key: str | int, old: Any, new: Any) -> None:
+    """Update one changed entry, descending into nested containers."""
+    if _patchable(old, new):
+        _diff_into(patch[key], old, new)
+    else:
+        patch[key] = new
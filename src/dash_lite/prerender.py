@@ -0,0 +1,295 @@
+"""
+Prerendered HTML shell shown while the Dash app loads.
+
+A Dash index page is empty until the browser has downloaded and run the
+JavaScript bundles and fetched ``/_dash-layout``; only then is the
+``AppShell`` rendered. :func:`install_prerender` renders the static parts
+of the layout to HTML once at startup (header, navbar and footer as they
+are, the main content as a skeleton: headings kept, inputs and outputs
+as placeholder bars) and embeds it in every index response, so the shell
+paints with the first response.
+
+Dash's renderer builds the page from the layout JSON on the client and
+cannot hydrate server markup, so the prerendered shell is an overlay: a
+small inline script removes it as soon as React has rendered the real
+layout.
+"""
+
+from __future__ import annotations
+
+import functools
+import html
+from typing import Any
+
+from dash import Dash
+from dash.development.base_component import Component
+
+from .icons import load_icon_sets
+
+# Mantine's dark scheme, the app's default
+_CSS = """
+#dash-lite-prerender{position:fixed;inset:0;z-index:10000;overflow:hidden;
+background:#242424;color:#c9c9c9;font-size:16px;line-height:1.55;
+font-family:-apple-system,BlinkMacSystemFont,Segoe UI,Roboto,Helvetica,
+Arial,sans-serif}
+#dash-lite-prerender *{box-sizing:border-box;margin:0}
+#dash-lite-prerender header,#dash-lite-prerender nav,
+#dash-lite-prerender main,#dash-lite-prerender footer{position:absolute}
+#dash-lite-prerender header{top:0;left:0;right:0;height:{header}px;
+border-bottom:1px solid #424242}
+#dash-lite-prerender nav{top:{header}px;bottom:{footer}px;left:0;
+width:{navbar}px;padding:16px;border-right:1px solid #424242}
+#dash-lite-prerender main{top:{header}px;bottom:{footer}px;left:{navbar}px;
+right:0;padding:16px;overflow:hidden}
+#dash-lite-prerender footer{bottom:0;left:0;right:0;height:{footer}px;
+padding:16px;border-top:1px solid #424242}
+#dash-lite-prerender header>.dl-group{height:100%;padding:0 16px}
+.dl-group{display:flex;align-items:center;gap:12px}
+.dl-between{justify-content:space-between}
+.dl-stack{display:flex;flex-direction:column;gap:16px}
+.dl-container{max-width:1320px;margin:0 auto;padding:32px 16px}
+.dl-paper{border:1px solid #424242;border-radius:8px;padding:20px}
+.dl-text{font-size:16px}.dl-sm{font-size:14px}.dl-lg{font-size:18px}
+.dl-bold{font-weight:700}.dl-dimmed{color:#828282}
+.dl-title{color:#fff;line-height:1.3}.dl-blue{color:#4dabf7}
+h1.dl-title{font-size:34px}h2.dl-title{font-size:26px}
+h3.dl-title{font-size:22px}
+.dl-navlink{display:flex;align-items:center;gap:12px;padding:8px 12px;
+color:inherit;text-decoration:none;font-size:14px}
+.dl-active{background:#1971c2;color:#fff}
+.dl-icon{display:inline-flex;flex:none}
+.dl-label{display:block;font-size:14px;font-weight:500;margin-bottom:4px}
+.dl-skeleton{display:block;height:36px;border-radius:4px;background:#2e2e2e}
+.dl-switch{width:52px;height:26px;border-radius:13px}
+.dl-burger{width:22px;height:16px}
+.dl-mobile{display:none}
+hr.dl-divider{border:0;border-top:1px solid #424242;margin:12px 0}
+@media (max-width:48em){#dash-lite-prerender nav{display:none}
+#dash-lite-prerender main{left:0}.dl-mobile{display:inline-flex}}
+"""
+
+# Removes the overlay once React rendered the component with this id
+_SCRIPT = """
+(function(){var s=document.getElementById('dash-lite-prerender'),
+e=document.getElementById('react-entry-point');if(!s||!e)return;
+function done(){return !!document.getElementById(%s)}
+var o=new MutationObserver(function(){if(done()){o.disconnect();s.remove()}});
+o.observe(e,{childList:true,subtree:true});
+setTimeout(function(){o.disconnect();s.remove()},30000)})();
+"""
+
+_SECTIONS = {
+    "AppShellHeader": "header",
+    "AppShellNavbar": "nav",
+    "AppShellMain": "main",
+    "AppShellFooter": "footer",
+}
+
+# Components standing for data or input: drawn as placeholder bars
+_PLACEHOLDERS = {
+    "Select",
+    "TextInput",
+    "Textarea",
+    "NumberInput",
+    "SegmentedControl",
+    "Button",
+    "Progress",
+    "BarChart",
+    "LineChart",
+    "Graph",
+}
+
+_SIZES = {"xs": "dl-sm", "sm": "dl-sm", "lg": "dl-lg", "xl": "dl-lg"}
+
+
+class _Renderer:
+    """Turns a Dash component tree into static HTML."""
+
+    def __init__(self, icon_sets: dict[str, dict]) -> None:
+        self.icon_sets = icon_sets
+
+    def render(self, node: Any) -> str:
+        if node is None or isinstance(node, bool):
+            return ""
+        if isinstance(node, (str, int, float)):
+            return html.escape(str(node))
+        if isinstance(node, (list, tuple)):
+            return "".join(self.render(child) for child in node)
+        if isinstance(node, Component):
+            return self.component(node)
+        return ""
+
+    def component(self, node: Component) -> str:
+        kind = node._type
+        prop = functools.partial(getattr, node)
+        children = self.render(prop("children", None))
+
+        if kind == "DashIconify":
+            return self.icon(node.icon, prop("width", None) or 16)
+        if kind in _SECTIONS:
+            return f"<{_SECTIONS[kind]}>{children}</{_SECTIONS[kind]}>"
+        if kind == "Title":
+            order = prop("order", None) or 1
+            color = " dl-blue" if prop("c", None) == "blue" else ""
+            return f'<h{order} class="dl-title{color}">{children}</h{order}>'
+        if kind in ("Text", "Anchor"):
+            classes = ["dl-text", _SIZES.get(prop("size", None), "")]
+            if prop("fw", None) in ("bold", 700):
+                classes.append("dl-bold")
+            if prop("c", None) in ("gray", "dimmed"):
+                classes.append("dl-dimmed")
+            classes = " ".join(filter(None, classes))
+            return f'<p class="{classes}">{children}</p>'
+        if kind == "NavLink":
+            active = " dl-active" if prop("active", None) else ""
+            href = html.escape(prop("href", None) or "#", quote=True)
+            return (
+                f'<a class="dl-navlink{active}" href="{href}">'
+                f'{self.render(prop("leftSection", None))}'
+                f'<span>{self.render(prop("label", None))}</span></a>'
+            )
+        if kind == "Group":
+            between = (
+                " dl-between"
+                if prop("justify", None) == "space-between"
+                else ""
+            )
+            return f'<div class="dl-group{between}">{children}</div>'
+        if kind in ("Stack", "Container", "Paper"):
+            return f'<div class="dl-{kind.lower()}">{children}</div>'
+        if kind == "Divider":
+            return '<hr class="dl-divider"/>'
+        if kind == "Burger":
+            return '<span class="dl-skeleton dl-burger dl-mobile"></span>'
+        if kind == "Switch":
+            return '<span class="dl-skeleton dl-switch"></span>'
+        if kind == "ActionIcon":
+            return f'<span class="dl-icon">{children}</span>'
+        if kind in _PLACEHOLDERS:
+            label = prop("label", None)
+            return (
+                f'<div>{self.label(label)}<span class="dl-skeleton"></span>'
+                "</div>"
+            )
+        if node._namespace == "dash_html_components":
+            tag = kind.lower()
+            if not children and prop("id", None) is not None:
+                # Filled in by a callback
+                return '<span class="dl-skeleton"></span>'
+            return f"<{tag}>{children}</{tag}>"
+        # Providers, the AppShell itself and other wrappers
+        return f"<div>{children}</div>"
+
+    def label(self, label: Any) -> str:
+        if not label:
+            return ""
+        return f'<span class="dl-label">{self.render(label)}</span>'
+
+    def icon(self, name: str, size: int) -> str:
+        prefix, _, icon_name = name.partition(":")
+        icon_set = self.icon_sets.get(prefix, {})
+        icon = icon_set.get("icons", {}).get(icon_name)
+        if icon is None:
+            # Not in the local sets: keep its room
+            return (
+                f'<span class="dl-icon" style="width:{size}px;'
+                f'height:{size}px"></span>'
+            )
+        width = icon.get("width", icon_set.get("width", 16))
+        height = icon.get("height", icon_set.get("height", 16))
+        return (
+            f'<svg class="dl-icon" xmlns="http://www.w3.org/2000/svg" '
+            f'width="{size}" height="{size}" viewBox="0 0 {width} {height}" '
+            f'aria-hidden="true">{icon["body"]}</svg>'
+        )
+
+
+def render_shell(layout: Any) -> str:
+    """
+    Render a layout to the static HTML of the prerendered shell.
+
+    Args:
+        layout: Component tree.
+
+    Returns:
+        The markup, without the overlay wrapper and styles.
+    """
+    return _Renderer(load_icon_sets()).render(layout)
+
+
+def _find(node: Any, kind: str) -> Component | None:
+    """Return the first component of type ``kind`` in a tree."""
+    if isinstance(node, Component):
+        if node._type == kind:
+            return node
+        return _find(getattr(node, "children", None), kind)
+    if isinstance(node, (list, tuple)):
+        for child in node:
+            found = _find(child, kind)
+            if found is not None:
+                return found
+    return None
+
+
+def build_prerender(layout: Any) -> tuple[str, str]:
+    """
+    Build the overlay embedded in the index page.
+
+    Args:
+        layout: The app layout; it must contain a ``dmc.AppShell`` with an
+            ``id``, whose appearance in the page removes the overlay.
+
+    Returns:
+        The overlay markup, and the script removing it.
+
+    Raises:
+        ValueError: The layout has no ``AppShell`` with an ``id``.
+    """
+    shell = _find(layout, "AppShell")
+    if shell is None or getattr(shell, "id", None) is None:
+        raise ValueError("prerendering needs a dmc.AppShell with an id")
+
+    def size(name: str, key: str, default: int) -> int:
+        return (getattr(shell, name, None) or {}).get(key, default)
+
+    css = (
+        _CSS.replace("{header}", str(size("header", "height", 60)))
+        .replace("{navbar}", str(size("navbar", "width", 250)))
+        .replace("{footer}", str(size("footer", "height", 60)))
+    )
+    script = _SCRIPT % _js_string(shell.id)
+    return (
+        f'<div id="dash-lite-prerender" aria-hidden="true"><style>{css}'
+        f"</style>{render_shell(layout)}</div>",
+        f"<script>{script}</script>",
+    )
+
+
+def _js_string(value: str) -> str:
+    """Quote a string for inline JavaScript."""
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def install_prerender(app: Dash) -> str:
+    """
+    Embed the prerendered shell of ``app.layout`` in the index page.
+
+    Call this once the layout is assigned.
+
+    Returns:
+        The embedded markup.
+
+    Raises:
+        ValueError: The layout has no ``AppShell`` with an ``id``.
+    """
+    overlay, script = build_prerender(app.layout)
+    interpolate_index = app.interpolate_index
+
+    @functools.wraps(interpolate_index)
+    def interpolate_with_shell(**kwargs: Any) -> str:
+        # Before Dash's entry point, and removed once React filled it
+        kwargs["app_entry"] = overlay + kwargs["app_entry"] + script
+        return interpolate_index(**kwargs)
+
+    app.interpolate_index = interpolate_with_shell  # type: ignore[method-assign]
+    return overlay
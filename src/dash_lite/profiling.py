@@ -0,0 +1,335 @@
+"""
+On-demand sampling profiler for live requests.
+
+:class:`RequestProfiler` stays idle (an attribute and a header lookup
+per request) until it is triggered, either
+
+- for a single request, by a signed ``X-Dash-Lite-Profile`` header (see
+  :func:`sign_profile_header`), or
+- for the next ``N`` requests, or a sampled fraction of them for a while,
+  through ``POST /_dash-lite/profile`` with the profiler's secret as
+  bearer token.
+
+Only callback and layout requests are profiled. While one runs, a
+sampling thread records the request thread's stack every ``interval``
+seconds, and the samples are written to ``directory`` as
+``<time>-<callback>.collapsed``, one ``frame;frame;frame count`` line per
+stack. Collapsed files add up (``cat *.collapsed``) and are read by
+flamegraph.pl, speedscope and most other flame graph tools.
+
+Samples are taken from another thread, so they are only as frequent as
+the interpreter switches threads (every 5 ms by default): profile slow
+requests, or many fast ones.
+
+The trigger endpoint arms the profiler of the worker process that
+received it, so with several workers only the requests reaching that
+worker are profiled: the next ``N`` of those, not of the whole server.
+A signed header works in any worker.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import io
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING
+
+import flask
+from dash import Dash
+from werkzeug.wsgi import ClosingIterator
+
+if TYPE_CHECKING:
+    from _typeshed.wsgi import StartResponse, WSGIEnvironment
+
+HEADER = "X-Dash-Lite-Profile"
+_ENVIRON_HEADER = "HTTP_" + HEADER.upper().replace("-", "_")
+
+DEFAULT_DIRECTORY = Path(tempfile.gettempdir()) / "dash-lite-profiles"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def sign_profile_header(secret: str, ttl: float = 300.0) -> str:
+    """
+    Build a value of the ``X-Dash-Lite-Profile`` header.
+
+    Args:
+        secret: The profiler's secret.
+        ttl: Seconds the value stays valid.
+
+    Returns:
+        ``<expiry>.<signature>``, the expiry as Unix time.
+    """
+    expires = str(int(time.time() + ttl))
+    return f"{expires}.{_sign(secret, expires)}"
+
+
+def _sign(secret: str, message: str) -> str:
+    return hmac.new(
+        secret.encode(), message.encode(), hashlib.sha256
+    ).hexdigest()
+
+
+def _frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    name = (
+        f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    )
+    # ";" separates frames in the collapsed format
+    return name.replace(";", ":")
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread from a background thread.
+
+    Args:
+        thread_id: ``threading.get_ident()`` of the thread to sample.
+        interval: Seconds between samples.
+    """
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="dash-lite-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        """Stop sampling and return the sample count per stack."""
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class RequestProfiler:
+    """
+    Profiles selected callback and layout requests.
+
+    Args:
+        secret: Shared secret for the trigger endpoint and the signed
+            header.
+        directory: Where the collapsed stack files are written.
+        interval: Seconds between stack samples.
+        clock: Wall clock, in Unix seconds.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        directory: str | Path = DEFAULT_DIRECTORY,
+        interval: float = 0.001,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if not secret:
+            raise ValueError("the profiler needs a secret")
+        self.secret = secret
+        self.directory = Path(directory)
+        self.interval = interval
+        self.clock = clock
+        self._lock = threading.Lock()
+        # Requests still to profile, or a fraction to sample until a time
+        self._remaining = 0
+        self._fraction = 0.0
+        self._until = 0.0
+        self.armed = False
+
+    def trigger(
+        self,
+        requests: int = 0,
+        fraction: float = 0.0,
+        seconds: float = 60.0,
+    ) -> dict[str, float]:
+        """
+        Profile the next ``requests`` requests, or ``fraction`` of those
+        in the next ``seconds``. Zero for both disarms the profiler.
+
+        Only this process's requests count; other workers stay idle.
+
+        Returns:
+            The new state, see :meth:`state`.
+        """
+        if requests < 0 or not 0 <= fraction <= 1:
+            raise ValueError("requests must be >= 0, fraction in [0, 1]")
+        with self._lock:
+            self._remaining = requests
+            self._fraction = fraction
+            self._until = self.clock() + seconds if fraction else 0.0
+            self.armed = bool(requests or fraction)
+        return self.state()
+
+    def state(self) -> dict[str, float]:
+        """Return the requests left, the sampled fraction and its end."""
+        return {
+            "requests": self._remaining,
+            "fraction": self._fraction,
+            "until": self._until,
+        }
+
+    def verify(self, header: str) -> bool:
+        """Check a signed ``X-Dash-Lite-Profile`` value."""
+        expires, _, signature = header.partition(".")
+        if not expires.isdigit() or int(expires) < self.clock():
+            return False
+        return hmac.compare_digest(signature, _sign(self.secret, expires))
+
+    def select(self, header: str | None) -> bool:
+        """Decide whether to profile a request."""
+        if header is not None and self.verify(header):
+            return True
+        if not self.armed:
+            return False
+        with self._lock:
+            if self._remaining:
+                self._remaining -= 1
+                self.armed = bool(self._remaining or self._fraction)
+                return True
+            if self._fraction and self.clock() >= self._until:
+                self._fraction = 0.0
+                self.armed = False
+                return False
+            return random.random() < self._fraction
+
+    def write(self, label: str, samples: Counter[str]) -> Path:
+        """Write samples as a collapsed stack file; returns its path."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(self.clock()))
+        path = self.directory / (
+            f"{stamp}-{_UNSAFE.sub('_', label)}-{os.urandom(3).hex()}"
+            ".collapsed"
+        )
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in samples.items()),
+            encoding="utf-8",
+        )
+        return path
+
+
+def _callback_name(app: Dash, environ: WSGIEnvironment) -> str:
+    """
+    Name a callback request after its callback function.
+
+    Reads the body, and puts it back for Dash.
+    """
+    length = environ.get("CONTENT_LENGTH")
+    if not length or not length.isdigit():
+        return "callback"
+    body = environ["wsgi.input"].read(int(length))
+    environ["wsgi.input"] = io.BytesIO(body)
+    try:
+        output = json.loads(body).get("output", "")
+    except (ValueError, AttributeError):
+        return "callback"
+    entry = app.callback_map.get(output)
+    if entry is None:
+        return "callback"
+    return getattr(entry["callback"], "__name__", "callback")
+
+
+def install_profiler(app: Dash, profiler: RequestProfiler) -> None:
+    """
+    Profile requests of ``app`` on demand.
+
+    Serves the trigger at ``/_dash-lite/profile``: ``POST`` with
+    ``requests`` (the next N requests) or ``fraction`` and ``seconds``
+    (a sampled share for a while) as JSON, ``DELETE`` to disarm, ``GET``
+    for the state. All need ``Authorization: Bearer <secret>``.
+
+    The check wraps the WSGI application, so requests that are not
+    profiled pay for one attribute and one dict lookup.
+    """
+    server = app.server
+    prefix = app.config.routes_pathname_prefix
+    endpoints = {
+        prefix + "_dash-update-component": "callback",
+        prefix + "_dash-layout": "layout",
+    }
+    wsgi_app = server.wsgi_app
+
+    def profiling_app(
+        environ: WSGIEnvironment, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        header = environ.get(_ENVIRON_HEADER)
+        if not profiler.armed and header is None:
+            return wsgi_app(environ, start_response)
+        label = endpoints.get(environ.get("PATH_INFO", ""))
+        if label is None or not profiler.select(header):
+            return wsgi_app(environ, start_response)
+        if label == "callback":
+            label = _callback_name(app, environ)
+        sampler = StackSampler(threading.get_ident(), profiler.interval)
+        sampler.start()
+
+        def finish() -> None:
+            profiler.write(label, sampler.stop())
+
+        try:
+            response = wsgi_app(environ, start_response)
+        except BaseException:
+            finish()
+            raise
+        # Until the response is sent, serialization included
+        return ClosingIterator(response, finish)
+
+    server.wsgi_app = profiling_app  # type: ignore[method-assign]
+
+    def serve_trigger() -> flask.Response:
+        authorization = flask.request.headers.get("Authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode(), f"Bearer {profiler.secret}".encode()
+        ):
+            flask.abort(401)
+        if flask.request.method == "DELETE":
+            state = profiler.trigger()
+        elif flask.request.method == "POST":
+            options = flask.request.get_json(silent=True) or {}
+            try:
+                state = profiler.trigger(
+                    requests=int(options.get("requests", 0)),
+                    fraction=float(options.get("fraction", 0.0)),
+                    seconds=float(options.get("seconds", 60.0)),
+                )
+            except (TypeError, ValueError) as error:
+                flask.abort(400, str(error))
+        else:
+            state = profiler.state()
+        return flask.Response(
+            json.dumps({**state, "directory": str(profiler.directory)}),
+            mimetype="application/json",
+        )
+
+    server.add_url_rule(
+        prefix + "_dash-lite/profile",
+        endpoint="dash_lite_profile",
+        view_func=serve_trigger,
+        methods=["GET", "POST", "DELETE"],
+    )
+    server.extensions["dash_lite.profiler"] = profiler
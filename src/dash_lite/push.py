@@ -0,0 +1,326 @@
+"""
+Server-initiated updates of component props over Server-Sent Events.
+
+Live values otherwise need a ``dcc.Interval`` polling a callback, so every
+open tab sends a request per interval whether or not anything changed.
+With a :class:`PushHub`, each page keeps one ``EventSource`` connection
+open instead, and server code sends new prop values when they change::
+
+    hub.publish("prices", {"price": {"children": "101.5"}})
+    hub.publish_to_session(get_session_id(), {"status": {"color": "red"}})
+
+Every page subscribes to its own session and to the hub's public
+``topics``. The browser applies each update with
+``dash_clientside.set_props``, as a callback output would be applied
+(``Patch`` values included), and triggers callbacks listening to it.
+
+Idle connections must not hold a thread each, so the stream is only
+served by the ASGI entry point (:func:`dash_lite.asgi.create_asgi_app`
+under uvicorn or another event-loop server), which handles it on the
+event loop. WSGI servers answer ``204``, which tells browsers not to
+reconnect. Updates reach the connections of one process: run a single
+event-loop process, or publish in each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any
+
+import flask
+from dash import Dash
+from dash._utils import to_json
+from werkzeug.http import parse_cookie
+
+from .compression import IMMUTABLE
+from .session import SESSION_COOKIE, install_session_cookie
+
+PATH = "_dash-lite/push"
+
+_SESSION_TOPIC = "session:"
+
+_PING = b": ping\n\n"
+
+# Browser side: connect once the app has rendered (set_props needs the
+# rendered layout), then apply each message's {id: props}
+_SCRIPT = """(function () {
+  var url = %s;
+  function connect() {
+    var entry = document.getElementById('react-entry-point');
+    if (!window.dash_clientside || !window.dash_clientside.set_props ||
+        !entry || !entry.firstChild ||
+        entry.querySelector('._dash-loading')) {
+      return setTimeout(connect, 100);
+    }
+    new EventSource(url).onmessage = function (event) {
+      var updates = JSON.parse(event.data);
+      Object.keys(updates).forEach(function (id) {
+        window.dash_clientside.set_props(id, updates[id]);
+      });
+    };
+  }
+  connect();
+})();
+"""
+
+
+class Subscription:
+    """
+    One open stream: the frames waiting to be sent to it.
+
+    Created by :meth:`PushHub.subscribe`; only used on the event loop.
+    """
+
+    __slots__ = ("topics", "frames", "closed", "_waiter")
+
+    def __init__(self, topics: frozenset[str]) -> None:
+        self.topics = topics
+        self.frames: list[bytes] = []
+        self.closed = False
+        self._waiter: asyncio.Future[None] | None = None
+
+    def push(self, frame: bytes, max_pending: int) -> None:
+        """Queue a frame; a stream too far behind is closed instead."""
+        if self.closed:
+            return
+        if len(self.frames) >= max_pending:
+            self.close()
+            return
+        self.frames.append(frame)
+        self._wake()
+
+    def close(self) -> None:
+        """End the stream; the browser reconnects."""
+        self.closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def next(self) -> bytes:
+        """Wait for frames and return them, or ``b""`` once closed."""
+        while not self.frames and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+        self._waiter = None
+        frames, self.frames = self.frames, []
+        return b"".join(frames)
+
+
+class PushHub:
+    """
+    Publishes prop updates to the browsers subscribed to a topic.
+
+    ``publish`` may be called from any thread: callbacks, background
+    jobs or code on the event loop.
+
+    Args:
+        topics: Public topics every page subscribes to.
+        keepalive: Seconds between comments sent on every stream, which
+            keep proxies from closing idle connections.
+        max_pending: Frames queued for a stream before it is considered
+            stuck and closed.
+    """
+
+    def __init__(
+        self,
+        topics: Iterable[str] = (),
+        keepalive: float = 30.0,
+        max_pending: int = 256,
+    ) -> None:
+        self.topics = tuple(topics)
+        if any(topic.startswith(_SESSION_TOPIC) for topic in self.topics):
+            raise ValueError(f"{_SESSION_TOPIC!r} topics are per session")
+        self.keepalive = keepalive
+        self.max_pending = max_pending
+        self.path = "/" + PATH
+        self.messages = 0
+        self._subscribers: dict[str, set[Subscription]] = {}
+        self._streams: set[Subscription] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._heartbeat: asyncio.Task[None] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def connections(self) -> int:
+        """Number of open streams."""
+        return len(self._streams)
+
+    def publish(
+        self, topic: str, updates: Mapping[str, Mapping[str, Any]]
+    ) -> None:
+        """
+        Send prop updates to the subscribers of ``topic``.
+
+        Args:
+            topic: A public topic, or ``"session:<id>"``.
+            updates: New props per component id, e.g.
+                ``{"clock": {"children": "12:00"}}``.
+        """
+        loop = self._loop
+        if loop is None or topic not in self._subscribers:
+            # Nobody listens, so there is nothing to serialize
+            return
+        frame = b"data: " + to_json(dict(updates)).encode() + b"\n\n"
+        with self._lock:
+            self.messages += 1
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(topic, frame)
+        else:
+            loop.call_soon_threadsafe(self._deliver, topic, frame)
+
+    def publish_to_session(
+        self, session_id: str, updates: Mapping[str, Mapping[str, Any]]
+    ) -> None:
+        """Send prop updates to the pages of one browser session."""
+        self.publish(_SESSION_TOPIC + session_id, updates)
+
+    def _deliver(self, topic: str, frame: bytes) -> None:
+        for subscription in tuple(self._subscribers.get(topic, ())):
+            subscription.push(frame, self.max_pending)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        """Open a stream for ``topics``; call on the event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The previous loop's pings would otherwise run on forever
+            if self._heartbeat is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._heartbeat.cancel)
+            self._loop = loop
+            self._heartbeat = loop.create_task(self._ping())
+        subscription = Subscription(frozenset(topics))
+        self._streams.add(subscription)
+        for topic in subscription.topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a stream opened by :meth:`subscribe`."""
+        self._streams.discard(subscription)
+        for topic in subscription.topics:
+            subscriptions = self._subscribers.get(topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscribers[topic]
+
+    async def _ping(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive)
+            for subscription in tuple(self._streams):
+                subscription.push(_PING, self.max_pending)
+
+    async def serve(
+        self,
+        scope: dict[str, Any],
+        receive: Callable[[], Awaitable[dict[str, Any]]],
+        send: Callable[[dict[str, Any]], Awaitable[None]],
+    ) -> None:
+        """ASGI application streaming the updates of one page."""
+        headers = dict(scope["headers"])
+        session_id = parse_cookie(
+            headers.get(b"cookie", b"").decode("latin-1")
+        ).get(SESSION_COOKIE)
+        topics = list(self.topics)
+        if session_id:
+            topics.append(_SESSION_TOPIC + session_id)
+        subscription = self.subscribe(topics)
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            subscription.close()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [
+                        (b"content-type", b"text/event-stream"),
+                        (b"cache-control", b"no-cache"),
+                        # Stream through nginx instead of buffering
+                        (b"x-accel-buffering", b"no"),
+                    ],
+                }
+            )
+            # Reconnect after 5 s when the connection drops
+            body = b"retry: 5000\n\n"
+            while body:
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": body,
+                        "more_body": True,
+                    }
+                )
+                body = await subscription.next()
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            watcher.cancel()
+            self.unsubscribe(subscription)
+
+    def render(self) -> str:
+        """Return the push counters in Prometheus text exposition format."""
+        connections = "dash_lite_push_connections"
+        messages = "dash_lite_push_messages_total"
+        return (
+            f"# HELP {connections} Open push streams.\n"
+            f"# TYPE {connections} gauge\n"
+            f"{connections} {self.connections}\n"
+            f"# HELP {messages} Updates published to subscribed topics.\n"
+            f"# TYPE {messages} counter\n"
+            f"{messages} {self.messages}\n"
+        )
+
+
+def install_push(app: Dash, hub: PushHub) -> str:
+    """
+    Subscribe the pages of ``app`` to ``hub``.
+
+    Adds the browser script, which opens the stream once the app has
+    rendered, and hands out session cookies. The stream itself is served
+    by :func:`dash_lite.asgi.create_asgi_app`, which finds the hub in
+    ``app.server.extensions["dash_lite.push"]``.
+
+    Returns:
+        URL of the browser script.
+    """
+    install_session_cookie(app.server)
+    prefix = app.config.routes_pathname_prefix
+    hub.path = prefix + PATH
+    stream_url = app.config.requests_pathname_prefix + PATH
+    script = (_SCRIPT % json.dumps(stream_url)).encode()
+    digest = hashlib.sha256(script).hexdigest()[:16]
+
+    def serve_script() -> flask.Response:
+        response = flask.Response(script, mimetype="application/javascript")
+        response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    def no_stream() -> flask.Response:
+        # Only the ASGI entry point streams; 204 stops EventSource retries
+        return flask.Response(status=204)
+
+    app.server.add_url_rule(
+        f"{prefix}_dash-lite/push.{digest}.js",
+        endpoint="dash_lite_push_script",
+        view_func=serve_script,
+    )
+    app.server.add_url_rule(
+        hub.path, endpoint="dash_lite_push", view_func=no_stream
+    )
+    url = f"{app.config.requests_pathname_prefix}_dash-lite/push.{digest}.js"
+    app.config.external_scripts.append(url)
+    app.server.extensions["dash_lite.push"] = hub
+    return url
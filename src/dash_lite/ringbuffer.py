@@ -0,0 +1,272 @@
+"""
+Live samples in a fixed-size ring buffer shared through a memory map.
+
+A live chart redrawn from a full figure on every update sends its whole
+history each time, so the update gets slower as the history grows. A
+:class:`RingBuffer` keeps the latest ``capacity`` samples in a file
+mapped into memory by every process that opens it: the web server's
+workers, and any collector writing samples. Readers keep a cursor (the
+number of samples written so far) and :meth:`~RingBuffer.read` returns
+only the samples written since, so each update costs the same however
+long the history is.
+
+The file holds a header, then ``capacity`` records of a timestamp and
+``columns`` values, all float64::
+
+    magic (8 bytes) | capacity | columns | samples written | writing (uint64)
+    record 0: timestamp, value 1 .. value n
+    ...
+
+Writers take an exclusive ``flock`` on the file (POSIX; on other
+platforms writes are only serialized within one process). Readers take
+no lock: a writer first announces the count it is writing up to, then
+writes its records and publishes the new count, and a reader checks the
+announced count after copying and drops the records that were being
+overwritten meanwhile.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_MAGIC = b"DLRING2\x00"
+_HEADER = struct.Struct("<8sQQQQ")
+# Positions of the sample count, and of the count being written up to,
+# in the header, in 8-byte words
+_COUNT = 3
+_WRITING = 4
+
+
+@dataclass(frozen=True)
+class Samples:
+    """
+    Samples read from a :class:`RingBuffer`.
+
+    Args:
+        cursor: Samples written when they were read; pass it to the next
+            :meth:`RingBuffer.read` to get only newer samples.
+        timestamps: Timestamps of the samples, oldest first.
+        values: One list of values per column.
+        skipped: Samples between the given cursor and the first returned
+            one that were not returned (overwritten, or over ``limit``).
+    """
+
+    cursor: int
+    timestamps: list[float]
+    values: list[list[float]]
+    skipped: int = 0
+
+
+class RingBuffer:
+    """
+    Latest samples of one or more series, in a memory-mapped file.
+
+    Opening an existing file maps the same buffer, so every process
+    sees every sample. Timestamps are milliseconds since the epoch, as
+    plotly's date axes take them.
+
+    Args:
+        path: Buffer file; created if missing.
+        capacity: Samples kept before the oldest are overwritten.
+        columns: Values per sample.
+
+    Raises:
+        ValueError: The file exists with another capacity or number of
+            columns, or is not a ring buffer.
+    """
+
+    def __init__(
+        self, path: str | Path, capacity: int = 86_400, columns: int = 1
+    ) -> None:
+        if capacity < 1 or columns < 1:
+            raise ValueError("capacity and columns must be at least 1")
+        self.path = Path(path)
+        self.capacity = capacity
+        self.columns = columns
+        self.width = columns + 1
+        size = _HEADER.size + capacity * self.width * 8
+        self._fd = os.open(
+            self.path,
+            os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0),
+            0o644,
+        )
+        self._lock = threading.Lock()
+        self._lock_fd = self._fd
+        self._lock_pid = os.getpid()
+        with self._locked():
+            if os.fstat(self._fd).st_size == 0:
+                os.ftruncate(self._fd, size)
+                os.write(
+                    self._fd, _HEADER.pack(_MAGIC, capacity, columns, 0, 0)
+                )
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            header = os.read(self._fd, _HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(_MAGIC):
+            os.close(self._fd)
+            raise ValueError(f"{self.path} is not a ring buffer")
+        _, file_capacity, file_columns, *_ = _HEADER.unpack(header)
+        if (file_capacity, file_columns) != (capacity, columns):
+            os.close(self._fd)
+            raise ValueError(
+                f"{self.path} holds {file_capacity} samples of "
+                f"{file_columns} columns, not {capacity} of {columns}"
+            )
+        self._map = mmap.mmap(self._fd, size)
+        self._header = memoryview(self._map)[: _HEADER.size].cast("Q")
+        self._records = memoryview(self._map)[_HEADER.size :].cast("d")
+
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+
+    @property
+    def written(self) -> int:
+        """Samples written since the file was created."""
+        return self._header[_COUNT]
+
+    def _locked(self) -> _FileLock:
+        # flock locks belong to the open file, which forked workers share
+        # with their parent: each process locks through its own
+        if self._lock_pid != os.getpid():
+            self._lock_fd = os.open(self.path, os.O_RDWR)
+            self._lock_pid = os.getpid()
+        return _FileLock(self._lock_fd, self._lock)
+
+    def append(
+        self, values: float | Sequence[float], timestamp: float | None = None
+    ) -> int:
+        """
+        Write one sample.
+
+        Args:
+            values: The sample's value, or one per column.
+            timestamp: Milliseconds since the epoch; now if ``None``.
+
+        Returns:
+            Samples written, including this one.
+        """
+        return self.extend([(timestamp, values)])
+
+    def extend(
+        self, samples: Iterable[tuple[float | None, float | Sequence[float]]]
+    ) -> int:
+        """
+        Write several samples at once, under one lock.
+
+        Args:
+            samples: ``(timestamp, values)`` pairs, as for :meth:`append`.
+
+        Returns:
+            Samples written, including these.
+
+        Raises:
+            ValueError: A sample does not have one value per column.
+        """
+        now = time.time() * 1000
+        records = array("d")
+        for timestamp, values in samples:
+            row = [values] if isinstance(values, int | float) else values
+            if len(row) != self.columns:
+                raise ValueError(
+                    f"expected {self.columns} values, got {len(row)}"
+                )
+            records.append(now if timestamp is None else timestamp)
+            records.extend(row)
+        count = len(records) // self.width
+        # Only the latest `capacity` samples would survive anyway
+        dropped = max(count - self.capacity, 0)
+        records = records[dropped * self.width :]
+        with self._locked():
+            written = self._header[_COUNT]
+            # Announced first: readers drop what this may overwrite
+            self._header[_WRITING] = written + count
+            slot = (written + dropped) % self.capacity
+            start = slot * self.width
+            first = min(len(records), (self.capacity - slot) * self.width)
+            self._records[start : start + first] = records[:first]
+            self._records[: len(records) - first] = records[first:]
+            # Published last: readers never see a count ahead of the data
+            self._header[_COUNT] = written + count
+        return written + count
+
+    def read(
+        self, cursor: int | None = None, limit: int | None = None
+    ) -> Samples:
+        """
+        Return the samples written since ``cursor``.
+
+        Args:
+            cursor: :attr:`Samples.cursor` of the previous read; ``None``
+                (or a cursor from a buffer since recreated) for all
+                samples still in the buffer.
+            limit: Return at most the latest ``limit`` samples.
+
+        Returns:
+            The samples, and the cursor for the next read.
+        """
+        written = self._header[_COUNT]
+        if cursor is None or cursor > written:
+            cursor = 0
+        start = max(cursor, written - self.capacity)
+        if limit is not None:
+            start = max(start, written - limit)
+        slot = start % self.capacity
+        count = written - start
+        first = min(count, self.capacity - slot)
+        flat = self._records[
+            slot * self.width : (slot + first) * self.width
+        ].tolist()
+        if count > first:
+            flat += self._records[: (count - first) * self.width].tolist()
+        # Records that writers overwrote, or were overwriting, while they
+        # were copied
+        overwritten = self._header[_WRITING] - self.capacity - start
+        if overwritten > 0:
+            overwritten = min(overwritten, count)
+            flat = flat[overwritten * self.width :]
+            start += overwritten
+        return Samples(
+            cursor=written,
+            timestamps=flat[:: self.width],
+            values=[
+                flat[column :: self.width] for column in range(1, self.width)
+            ],
+            skipped=start - cursor,
+        )
+
+    def close(self) -> None:
+        """Unmap the buffer and close the file; the file is kept."""
+        self._header.release()
+        self._records.release()
+        self._map.close()
+        os.close(self._fd)
+
+
+class _FileLock:
+    """Exclusive lock on the buffer, across threads and processes."""
+
+    def __init__(self, fd: int, lock: threading.Lock) -> None:
+        self.fd = fd
+        self.lock = lock
+
+    def __enter__(self) -> None:
+        self.lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *_exc: object) -> None:
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.lock.release()
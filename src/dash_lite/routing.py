@@ -0,0 +1,194 @@
+"""
+Multi-page routing with lazily built pages.
+
+:class:`PageRouter` serves the pages of :mod:`dash_lite.pages` behind the
+navbar links. Every page's callbacks are registered when the router is
+installed, so that all worker processes serve the same callback graph
+and any of them can run a callback of any page. A page's layout is only
+built and serialized when the page is first requested, so the first
+``/_dash-layout`` payload no longer grows with the number of pages.
+
+The layout request is matched to the page by its ``Referer`` header.
+When it is missing the home page is served and a router callback swaps
+in the right content once ``dcc.Location`` reports the path.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from collections.abc import Sequence
+from typing import Any
+from urllib.parse import urlsplit
+
+import dash_mantine_components as dmc
+import flask
+from dash import Dash, Input, Output, State, dcc, html
+from dash.development.base_component import Component
+from dash.exceptions import PreventUpdate
+
+from .layout import create_layout, create_nav_links
+from .layout_cache import LayoutCache
+from .pages import PAGES, Page
+
+
+class PageRouter:
+    """
+    Serves the layout of the requested page, loading pages on demand.
+
+    Args:
+        app: The Dash app; its ``suppress_callback_exceptions`` must be
+            on, since page components are not in the initial layout.
+        pages: Pages to route to; the first one is the home page.
+        compress: Also keep gzip copies of the serialized layouts.
+        options: Keyword arguments passed to every page's ``layout``.
+    """
+
+    def __init__(
+        self,
+        app: Dash,
+        pages: Sequence[Page] = PAGES,
+        compress: bool = False,
+        **options: Any,
+    ) -> None:
+        self.app = app
+        self.pages = {page.path: page for page in pages}
+        self.home = pages[0]
+        self.compress = compress
+        self.options = options
+        # path -> page module, page content, and serialized full layout
+        self._modules: dict[str, Any] = {}
+        self._content: dict[str, Component] = {}
+        self._layouts: dict[str, LayoutCache] = {}
+        self._lock = threading.Lock()
+
+    def page(self, pathname: str | None) -> Page:
+        """Return the page for a URL path, the home page if unknown."""
+        path = "/" + self.app.strip_relative_path(pathname or "/")
+        return self.pages.get(path.rstrip("/") or "/", self.home)
+
+    def loaded(self) -> list[str]:
+        """Return the paths of the pages whose layout was built so far."""
+        return list(self._content)
+
+    def content(self, page: Page) -> Component:
+        """Build the content of ``page`` on first use and return it."""
+        content = self._content.get(page.path)
+        if content is not None:
+            return content
+        with self._lock:
+            if page.path not in self._content:
+                module = self._modules.get(page.path) or (
+                    importlib.import_module(page.module)
+                )
+                self._content[page.path] = module.layout(**self.options)
+            return self._content[page.path]
+
+    def shell(self, page: Page, content: Component | None = None) -> Any:
+        """
+        Full app layout showing ``page``.
+
+        Args:
+            page: Page whose navbar link is highlighted.
+            content: Page content; left empty for the initial layout.
+        """
+        return dmc.MantineProvider(
+            create_layout(
+                content=html.Div(
+                    [
+                        dcc.Location(id="url"),
+                        # Path of the page whose content was sent
+                        dcc.Store(id="page-rendered", data=page.path),
+                        html.Div(content, id="page-content"),
+                    ]
+                ),
+                nav_links=create_nav_links(
+                    page, href=self.app.get_relative_path
+                ),
+            ),
+            defaultColorScheme="dark",
+        )
+
+    def complete_layout(self) -> list[Component]:
+        """
+        The shell and the content of every page, for checking callbacks.
+
+        The page contents are built afresh and not kept, so pages still
+        load on first request.
+        """
+        return [
+            self.shell(self.home),
+            *(
+                self._modules[path].layout(**self.options)
+                for path in self.pages
+            ),
+        ]
+
+    def layout(self, page: Page) -> LayoutCache:
+        """Return the serialized layout of ``page``, built on first use."""
+        cache = self._layouts.get(page.path)
+        if cache is None:
+            cache = LayoutCache(
+                self.app,
+                compress=self.compress,
+                layout=self.shell(page, self.content(page)),
+            )
+            with self._lock:
+                cache = self._layouts.setdefault(page.path, cache)
+        return cache
+
+    def serve_layout(self) -> flask.Response:
+        """Flask view replacing Dash's ``/_dash-layout`` handler."""
+        referer = flask.request.headers.get("Referer")
+        page = self.page(urlsplit(referer).path if referer else None)
+        return self.layout(page).serve()
+
+    def install(self) -> None:
+        """
+        Register every page's callbacks, and route requests to the pages.
+        """
+        app = self.app
+        for page in self.pages.values():
+            module = importlib.import_module(page.module)
+            register = getattr(module, "register_callbacks", None)
+            if register is not None:
+                register(app)
+            self._modules[page.path] = module
+        # Validated by Dash on the first request; page content comes later
+        app.layout = self.shell(self.home)
+        prefix = app.config.routes_pathname_prefix
+
+        @app.callback(
+            Output("page-content", "children"),
+            Output("page-rendered", "data"),
+            Input("url", "pathname"),
+            State("page-rendered", "data"),
+        )
+        def route(pathname: str | None, rendered: str) -> tuple[Any, str]:
+            """Show the page of the URL if another one was sent."""
+            page = self.page(pathname)
+            if page.path == rendered:
+                raise PreventUpdate
+            return self.content(page), page.path
+
+        app.server.view_functions[prefix + "_dash-layout"] = self.serve_layout
+
+
+def install_page_router(
+    app: Dash, compress: bool = False, **options: Any
+) -> PageRouter:
+    """
+    Serve the app's pages, each built on first request.
+
+    Args:
+        app: Dash app created with ``suppress_callback_exceptions=True``.
+        compress: Also store gzip copies of the serialized layouts.
+        options: Keyword arguments passed to every page's ``layout``.
+
+    Returns:
+        The installed router.
+    """
+    router = PageRouter(app, compress=compress, **options)
+    router.install()
+    app.server.extensions["dash_lite.router"] = router
+    return router
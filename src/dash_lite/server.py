@@ -0,0 +1,98 @@
+"""
+Production WSGI runner for dash-lite.
+
+Flask's built-in server (used by ``app.run``) handles one request at a time
+per process, so every ``/_dash-update-component`` POST queues behind the
+previous one. This module serves the same Flask server through gunicorn
+with a pool of worker processes, each running several threads.
+
+The app is built once in the gunicorn master and the workers are forked
+from it (``preload_app``), so the layout tree and callback map are created
+a single time and shared copy-on-write instead of rebuilt per worker.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from typing import Any
+
+from flask import Flask
+
+
+def default_workers() -> int:
+    """Return the default worker count (gunicorn's ``2 * cores + 1``)."""
+    return multiprocessing.cpu_count() * 2 + 1
+
+
+def build_options(
+    host: str,
+    port: int,
+    workers: int | None = None,
+    threads: int | None = None,
+) -> dict[str, Any]:
+    """
+    Build the gunicorn settings used for production mode.
+
+    Args:
+        host: Interface to bind to.
+        port: Port to bind to.
+        workers: Number of worker processes. Falls back to
+            ``DASH_LITE_WORKERS`` and then to :func:`default_workers`.
+        threads: Threads per worker. Falls back to ``DASH_LITE_THREADS``
+            and then to 4.
+
+    Returns:
+        Mapping of gunicorn setting names to values.
+    """
+    if workers is None:
+        workers = int(os.getenv("DASH_LITE_WORKERS", default_workers()))
+    if threads is None:
+        threads = int(os.getenv("DASH_LITE_THREADS", "4"))
+
+    if workers < 1 or threads < 1:
+        raise ValueError("workers and threads must both be at least 1")
+
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "threads": threads,
+        # gthread keeps a thread pool per worker; sync ignores `threads`
+        "worker_class": "gthread" if threads > 1 else "sync",
+        # Build the app in the master and fork workers from it
+        "preload_app": True,
+        "accesslog": "-",
+    }
+
+
+def run_production(server: Flask, options: dict[str, Any]) -> None:
+    """
+    Serve a Flask server with gunicorn.
+
+    Args:
+        server: The WSGI application, typically ``create_app().server``.
+            It must already be built so the preloaded master can share it.
+        options: gunicorn settings, see :func:`build_options`.
+
+    Raises:
+        RuntimeError: If gunicorn is not installed (e.g. on Windows).
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError as exc:
+        raise RuntimeError(
+            "Production mode requires gunicorn. Install it with "
+            "`pip install dash-lite[production]`."
+        ) from exc
+
+    class _Application(BaseApplication):
+        """Minimal gunicorn application wrapping an existing WSGI app."""
+
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            return server
+
+    _Application().run()
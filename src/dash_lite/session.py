@@ -0,0 +1,54 @@
+"""
+Anonymous per-browser session ids.
+
+Dash has no notion of a session, but some server-side features need to
+tell browsers apart (e.g. dropping superseded requests from the same tab).
+:func:`install_session_cookie` hands every browser a random id in a cookie
+and :func:`get_session_id` reads it back during a request.
+"""
+
+from __future__ import annotations
+
+import secrets
+
+import flask
+
+SESSION_COOKIE = "dash_lite_session"
+
+
+def get_session_id() -> str:
+    """
+    Return the session id of the current request.
+
+    Falls back to the client address when the browser has no cookie yet
+    (its very first request) or the cookie was not installed.
+    """
+    session_id = flask.g.get("dash_lite_session")
+    if session_id is None:
+        session_id = flask.request.cookies.get(SESSION_COOKIE)
+    return session_id or f"addr:{flask.request.remote_addr}"
+
+
+def install_session_cookie(server: flask.Flask) -> None:
+    """Give every browser a random session id cookie."""
+    # Several features rely on the cookie; install it once
+    if "dash_lite.session" in server.extensions:
+        return
+    server.extensions["dash_lite.session"] = True
+
+    @server.before_request
+    def _assign_session_id() -> None:
+        session_id = flask.request.cookies.get(SESSION_COOKIE)
+        flask.g.dash_lite_new_session = session_id is None
+        flask.g.dash_lite_session = session_id or secrets.token_urlsafe(16)
+
+    @server.after_request
+    def _set_session_cookie(response: flask.Response) -> flask.Response:
+        if flask.g.get("dash_lite_new_session"):
+            response.set_cookie(
+                SESSION_COOKIE,
+                flask.g.dash_lite_session,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
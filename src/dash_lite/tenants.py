@@ -0,0 +1,201 @@
+"""
+Many dash-lite apps, one per tenant, in one process.
+
+A process per customer pays for Python, Flask, Dash and every component
+package once per customer. :class:`TenantDispatcher` is a single WSGI
+application that mounts a ``create_app()`` per :class:`Tenant` under
+``/<name>/``, so that these are loaded once. Each tenant keeps its own
+Flask server, title, callbacks and ``create_app`` options, while
+
+- the component bundles and assets linked from every tenant's index
+  page are served once, from ``/_shared/``: browsers download and cache
+  them once for all tenants, and the server keeps one copy (with
+  ``compression``, one compressed copy),
+- tenants built with the same layout options share one layout tree,
+  which is never modified after it is built.
+
+Serve the dispatcher like any WSGI application, e.g.
+``run_production(TenantDispatcher([...]), options)``.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import dash_mantine_components as dmc
+from dash import Dash, html
+from dash.development.base_component import Component
+from werkzeug.exceptions import NotFound
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+
+from .app import create_app
+from .compression import install_compression
+from .layout import create_layout
+
+if TYPE_CHECKING:
+    from _typeshed.wsgi import StartResponse, WSGIApplication, WSGIEnvironment
+
+SHARED_PREFIX = "/_shared"
+
+_NAME = re.compile(r"[a-z0-9][a-z0-9_-]*")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """
+    One customer's app.
+
+    Attributes:
+        name: URL segment the app is mounted under, e.g. ``"acme"``.
+        title: Title of the browser tab.
+        options: Further keyword arguments of ``create_app``.
+    """
+
+    name: str
+    title: str
+    options: Mapping[str, Any] = field(default_factory=dict)
+
+
+def _static_urls(app: Dash) -> tuple[str, ...]:
+    """URL prefixes of the bundles and assets of ``app``."""
+    return (
+        "_dash-component-suites/",
+        app.config.assets_url_path.strip("/") + "/",
+    )
+
+
+def _static_only(app: Dash) -> WSGIApplication:
+    """Serve the bundles and assets of ``app``, and 404 for the rest."""
+    paths = tuple("/" + url for url in _static_urls(app))
+    server = app.server
+    not_found = NotFound()
+
+    def static_app(
+        environ: WSGIEnvironment, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        if environ.get("PATH_INFO", "").startswith(paths):
+            return server(environ, start_response)
+        return not_found(environ, start_response)
+
+    return static_app
+
+
+def _link_shared_static(app: Dash, shared: Dash) -> None:
+    """Point the bundle and asset URLs of the index of ``app`` to ``shared``."""
+    own = app.config.requests_pathname_prefix
+    target = shared.config.requests_pathname_prefix
+    replacements = [
+        (f'"{own}{url}', f'"{target}{url}') for url in _static_urls(app)
+    ]
+    interpolate_index = app.interpolate_index
+
+    def shared_static_index(**kwargs: Any) -> str:
+        for key in ("scripts", "css"):
+            for old, new in replacements:
+                kwargs[key] = kwargs[key].replace(old, new)
+        return interpolate_index(**kwargs)
+
+    app.interpolate_index = shared_static_index  # type: ignore[method-assign]
+
+
+class TenantDispatcher:
+    """
+    WSGI application serving a dash-lite app per tenant.
+
+    ``/<name>/...`` goes to the tenant's app, ``/_shared/...`` to the
+    shared bundles and assets; anything else is ``404``.
+
+    Args:
+        tenants: Tenants to mount now; more can be added with :meth:`add`.
+        compression: Compress the shared bundles (see
+            ``dash_lite.compression``). Tenants' own responses follow
+            their ``compression`` option.
+    """
+
+    def __init__(
+        self, tenants: Iterable[Tenant] = (), compression: bool = False
+    ) -> None:
+        # Same module name as create_app, so the same assets folder
+        self.shared = Dash(
+            "dash_lite.app",
+            requests_pathname_prefix=SHARED_PREFIX + "/",
+            routes_pathname_prefix="/",
+            use_async=False,
+        )
+        self.shared.layout = html.Div()
+        if compression:
+            install_compression(self.shared)
+        # Registers the component packages whose bundles may be served
+        self.shared._generate_scripts_html()
+        self.shared._generate_css_dist_html()
+
+        self.apps: dict[str, Dash] = {}
+        self._layouts: dict[tuple[int | bool, bool, bool], Component] = {}
+        self._lock = threading.Lock()
+        self._dispatcher = DispatcherMiddleware(
+            NotFound(), {SHARED_PREFIX: _static_only(self.shared)}
+        )
+        for tenant in tenants:
+            self.add(tenant)
+
+    def _layout(self, options: Mapping[str, Any]) -> Component | None:
+        """Return the shared layout for ``create_app`` options, if any."""
+        if options.get("pages"):
+            return None
+        key = (
+            options.get("name_debounce", False),
+            options.get("job_manager") is not None,
+            options.get("live_feed") is not None,
+        )
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts.setdefault(
+                key,
+                dmc.MantineProvider(
+                    create_layout(
+                        name_debounce=key[0],
+                        background_jobs=key[1],
+                        live_metrics=key[2],
+                    ),
+                    defaultColorScheme="dark",
+                ),
+            )
+        return layout
+
+    def add(self, tenant: Tenant) -> Dash:
+        """
+        Create the app of ``tenant`` and mount it.
+
+        Args:
+            tenant: The tenant; its name must be new.
+
+        Returns:
+            The tenant's app.
+
+        Raises:
+            ValueError: The name is taken or not a lowercase URL segment.
+        """
+        if not _NAME.fullmatch(tenant.name):
+            raise ValueError(f"invalid tenant name: {tenant.name!r}")
+        with self._lock:
+            if tenant.name in self.apps:
+                raise ValueError(f"tenant {tenant.name!r} already exists")
+            app = create_app(
+                title=tenant.title,
+                url_prefix=f"/{tenant.name}/",
+                layout=self._layout(tenant.options),
+                **tenant.options,
+            )
+            _link_shared_static(app, self.shared)
+            self.apps[tenant.name] = app
+            self._dispatcher.mounts[f"/{tenant.name}"] = app.server
+        return app
+
+    def __call__(
+        self, environ: WSGIEnvironment, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        return self._dispatcher(environ, start_response)
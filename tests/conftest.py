@@ -6,6 +6,46 @@ import pytest
 from dash import Dash
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the ``--run-slow`` and benchmark command line options."""
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        default=False,
+        help="run tests marked as slow (benchmarks, load tests)",
+    )
+    parser.addoption(
+        "--benchmark-baseline",
+        default=".benchmarks/baseline.json",
+        help="JSON file the load benchmark is compared with",
+    )
+    parser.addoption(
+        "--benchmark-tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative slowdown against the baseline",
+    )
+    parser.addoption(
+        "--update-baseline",
+        action="store_true",
+        default=False,
+        help="save the load benchmark results as the new baseline",
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    """Skip ``slow`` tests unless ``--run-slow`` is given."""
+    if config.getoption("--run-slow"):
+        return
+
+    skip_slow = pytest.mark.skip(reason="needs --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
 @pytest.fixture
 def dash_app() -> Dash:
     """
@@ -0,0 +1,58 @@
+"""Helpers shared by several test modules."""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from flask import Flask
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+
+def greeting_body(name: str, changed: str = "name-input") -> dict:
+    """Request body of ``update_greeting``."""
+    return {
+        "output": "greeting-output.children",
+        "outputs": {"id": "greeting-output", "property": "children"},
+        "inputs": [
+            {"id": "greeting-style", "property": "value", "value": "short"},
+            {"id": "name-input", "property": "value", "value": name},
+        ],
+        "changedPropIds": [f"{changed}.value"],
+        "state": [],
+    }
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class QuietHandler(WSGIRequestHandler):
+    """Keep-alive request handler without access log lines."""
+
+    # Sessions reuse their connection, like browsers do
+    protocol_version = "HTTP/1.1"
+
+    def log_request(self, *args: Any) -> None:
+        pass
+
+
+@contextmanager
+def local_server(server: Flask) -> Iterator[int]:
+    """Serve ``server`` on a free local port in a background thread."""
+    httpd = make_server(
+        "127.0.0.1", 0, server, threaded=True, request_handler=QuietHandler
+    )
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield httpd.server_port
+    finally:
+        httpd.shutdown()
+        thread.join()
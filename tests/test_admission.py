@@ -0,0 +1,391 @@
+"""Tests for admission control on the callback endpoint."""
+
+from __future__ import annotations
+
+import http.client
+import io
+import json
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from dash import Dash
+from werkzeug.test import EnvironBuilder
+
+from dash_lite.admission import AdmissionControl, TokenBucket
+from dash_lite.app import _admission_from_env, create_app
+from dash_lite.session import SESSION_COOKIE
+from tests.helpers import greeting_body, percentile
+
+CALLBACK = "/_dash-update-component"
+ROOT = Path(__file__).parents[1]
+
+
+def _post(client, body: dict | bytes | None = None, **kwargs):
+    """POST a greeting callback request, read and closed like a server."""
+    if body is None:
+        body = greeting_body("Ada")
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+    return client.post(
+        CALLBACK,
+        data=body,
+        content_type="application/json",
+        buffered=True,
+        **kwargs,
+    )
+
+
+def _client(app: Dash, session: str | None = None):
+    """Test client with a session cookie, unless ``session`` is None."""
+    client = app.server.test_client()
+    if session is not None:
+        client.set_cookie(SESSION_COOKIE, session)
+    return client
+
+
+class TestTokenBucket:
+    """Tests for the per-key token buckets."""
+
+    def test_burst_then_refill(self) -> None:
+        """Test that a full bucket allows a burst, then ``rate`` per s."""
+        now = [0.0]
+        buckets = TokenBucket(rate=2, burst=3, clock=lambda: now[0])
+
+        assert [buckets.take("a") for _ in range(3)] == [0.0] * 3
+        assert buckets.take("a") == pytest.approx(0.5)
+        now[0] = 0.5
+        assert buckets.take("a") == 0.0
+        assert buckets.take("b") == 0.0
+
+    def test_least_recently_used_keys_are_dropped(self) -> None:
+        """Test that the number of buckets stays bounded."""
+        buckets = TokenBucket(rate=1, burst=1, max_keys=2, clock=lambda: 0.0)
+        for key in "abc":
+            buckets.take(key)
+
+        assert list(buckets._buckets) == ["b", "c"]
+        # "a" starts over with a full bucket
+        assert buckets.take("a") == 0.0
+
+
+def test_large_body_is_refused_before_parsing() -> None:
+    """Test that a body above the limit gets 413 without running Dash."""
+    admission = AdmissionControl(max_body_bytes=1024)
+    app = create_app(admission=admission)
+    response = _post(_client(app), b"{" + b" " * 2048 + b"}")
+
+    assert response.status_code == 413
+    assert admission.counts["too_large"] == 1
+    assert admission.counts["admitted"] == 0
+
+
+@pytest.mark.parametrize(
+    ("body", "status"),
+    [
+        (json.dumps(greeting_body("Ada")).encode(), "200 OK"),
+        (b"[" + b"1," * 4096 + b"1]", "413 Request Entity Too Large"),
+    ],
+    ids=["within", "over"],
+)
+def test_chunked_body_is_cut_off_at_the_limit(
+    body: bytes, status: str
+) -> None:
+    """Test that no more than the limit of a chunked body is read."""
+    admission = AdmissionControl(max_body_bytes=1024)
+    server = create_app(admission=admission).server
+    environ = EnvironBuilder(
+        CALLBACK, method="POST", content_type="application/json"
+    ).get_environ()
+    environ.pop("CONTENT_LENGTH", None)
+    environ["wsgi.input"] = io.BytesIO(body)
+    environ["wsgi.input_terminated"] = True
+    statuses = []
+    response = server(environ, lambda status, _: statuses.append(status))
+    if hasattr(response, "close"):
+        response.close()
+
+    assert [s.upper() for s in statuses] == [status.upper()]
+    assert environ["wsgi.input"].tell() <= 1025
+    # The slot is free again
+    assert admission.acquire()
+
+
+def test_rate_limit_is_per_client() -> None:
+    """Test that one client over its budget does not affect another."""
+    admission = AdmissionControl(rate=1, burst=2)
+    app = create_app(admission=admission)
+    greedy = _client(app, "greedy")
+
+    assert [_post(greedy).status_code for _ in range(3)] == [200, 200, 429]
+    refused = _post(greedy)
+    assert refused.headers["Retry-After"] == "1"
+    assert _post(_client(app, "polite")).status_code == 200
+    assert admission.counts == {
+        "too_large": 0,
+        "rate_limited": 2,
+        "overloaded": 0,
+        "admitted": 3,
+    }
+    assert admission.shed == 2
+
+
+def test_clients_without_cookie_share_their_address() -> None:
+    """Test that a fresh session id per request gives no fresh bucket."""
+    app = create_app(admission=AdmissionControl(rate=1, burst=1))
+    statuses = [_post(_client(app)).status_code for _ in range(2)]
+
+    assert statuses == [200, 429]
+
+
+def test_made_up_session_ids_share_their_address() -> None:
+    """Test that rotating cookies stops at the address's bucket."""
+    admission = AdmissionControl(rate=1, burst=1, per_address=3)
+    app = create_app(admission=admission)
+    statuses = [
+        _post(_client(app, f"made-up-{i}")).status_code for i in range(5)
+    ]
+    other = app.server.test_client()
+    elsewhere = _post(other, environ_base={"REMOTE_ADDR": "10.0.0.2"})
+
+    assert statuses == [200, 200, 200, 429, 429]
+    assert elsewhere.status_code == 200
+
+
+def test_full_queue_is_refused_at_once() -> None:
+    """Test the 503 when every slot is taken and nobody may wait."""
+    admission = AdmissionControl(rate=None, max_in_flight=1, max_queue=0)
+    app = create_app(admission=admission)
+    assert admission.acquire()
+
+    start = time.perf_counter()
+    response = _post(_client(app))
+
+    assert response.status_code == 503
+    assert time.perf_counter() - start < admission.queue_timeout
+    assert admission.counts["overloaded"] == 1
+
+
+def test_queued_request_runs_once_a_slot_frees() -> None:
+    """Test that a request waits in the queue for a slot."""
+    admission = AdmissionControl(rate=None, max_in_flight=1, max_queue=1)
+    app = create_app(admission=admission)
+    assert admission.acquire()
+    threading.Timer(0.05, admission.release).start()
+
+    assert _post(_client(app)).status_code == 200
+
+
+def test_slots_are_released_after_errors() -> None:
+    """Test that failed callbacks give their slot back."""
+    admission = AdmissionControl(rate=None, max_in_flight=1, max_queue=0)
+    app = create_app(admission=admission)
+    client = _client(app)
+
+    assert _post(client, {"output": "nope.children"}).status_code >= 400
+    assert _post(client).status_code == 200
+
+
+def test_other_requests_are_not_limited() -> None:
+    """Test that pages, layout and assets are outside admission control."""
+    admission = AdmissionControl(rate=1, burst=1)
+    client = _client(create_app(admission=admission), "tab")
+
+    for path in ("/", "/_dash-layout", "/_dash-dependencies") * 3:
+        assert client.get(path).status_code == 200
+    assert sum(admission.counts.values()) == 0
+
+
+def test_counters_on_metrics_endpoint() -> None:
+    """Test that shed requests show up in the Prometheus output."""
+    admission = AdmissionControl(max_body_bytes=10)
+    app = create_app(admission=admission, metrics=True)
+    client = _client(app, "tab")
+    _post(client)
+
+    text = client.get("/metrics").data.decode()
+    assert 'dash_lite_admission_requests_total{outcome="too_large"} 1' in text
+    assert "dash_lite_callback_duration_seconds" in text
+
+
+def test_configured_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the DASH_LITE_RATE_LIMIT family of variables."""
+    assert _admission_from_env() is None
+
+    monkeypatch.setenv("DASH_LITE_RATE_LIMIT", "5")
+    monkeypatch.setenv("DASH_LITE_MAX_IN_FLIGHT", "4")
+    admission = _admission_from_env()
+    assert admission is not None
+    assert (admission.buckets.rate, admission.buckets.burst) == (5.0, 10)
+    assert admission.max_in_flight == 4
+
+    monkeypatch.setenv("DASH_LITE_RATE_LIMIT", "0")
+    assert _admission_from_env().buckets is None
+
+
+def test_admission_is_opt_in(dash_app: Dash) -> None:
+    """Test that the default app has no admission control."""
+    assert "dash_lite.admission" not in dash_app.server.extensions
+
+
+# The server and the abusive clients run in processes of their own, so
+# that neither shares an interpreter lock with the measured client
+SERVER_SCRIPT = textwrap.dedent(
+    """
+    import json, sys
+    from werkzeug.serving import make_server
+    from dash_lite.admission import AdmissionControl
+    from dash_lite.app import create_app
+    from tests.helpers import QuietHandler
+
+    options = json.loads(sys.argv[1])
+    app = create_app(
+        admission=AdmissionControl(**options) if options is not None else None
+    )
+    httpd = make_server(
+        "127.0.0.1", 0, app.server, threaded=True,
+        request_handler=QuietHandler,
+    )
+    print(httpd.server_port, flush=True)
+    httpd.serve_forever()
+    """
+)
+
+ABUSE_SCRIPT = textwrap.dedent(
+    """
+    import http.client, json, sys, threading, time
+    from tests.helpers import greeting_body
+
+    port, clients, threads, rate, seconds = map(int, sys.argv[1:])
+    body = json.dumps(greeting_body("spam")).encode()
+    interval = clients * threads / rate
+    deadline = time.monotonic() + seconds
+
+    def hammer(cookie):
+        # Paced, ignoring Retry-After and falling behind when the server
+        # is slow, like a script in a loop
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        next_send = time.monotonic()
+        while next_send < deadline:
+            time.sleep(max(0.0, next_send - time.monotonic()))
+            next_send += interval
+            connection.request(
+                "POST", "/_dash-update-component", body=body,
+                headers={
+                    "Content-Type": "application/json",
+                    "Cookie": f"dash_lite_session={cookie}",
+                },
+            )
+            connection.getresponse().read()
+
+    workers = [
+        threading.Thread(target=hammer, args=(f"abuser-{i}",))
+        for i in range(clients)
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    """
+)
+
+ABUSIVE_CLIENTS = 4
+THREADS_PER_CLIENT = 16
+# Requests per second from all abusers together: more than the server
+# can answer with callbacks, not more than it can refuse
+ABUSE_RATE = 500
+POLITE_REQUESTS = 100
+# A fast typist: 10 keystrokes per second
+POLITE_INTERVAL = 0.1
+
+
+@contextmanager
+def _serve(options: dict | None) -> Iterator[int]:
+    """Run the app in a server process; yields its port."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, json.dumps(options)],
+        cwd=ROOT,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        yield int(process.stdout.readline())
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def _polite_p99(port: int, abuse: bool) -> float:
+    """p99 latency in ms of a client typing, with or without abusers."""
+    abusers = None
+    if abuse:
+        seconds = int(POLITE_REQUESTS * POLITE_INTERVAL) + 5
+        abusers = subprocess.Popen(
+            [
+                sys.executable,
+                "-c",
+                ABUSE_SCRIPT,
+                str(port),
+                str(ABUSIVE_CLIENTS),
+                str(THREADS_PER_CLIENT),
+                str(ABUSE_RATE),
+                str(seconds),
+            ],
+            cwd=ROOT,
+        )
+        time.sleep(1.0)
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {
+        "Content-Type": "application/json",
+        "Cookie": f"{SESSION_COOKIE}=polite",
+    }
+    latencies = []
+    try:
+        for i in range(POLITE_REQUESTS):
+            body = json.dumps(greeting_body(f"Ada {i}"))
+            start = time.perf_counter()
+            connection.request("POST", CALLBACK, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status == 200
+            time.sleep(POLITE_INTERVAL)
+    finally:
+        if abusers is not None:
+            abusers.kill()
+            abusers.wait()
+    return percentile(latencies, 99)
+
+
+@pytest.mark.slow
+def test_polite_latency_under_abuse() -> None:
+    """Compare a well-behaved client's p99 with and without limits."""
+    # Every simulated client connects from 127.0.0.1, so they are told
+    # apart by their cookie alone
+    limits = {
+        "rate": 20,
+        "max_in_flight": 4,
+        "max_queue": 8,
+        "per_address": None,
+    }
+    with _serve(limits) as port:
+        quiet = _polite_p99(port, abuse=False)
+        limited = _polite_p99(port, abuse=True)
+    with _serve(None) as port:
+        unlimited = _polite_p99(port, abuse=True)
+    print(
+        f"\npolite client p99: {quiet:.1f} ms quiet, "
+        f"{limited:.1f} ms under abuse with admission control, "
+        f"{unlimited:.1f} ms without"
+    )
+
+    # On a single core the abusers' own process still competes for the
+    # CPU, so only the comparison is asserted
+    assert limited < unlimited
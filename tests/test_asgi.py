@@ -0,0 +1,177 @@
+"""Tests for async callbacks served through the ASGI entry point."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from dash import Dash, Input, Output
+
+from dash_lite.app import create_app
+from dash_lite.asgi import create_asgi_app
+from dash_lite.metrics import CallbackMetrics
+
+# The ``async`` extra
+WsgiToAsgi = pytest.importorskip("asgiref.wsgi").WsgiToAsgi
+
+# Response time of the stub service
+DELAY = 0.25
+
+SERVICE_BODY = {
+    "output": "service-output.children",
+    "outputs": {"id": "service-output", "property": "children"},
+    "inputs": [{"id": "name-input", "property": "value", "value": "Ada"}],
+    "changedPropIds": ["name-input.value"],
+    "state": [],
+}
+
+
+async def _start_stub_service() -> tuple[asyncio.Server, int]:
+    """Start a TCP service answering each connection after DELAY."""
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        name = (await reader.readline()).decode().strip()
+        await asyncio.sleep(DELAY)
+        writer.write(f"Hi, {name}!\n".encode())
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+def _app_calling_service(port: int, **options: Any) -> Dash:
+    """Create an app with an async callback that calls the stub service."""
+    app = create_app(async_callbacks=True, **options)
+
+    @app.callback(
+        Output("service-output", "children"), Input("name-input", "value")
+    )
+    async def call_service(name: str) -> str:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"{name}\n".encode())
+        reply = await reader.readline()
+        writer.close()
+        return reply.decode().strip()
+
+    return app
+
+
+async def _asgi_post(
+    asgi_app: Callable, path: str, payload: dict
+) -> tuple[int, bytes]:
+    """Send one JSON POST to an ASGI app; return status and body."""
+    body = json.dumps(payload).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 50000),
+    }
+    incoming = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    return sent[0]["status"], b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def _run_concurrently(wrap: Callable[[Any], Callable], count: int) -> float:
+    """Fire ``count`` service callbacks at once; return the elapsed time."""
+
+    async def scenario() -> float:
+        service, port = await _start_stub_service()
+        asgi_app = wrap(_app_calling_service(port).server)
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                _asgi_post(asgi_app, "/_dash-update-component", SERVICE_BODY)
+                for _ in range(count)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        service.close()
+
+        for status, body in results:
+            assert status == 200
+            children = json.loads(body)["response"]["service-output"]
+            assert children == {"children": "Hi, Ada!"}
+        return elapsed
+
+    return asyncio.run(scenario())
+
+
+def test_slow_callbacks_run_concurrently() -> None:
+    """Test that ten slow callbacks take about as long as one."""
+    elapsed = _run_concurrently(create_asgi_app, count=10)
+    print(f"\n10 callbacks of {DELAY}s each: {elapsed:.2f}s")
+    assert elapsed < DELAY * 3
+
+
+def test_plain_wsgi_to_asgi_runs_serially() -> None:
+    """Test the baseline: asgiref's adapter queues requests on one thread."""
+    elapsed = _run_concurrently(WsgiToAsgi, count=4)
+    assert elapsed >= DELAY * 4 * 0.9
+
+
+def test_async_callbacks_are_timed() -> None:
+    """Test that metrics wait for the coroutine instead of timing it."""
+    app = create_app(async_callbacks=True, metrics=True)
+
+    @app.callback(
+        Output("service-output", "children"), Input("name-input", "value")
+    )
+    async def call_service(name: str) -> str:
+        await asyncio.sleep(0.05)
+        return name
+
+    response = app.server.test_client().post(
+        "/_dash-update-component", json=SERVICE_BODY
+    )
+    assert response.status_code == 200
+
+    metrics: CallbackMetrics = app.server.extensions["dash_lite.metrics"]
+    counts, total, count = metrics.duration._series["call_service"]
+    assert count == 1
+    assert total >= 0.05
+    assert metrics.response_bytes._series["call_service"][1] == len(
+        response.data
+    )
+
+
+def test_rejects_empty_thread_pool() -> None:
+    """Test that an ASGI app without threads is refused."""
+    with pytest.raises(ValueError):
+        create_asgi_app(create_app().server, max_threads=0)
+
+
+def test_asgiref_internals_are_present() -> None:
+    """Test the asgiref internals that create_asgi_app relies on."""
+    # Fails first if the pin in the ``async`` extra is widened too far
+    from asgiref.wsgi import WsgiToAsgiInstance
+
+    assert callable(vars(WsgiToAsgiInstance)["run_wsgi_app"].func)
+    assert WsgiToAsgi(create_app().server).duplicate_header_limit
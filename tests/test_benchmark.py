@@ -0,0 +1,292 @@
+"""
+Load test and benchmark of ``create_app().server``.
+
+Simulated browser sessions load the page, fetch the layout and the
+callback dependencies, type a name into ``update_greeting`` one key at a
+time and toggle the navbar. They run concurrently, once through the WSGI
+test client (the app alone) and once against a local threaded HTTP server
+(the app plus sockets and HTTP parsing).
+
+Requests/sec and p50/p95/p99 latency are reported per endpoint and
+compared with a JSON baseline; the first run (or ``--update-baseline``)
+writes it. Run with::
+
+    pytest tests/test_benchmark.py --run-slow -s
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pytest
+from flask import Flask
+
+from dash_lite.app import create_app
+from tests.helpers import greeting_body, local_server, percentile
+
+SESSIONS = 50
+CONCURRENCY = 8
+TYPED_NAME = "Ada Lovelace"
+TOGGLES = 2
+
+# Latencies this close to the baseline pass regardless of the tolerance;
+# sub-millisecond timings are mostly scheduler noise
+LATENCY_SLACK_MS = 1.0
+
+# (method, path, JSON body) -> (status, response body)
+Send = Callable[[str, str, dict | None], tuple[int, bytes]]
+
+
+def toggle_body(opened: bool) -> dict:
+    """Request body of ``toggle_navbar``."""
+    return {
+        "output": "app-shell.navbar",
+        "outputs": {"id": "app-shell", "property": "navbar"},
+        "inputs": [
+            {"id": "burger-button", "property": "opened", "value": opened}
+        ],
+        "changedPropIds": ["burger-button.opened"],
+        "state": [],
+    }
+
+
+def session_steps() -> Iterator[tuple[str, str, str, dict | None]]:
+    """Yield ``(endpoint, method, path, body)`` of one browser session."""
+    yield "index", "GET", "/", None
+    yield "layout", "GET", "/_dash-layout", None
+    yield "dependencies", "GET", "/_dash-dependencies", None
+    for length in range(1, len(TYPED_NAME) + 1):
+        yield (
+            "update_greeting",
+            "POST",
+            "/_dash-update-component",
+            greeting_body(TYPED_NAME[:length]),
+        )
+    for toggle in range(TOGGLES):
+        yield (
+            "toggle_navbar",
+            "POST",
+            "/_dash-update-component",
+            toggle_body(opened=toggle % 2 == 0),
+        )
+
+
+def run_sessions(
+    send_factory: Callable[[], Send],
+    sessions: int = SESSIONS,
+    concurrency: int = CONCURRENCY,
+) -> dict[str, dict[str, float]]:
+    """
+    Run browser sessions concurrently and summarize the latencies.
+
+    Args:
+        send_factory: Returns the request function of a new session.
+        sessions: Number of sessions.
+        concurrency: Sessions running at the same time.
+
+    Returns:
+        Per endpoint: request count, requests/sec over the whole run and
+        p50/p95/p99 latency in milliseconds.
+    """
+    latencies: dict[str, list[float]] = defaultdict(list)
+    lock = threading.Lock()
+
+    def session() -> None:
+        send = send_factory()
+        for endpoint, method, path, body in session_steps():
+            start = time.perf_counter()
+            status, _ = send(method, path, body)
+            elapsed = time.perf_counter() - start
+            assert status == 200, f"{endpoint}: HTTP {status}"
+            with lock:
+                latencies[endpoint].append(elapsed * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(session) for _ in range(sessions)]:
+            future.result()
+    wall = time.perf_counter() - start
+
+    return {
+        endpoint: {
+            "requests": len(values),
+            "rps": round(len(values) / wall, 1),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+        }
+        for endpoint, values in sorted(latencies.items())
+    }
+
+
+def wsgi_sender(server: Flask) -> Callable[[], Send]:
+    """Sessions talking to the app through the WSGI test client."""
+
+    def factory() -> Send:
+        client = server.test_client()
+
+        def send(method: str, path: str, body: dict | None) -> Any:
+            response = client.open(path, method=method, json=body)
+            return response.status_code, response.data
+
+        return send
+
+    return factory
+
+
+def http_sender(port: int) -> Callable[[], Send]:
+    """Sessions with a keep-alive HTTP connection each."""
+
+    def factory() -> Send:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+
+        def send(method: str, path: str, body: dict | None) -> Any:
+            headers = {"Content-Type": "application/json"} if body else {}
+            connection.request(
+                method,
+                path,
+                body=json.dumps(body) if body is not None else None,
+                headers=headers,
+            )
+            response = connection.getresponse()
+            return response.status, response.read()
+
+        return send
+
+    return factory
+
+
+def find_regressions(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Compare benchmark results with a baseline.
+
+    Args:
+        results: Per transport and endpoint summaries of this run.
+        baseline: The same from the baseline run.
+        tolerance: Allowed relative slowdown, e.g. ``0.25`` for 25%.
+
+    Returns:
+        One message per metric that regressed beyond the tolerance.
+    """
+    regressions = []
+    for transport, endpoints in results.items():
+        for endpoint, current in endpoints.items():
+            reference = baseline.get(transport, {}).get(endpoint)
+            if reference is None:
+                continue
+            name = f"{transport}/{endpoint}"
+            for metric in ("p50_ms", "p95_ms"):
+                limit = reference[metric] * (1 + tolerance)
+                if current[metric] > limit + LATENCY_SLACK_MS:
+                    regressions.append(
+                        f"{name} {metric}: {current[metric]} > "
+                        f"{reference[metric]} (+{tolerance:.0%})"
+                    )
+            if current["rps"] < reference["rps"] / (1 + tolerance):
+                regressions.append(
+                    f"{name} rps: {current['rps']} < "
+                    f"{reference['rps']} (-{tolerance:.0%})"
+                )
+    return regressions
+
+
+def _report(results: dict[str, dict[str, dict[str, float]]]) -> None:
+    """Print a table of the results."""
+    print(
+        f"\n{'transport/endpoint':<30} {'requests':>8} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for transport, endpoints in results.items():
+        for endpoint, row in endpoints.items():
+            print(
+                f"{transport + '/' + endpoint:<30} {row['requests']:>8} "
+                f"{row['rps']:>9} {row['p50_ms']:>8} {row['p95_ms']:>8} "
+                f"{row['p99_ms']:>8}"
+            )
+
+
+class TestRegressionCheck:
+    """Tests for the baseline comparison."""
+
+    BASELINE = {
+        "wsgi": {
+            "layout": {
+                "requests": 20,
+                "rps": 100.0,
+                "p50_ms": 10.0,
+                "p95_ms": 20.0,
+                "p99_ms": 30.0,
+            }
+        }
+    }
+
+    def test_within_tolerance_passes(self) -> None:
+        """Test that a slowdown inside the tolerance is accepted."""
+        results = {
+            "wsgi": {
+                "layout": {"rps": 90.0, "p50_ms": 11.0, "p95_ms": 23.0},
+                "index": {"rps": 1.0, "p50_ms": 99.0, "p95_ms": 99.0},
+            }
+        }
+        assert find_regressions(results, self.BASELINE, 0.2) == []
+
+    def test_slowdown_beyond_tolerance_fails(self) -> None:
+        """Test that slower latency and lower throughput are reported."""
+        results = {
+            "wsgi": {"layout": {"rps": 50.0, "p50_ms": 10.0, "p95_ms": 40.0}}
+        }
+        regressions = find_regressions(results, self.BASELINE, 0.2)
+
+        assert [message.split(":")[0] for message in regressions] == [
+            "wsgi/layout p95_ms",
+            "wsgi/layout rps",
+        ]
+
+
+def test_percentile_is_nearest_rank() -> None:
+    """Test the percentile definition used in the reports."""
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+
+
+@pytest.mark.slow
+def test_load_benchmark(request: pytest.FixtureRequest) -> None:
+    """Load test the app and compare with the saved baseline."""
+    server = create_app().server
+    results = {"wsgi": run_sessions(wsgi_sender(server))}
+    with local_server(server) as port:
+        results["http"] = run_sessions(http_sender(port))
+    _report(results)
+
+    expected = SESSIONS * (len(TYPED_NAME) + 3 + TOGGLES)
+    assert sum(row["requests"] for row in results["wsgi"].values()) == (
+        expected
+    )
+
+    path = Path(request.config.getoption("--benchmark-baseline"))
+    if request.config.getoption("--update-baseline") or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {path}")
+        return
+
+    tolerance = request.config.getoption("--benchmark-tolerance")
+    regressions = find_regressions(
+        results, json.loads(path.read_text()), tolerance
+    )
+    assert not regressions, "\n".join(regressions)
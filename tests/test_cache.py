@@ -0,0 +1,206 @@
+"""Tests for the callback result cache."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import dash_mantine_components as dmc
+import pytest
+
+from dash_lite import cache as cache_module
+from dash_lite.app import create_app
+from dash_lite.cache import MISSING, CallbackCache, LRUCache, SQLiteCache
+
+
+def _greeting_request(client, name: str, changed: str) -> dict:
+    """Post a greeting callback request and return the decoded response."""
+    body = {
+        "output": "greeting-output.children",
+        "outputs": {"id": "greeting-output", "property": "children"},
+        "inputs": [
+            {"id": "greeting-style", "property": "value", "value": "short"},
+            {"id": "name-input", "property": "value", "value": name},
+        ],
+        "changedPropIds": [f"{changed}.value"],
+        "state": [],
+    }
+    response = client.post("/_dash-update-component", json=body)
+    assert response.status_code == 200
+    return response.get_json()["response"]["greeting-output"]["children"]
+
+
+class TestLRUCache:
+    """Tests for the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the oldest untouched entry is evicted first."""
+        lru = LRUCache(maxsize=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        assert lru.get("a") == 1  # "b" is now least recently used
+        lru.set("c", 3)
+
+        assert lru.get("b") is MISSING
+        assert (lru.get("a"), lru.get("c")) == (1, 3)
+        assert len(lru) == 2
+
+    def test_entries_expire_after_ttl(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that entries older than the TTL are dropped."""
+        now = [100.0]
+        monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+        lru = LRUCache(ttl=10)
+        lru.set("a", 1)
+
+        now[0] = 109.0
+        assert lru.get("a") == 1
+        now[0] = 111.0
+        assert lru.get("a") is MISSING
+        assert len(lru) == 0
+
+    def test_rejects_empty_cache(self) -> None:
+        """Test that a cache without room is refused."""
+        with pytest.raises(ValueError):
+            LRUCache(maxsize=0)
+
+
+class TestSQLiteCache:
+    """Tests for the shared SQLite cache."""
+
+    def test_shared_between_instances(self, tmp_path: Path) -> None:
+        """Test that a second instance (another worker) sees entries."""
+        path = tmp_path / "cache.sqlite"
+        SQLiteCache(path).set("k", dmc.Text("Hi", size="lg"))
+
+        value = SQLiteCache(path).get("k")
+        assert value == {
+            "type": "Text",
+            "namespace": "dash_mantine_components",
+            "props": {"children": "Hi", "size": "lg"},
+        }
+
+    def test_entries_expire_after_ttl(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that expired rows are treated as missing."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+        shared = SQLiteCache(tmp_path / "cache.sqlite", ttl=5)
+        shared.set("k", [1, 2])
+
+        assert shared.get("k") == [1, 2]
+        now[0] = 1006.0
+        assert shared.get("k") is MISSING
+
+    def test_set_purges_expired_rows(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that expired rows are deleted, not just skipped."""
+        now = [1000.0]
+        monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+        shared = SQLiteCache(tmp_path / "cache.sqlite", ttl=5)
+        for key in ("a", "b", "c"):
+            shared.set(key, key)
+        SQLiteCache(tmp_path / "cache.sqlite").set("forever", 1)
+        now[0] = 1006.0
+        shared.set("d", "d")
+
+        rows = shared._connect().execute(
+            "SELECT key FROM callback_cache ORDER BY key"
+        )
+        assert [key for (key,) in rows] == ["d", "forever"]
+
+    def test_delete(self, tmp_path: Path) -> None:
+        """Test that deleted entries are gone and unknown keys are ignored."""
+        shared = SQLiteCache(tmp_path / "cache.sqlite")
+        shared.set("k", 1)
+        shared.delete("k")
+        shared.delete("unknown")
+
+        assert shared.get("k") is MISSING
+
+
+class TestCallbackCache:
+    """Tests for wrapping callbacks with a cache."""
+
+    def test_counts_hits_and_misses(self) -> None:
+        """Test that repeated inputs are served without calling again."""
+        calls: list[tuple] = []
+        callback_cache = CallbackCache()
+
+        @callback_cache.wrap
+        def double(value: int) -> int:
+            calls.append((value,))
+            return value * 2
+
+        assert [double(1), double(1), double(2), double(1)] == [2, 2, 4, 2]
+        assert calls == [(1,), (2,)]
+        assert callback_cache.stats() == {"hits": 2, "misses": 2}
+
+    def test_shared_hit_fills_local_cache(self, tmp_path: Path) -> None:
+        """Test that a result computed by another worker is reused."""
+        path = tmp_path / "cache.sqlite"
+        worker_a = CallbackCache(shared=SQLiteCache(path))
+        worker_b = CallbackCache(shared=SQLiteCache(path))
+
+        def greet(name: str) -> str:
+            return f"Hi, {name}!"
+
+        assert worker_a.wrap(greet)("Ada") == "Hi, Ada!"
+        assert worker_b.wrap(greet)("Ada") == "Hi, Ada!"
+        assert worker_b.stats() == {"hits": 1, "misses": 0}
+        assert len(worker_b.local) == 1
+
+
+class TestGreetingCache:
+    """Tests for the cache applied to update_greeting."""
+
+    def test_repeat_request_is_a_hit(self) -> None:
+        """Test that the same greeting request is served from cache."""
+        callback_cache = CallbackCache()
+        client = create_app(callback_cache=callback_cache).server.test_client()
+
+        first = _greeting_request(client, "Ada", changed="name-input")
+        second = _greeting_request(client, "Ada", changed="name-input")
+
+        assert first == second
+        assert callback_cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_trigger_is_part_of_the_key(self) -> None:
+        """Test that data-triggered-by stays correct for cached results."""
+        callback_cache = CallbackCache()
+        client = create_app(callback_cache=callback_cache).server.test_client()
+
+        by_name = _greeting_request(client, "Ada", changed="name-input")
+        by_style = _greeting_request(client, "Ada", changed="greeting-style")
+
+        assert by_name["props"]["data-triggered-by"] == "name-input"
+        assert by_style["props"]["data-triggered-by"] == "greeting-style"
+        assert callback_cache.stats() == {"hits": 0, "misses": 2}
+
+    def test_shared_backend_response_matches_fresh(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that a result read back from SQLite is sent unchanged."""
+        path = tmp_path / "cache.sqlite"
+        fresh_client = create_app(
+            callback_cache=CallbackCache(shared=SQLiteCache(path))
+        ).server.test_client()
+        other_cache = CallbackCache(shared=SQLiteCache(path))
+        other_client = create_app(
+            callback_cache=other_cache
+        ).server.test_client()
+
+        fresh = _greeting_request(fresh_client, "Ada", changed="name-input")
+        shared = _greeting_request(other_client, "Ada", changed="name-input")
+
+        assert json.dumps(shared, sort_keys=True) == json.dumps(
+            fresh, sort_keys=True
+        )
+        assert other_cache.stats() == {"hits": 1, "misses": 0}
+
+    def test_no_cache_by_default(self) -> None:
+        """Test that caching is opt-in."""
+        assert "dash_lite.callback_cache" not in create_app().server.extensions
@@ -2,10 +2,25 @@
 
 from __future__ import annotations
 
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import dash_mantine_components as dmc
+import pytest
 from dash import Dash
+from dash._utils import to_json
 
+import dash_lite
+from dash_lite.app import create_app
 from dash_lite.callbacks import _build_greeting, register_callbacks
 
+CASES_FILE = Path(__file__).parent / "greeting_cases.json"
+GREETING_CASES = json.loads(CASES_FILE.read_text(encoding="utf-8"))
+GREETING_JS = Path(dash_lite.__file__).parent / "assets" / "greeting.js"
+NODE = shutil.which("node")
+
 
 class TestBuildGreeting:
     """Tests for the _build_greeting helper function."""
@@ -72,15 +87,86 @@ def test_greeting_callback_is_registered(dash_app: Dash) -> None:
 
 def test_navbar_toggle_callback_is_registered(dash_app: Dash) -> None:
     """Test that the navbar toggle callback is properly registered."""
-    # Multi-output callbacks use ".." to join output IDs
-    callback_id = "..burger-button.opened...app-shell.navbar.."
+    callback_id = "app-shell.navbar"
     callback = dash_app.callback_map.get(callback_id)
 
     assert callback is not None
     assert len(callback["inputs"]) == 1
     assert callback["inputs"][0]["id"] == "burger-button"
-    assert callback["inputs"][0]["property"] == "n_clicks"
-    # Check for state
-    assert len(callback["state"]) == 1
-    assert callback["state"][0]["id"] == "app-shell"
-    assert callback["state"][0]["property"] == "navbar"
+    assert callback["inputs"][0]["property"] == "opened"
+    # The navbar configuration is patched, not sent back and forth
+    assert callback["state"] == []
+
+
+def test_register_callbacks_rejects_unknown_greeting_mode() -> None:
+    """Test that an unknown greeting mode is refused."""
+    with pytest.raises(ValueError):
+        register_callbacks(Dash(__name__), greeting_mode="edge")
+
+
+def test_client_greeting_mode_registers_clientside_callback() -> None:
+    """Test that client mode wires update_greeting to the JS function."""
+    app = create_app(greeting_mode="client")
+
+    greeting = next(
+        cb
+        for cb in app._callback_list
+        if cb["output"] == "greeting-output.children"
+    )
+    assert greeting["clientside_function"] == {
+        "namespace": "dash_lite",
+        "function_name": "update_greeting",
+    }
+    # No Python function behind it: the browser does the work
+    assert "callback" not in app.callback_map["greeting-output.children"]
+
+
+class TestGreetingParity:
+    """Check the Python and JavaScript greetings against one table."""
+
+    @pytest.mark.parametrize(("style", "name", "expected"), GREETING_CASES)
+    def test_python_matches_table(
+        self, style: str, name: str, expected: str
+    ) -> None:
+        """Test _build_greeting against every shared case."""
+        assert _build_greeting(style, name) == expected
+
+    @pytest.mark.skipif(NODE is None, reason="node is not installed")
+    def test_javascript_matches_table(self) -> None:
+        """Test assets/greeting.js build_greeting against every case."""
+        script = (
+            f"const g = require({json.dumps(str(GREETING_JS))});"
+            f"const cases = require({json.dumps(str(CASES_FILE))});"
+            "console.log(JSON.stringify("
+            "cases.map(([s, n]) => g.build_greeting(s, n))));"
+        )
+        results = _run_node(script)
+        assert results == [expected for _, _, expected in GREETING_CASES]
+
+    @pytest.mark.skipif(NODE is None, reason="node is not installed")
+    def test_javascript_component_matches_server(self) -> None:
+        """Test that both update_greeting versions return the same Text."""
+        script = (
+            "globalThis.dash_clientside = {callback_context: "
+            "{triggered_id: 'name-input'}};"
+            f"const g = require({json.dumps(str(GREETING_JS))});"
+            "console.log(JSON.stringify(g.update_greeting('short', 'Ada')));"
+        )
+        server = dmc.Text(
+            "Hi, Ada!",
+            size="lg",
+            fw="bold",
+            **{"data-triggered-by": "name-input"},  # type: ignore
+        )
+        assert _run_node(script) == json.loads(to_json(server))
+
+
+def _run_node(script: str) -> object:
+    """Run a snippet with node and decode the JSON it prints."""
+    result = subprocess.run(
+        [NODE, "-e", script],
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    return json.loads(result.stdout)
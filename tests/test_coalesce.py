@@ -0,0 +1,228 @@
+"""Tests for request coalescing and the session cookie."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import flask
+import pytest
+from dash.exceptions import PreventUpdate
+
+from dash_lite import callbacks
+from dash_lite.app import create_app
+from dash_lite.coalesce import RequestCoalescer
+from dash_lite.session import (
+    SESSION_COOKIE,
+    get_session_id,
+    install_session_cookie,
+)
+
+TYPED_NAME = "Alexandria"
+
+
+def _greeting_payload(name: str) -> str:
+    """Build the callback request body for one keystroke."""
+    return json.dumps(
+        {
+            "output": "greeting-output.children",
+            "outputs": {"id": "greeting-output", "property": "children"},
+            "inputs": [
+                {
+                    "id": "greeting-style",
+                    "property": "value",
+                    "value": "short",
+                },
+                {"id": "name-input", "property": "value", "value": name},
+            ],
+            "changedPropIds": ["name-input.value"],
+            "state": [],
+        }
+    )
+
+
+def _wait_until(condition, timeout: float = 5.0) -> None:
+    """Poll until ``condition()`` is true."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.001)
+
+
+class TestRequestCoalescer:
+    """Tests for the latest-request-wins gate."""
+
+    def test_queued_request_superseded_by_newer_one_is_dropped(
+        self,
+    ) -> None:
+        """Test that of three queued calls only the first and last run."""
+        coalescer = RequestCoalescer(session_key=lambda: "tab-1")
+        release = threading.Event()
+        ran: list[str] = []
+
+        def slow(value: str) -> str:
+            if value == "a":
+                release.wait(5)
+            ran.append(value)
+            return value
+
+        gated = coalescer.wrap(slow)
+        outcomes: dict[str, str] = {}
+
+        def call(value: str) -> None:
+            try:
+                outcomes[value] = gated(value)
+            except PreventUpdate:
+                outcomes[value] = "dropped"
+
+        first = threading.Thread(target=call, args=("a",))
+        first.start()
+        _wait_until(lambda: coalescer.executed == 1)
+
+        queued = [threading.Thread(target=call, args=(v,)) for v in "bc"]
+        for index, thread in enumerate(queued, start=2):
+            thread.start()
+            _wait_until(lambda i=index: max(coalescer._latest.values()) == i)
+        release.set()
+        for thread in [first, *queued]:
+            thread.join(5)
+
+        assert ran == ["a", "c"]
+        assert outcomes == {"a": "a", "b": "dropped", "c": "c"}
+        assert (coalescer.executed, coalescer.dropped) == (2, 1)
+
+    def test_sessions_do_not_drop_each_other(self) -> None:
+        """Test that requests of different sessions are independent."""
+        sessions = iter(["tab-1", "tab-2"])
+        coalescer = RequestCoalescer(session_key=lambda: next(sessions))
+        gated = coalescer.wrap(lambda value: value)
+
+        assert gated("x") == "x"
+        assert gated("y") == "y"
+        assert coalescer.dropped == 0
+
+    def test_bookkeeping_is_released(self) -> None:
+        """Test that idle sessions leave no state behind."""
+        coalescer = RequestCoalescer(session_key=lambda: "tab-1")
+        coalescer.wrap(lambda: None)()
+
+        assert coalescer._latest == {}
+        assert coalescer._turns == {}
+
+
+class TestSessionCookie:
+    """Tests for the anonymous session id cookie."""
+
+    @pytest.fixture
+    def server(self) -> flask.Flask:
+        """Flask app echoing the session id."""
+        server = flask.Flask(__name__)
+        install_session_cookie(server)
+        server.add_url_rule("/", "whoami", get_session_id)
+        return server
+
+    def test_cookie_is_assigned_once(self, server: flask.Flask) -> None:
+        """Test that the first response sets the id, later ones reuse it."""
+        client = server.test_client()
+        first = client.get("/")
+        cookie = client.get_cookie(SESSION_COOKIE)
+
+        assert cookie is not None
+        assert first.data.decode() == cookie.value
+        second = client.get("/")
+        assert second.data.decode() == cookie.value
+        assert "Set-Cookie" not in second.headers
+
+    def test_fallback_without_cookie_support(self) -> None:
+        """Test that the client address stands in when there is no id."""
+        server = flask.Flask(__name__)
+        with server.test_request_context(
+            environ_base={"REMOTE_ADDR": "1.2.3.4"}
+        ):
+            assert get_session_id() == "addr:1.2.3.4"
+
+
+def test_create_app_wires_coalescer() -> None:
+    """Test that coalescing is opt-in and exposed on the server."""
+    assert "dash_lite.coalescer" not in create_app().server.extensions
+
+    app = create_app(coalesce_requests=True)
+    client = app.server.test_client()
+    response = client.post(
+        "/_dash-update-component",
+        data=_greeting_payload("Ada"),
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert app.server.extensions["dash_lite.coalescer"].executed == 1
+
+
+def _modelled_debounced_sends(
+    keystrokes_ms: list[float], wait_ms: float
+) -> int:
+    """Model the values a debounced input would send for a timeline.
+
+    The debounce runs in the browser, so this is an estimate from the
+    keystroke gaps, not a measurement of ``dcc.Input``.
+    """
+    gaps = [
+        b - a for a, b in zip(keystrokes_ms, keystrokes_ms[1:], strict=False)
+    ]
+    # One send per pause longer than the debounce, plus the final value
+    return sum(gap >= wait_ms for gap in gaps) + 1
+
+
+def _type_name(app, keystroke_ms: float) -> int:
+    """Post one request per keystroke from a single session."""
+    threads = []
+    for length in range(1, len(TYPED_NAME) + 1):
+        client = app.server.test_client()
+        client.set_cookie(SESSION_COOKIE, "typist")
+        thread = threading.Thread(
+            target=client.post,
+            args=("/_dash-update-component",),
+            kwargs={
+                "data": _greeting_payload(TYPED_NAME[:length]),
+                "content_type": "application/json",
+            },
+        )
+        thread.start()
+        threads.append(thread)
+        time.sleep(keystroke_ms / 1000)
+    for thread in threads:
+        thread.join()
+    return len(threads)
+
+
+@pytest.mark.slow
+def test_typing_session_benchmark(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Count greeting callbacks per typing session before and after."""
+    keystroke_ms = 40.0
+    callback_ms = 100.0
+    original = callbacks._build_greeting
+
+    def busy_build_greeting(style: str, name: str) -> str:
+        # Stand-in for a loaded server: each callback takes a while
+        time.sleep(callback_ms / 1000)
+        return original(style, name)
+
+    monkeypatch.setattr(callbacks, "_build_greeting", busy_build_greeting)
+
+    app = create_app(coalesce_requests=True)
+    coalescer = app.server.extensions["dash_lite.coalescer"]
+    sent = _type_name(app, keystroke_ms)
+
+    timeline = [i * keystroke_ms for i in range(len(TYPED_NAME))]
+    debounced = _modelled_debounced_sends(timeline, wait_ms=300)
+
+    print(
+        f"\ncallbacks per typing session of {len(TYPED_NAME)} keystrokes: "
+        f"before={sent}  coalesced={coalescer.executed} "
+        f"(dropped {coalescer.dropped})  "
+        f"debounced(300ms, modelled, not measured)={debounced}"
+    )
+    assert coalescer.executed + coalescer.dropped == sent
+    assert coalescer.executed < sent
+    assert debounced == 1
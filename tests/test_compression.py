@@ -0,0 +1,187 @@
+"""Tests for response compression and static bundle caching."""
+
+from __future__ import annotations
+
+import gzip
+import re
+
+import flask
+import pytest
+from dash import Dash
+
+from dash_lite.app import create_app
+from dash_lite.compression import IMMUTABLE, choose_encoding
+
+ALL_ENCODINGS = {"Accept-Encoding": "gzip, deflate, br"}
+
+
+@pytest.fixture(scope="module")
+def app() -> Dash:
+    """App with compression enabled."""
+    return create_app(compression=True)
+
+
+def _page_load_urls(client) -> list[str]:
+    """Return the script and stylesheet URLs of the index page."""
+    html = client.get("/").data.decode()
+    return re.findall(r'(?:src|href)="(/_dash-[^"]+|/assets/[^"]+)"', html)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", {"br", "gzip"}),
+        ("gzip", {"gzip"}),
+        ("br;q=0, gzip", {"gzip"}),
+        ("identity", {None}),
+        ("", {None}),
+    ],
+)
+def test_choose_encoding(header: str, expected: set[str | None]) -> None:
+    """Test that brotli is preferred and q=0 is honoured."""
+    # "br" is only picked when the optional brotli package is installed
+    assert choose_encoding(header) in expected
+
+
+def test_fingerprinted_bundles_are_immutable(app: Dash) -> None:
+    """Test that versioned bundle URLs are cached for a year."""
+    client = app.server.test_client()
+    urls = [u for u in _page_load_urls(client) if "component-suites" in u]
+
+    assert urls
+    for url in urls:
+        response = client.get(url, headers=ALL_ENCODINGS)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == IMMUTABLE
+        assert response.headers["Content-Encoding"] in ("br", "gzip")
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_compressed_bundle_round_trips(app: Dash) -> None:
+    """Test that gzip clients get the bytes plain clients get."""
+    client = app.server.test_client()
+    url = next(u for u in _page_load_urls(client) if u.endswith(".js"))
+
+    plain = client.get(url)
+    zipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert zipped.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(zipped.data) == plain.data
+
+
+def test_unfingerprinted_bundle_gets_etag(app: Dash) -> None:
+    """Test that a plain bundle URL is revalidated instead."""
+    client = app.server.test_client()
+    url = next(u for u in _page_load_urls(client) if u.endswith(".js"))
+    url = re.sub(r"\.v\w+m\d+", "", url)
+
+    first = client.get(url)
+    assert "immutable" not in first.headers.get("Cache-Control", "")
+    second = client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 304
+
+
+def test_etag_is_per_encoding() -> None:
+    """Test that compressed responses do not share the identity ETag."""
+    app = create_app(compression=True)
+
+    @app.server.route("/report.json")
+    def report() -> flask.Response:
+        response = flask.jsonify(rows=list(range(1000)))
+        response.set_etag("report-v1")
+        return response.make_conditional(flask.request)
+
+    client = app.server.test_client()
+    plain = client.get("/report.json")
+    zipped = client.get("/report.json", headers={"Accept-Encoding": "gzip"})
+
+    assert plain.headers["ETag"] == '"report-v1"'
+    assert zipped.headers["ETag"] == '"report-v1-gzip"'
+    revalidated = client.get(
+        "/report.json",
+        headers={
+            "Accept-Encoding": "gzip",
+            "If-None-Match": '"report-v1-gzip"',
+        },
+    )
+    assert revalidated.status_code == 304
+    url = next(u for u in _page_load_urls(client) if u.endswith(".js"))
+    bundle = client.get(
+        re.sub(r"\.v\w+m\d+", "", url), headers={"Accept-Encoding": "gzip"}
+    )
+    assert bundle.headers["ETag"].endswith('-gzip"')
+
+
+def test_missing_bundle_is_404(app: Dash) -> None:
+    """Test that a registered file the package doesn't ship is a 404."""
+    client = app.server.test_client()
+    url = next(
+        u for u in _page_load_urls(client) if "dash_mantine_components" in u
+    )
+    missing = url.rsplit("/", 1)[0] + "/does-not-exist.js"
+
+    # Dash answers unregistered paths itself; pretend this one is known
+    app.registered_paths["dash_mantine_components"].add("does-not-exist.js")
+    try:
+        assert client.get(missing).status_code == 404
+    finally:
+        app.registered_paths["dash_mantine_components"].discard(
+            "does-not-exist.js"
+        )
+
+
+def test_assets_with_mtime_are_immutable(app: Dash) -> None:
+    """Test that fingerprinted /assets/ URLs are cached for a year."""
+    client = app.server.test_client()
+    url = next(u for u in _page_load_urls(client) if u.startswith("/assets/"))
+
+    assert "?m=" in url
+    response = client.get(url)
+    assert response.headers["Cache-Control"] == IMMUTABLE
+
+
+def test_small_responses_are_not_compressed(app: Dash) -> None:
+    """Test that bodies below the threshold are sent as-is."""
+    client = app.server.test_client()
+    response = client.get("/_dash-dependencies", headers=ALL_ENCODINGS)
+
+    assert response.status_code == 200
+    if len(response.data) < 1024:
+        assert "Content-Encoding" not in response.headers
+
+
+def test_initial_page_load_bytes_on_the_wire(app: Dash) -> None:
+    """Test that compression shrinks the whole first page load."""
+    client = app.server.test_client()
+    urls = [
+        "/",
+        *_page_load_urls(client),
+        "/_dash-layout",
+        "/_dash-dependencies",
+    ]
+
+    def transferred(headers: dict[str, str]) -> int:
+        total = 0
+        for url in urls:
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, url
+            total += len(response.data)
+        return total
+
+    plain = transferred({})
+    compressed = transferred(ALL_ENCODINGS)
+    print(
+        f"\ninitial page load: {plain / 1024:.0f} KiB uncompressed, "
+        f"{compressed / 1024:.0f} KiB compressed"
+    )
+    assert compressed < plain / 3
+
+
+def test_disabled_by_default() -> None:
+    """Test that a default app sends uncompressed bundles."""
+    client = create_app().server.test_client()
+    url = next(u for u in _page_load_urls(client) if u.endswith(".js"))
+
+    response = client.get(url, headers=ALL_ENCODINGS)
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,314 @@
+"""Tests for the per-session server-side data store."""
+
+from __future__ import annotations
+
+import json
+import time
+from functools import partial
+from pathlib import Path
+
+import dash_mantine_components as dmc
+import pytest
+from dash import Input, Output, dcc, html
+
+from dash_lite import datastore
+from dash_lite.app import _data_store_from_env, create_app
+from dash_lite.datastore import SessionDataStore, get_data_store
+from dash_lite.layout import create_layout
+
+np = pytest.importorskip("numpy")
+
+
+def test_values_belong_to_their_session() -> None:
+    """Test that a handle only resolves in the session that stored it."""
+    store = SessionDataStore()
+    handle = store.put({"rows": [1, 2, 3]}, session_id="ada")
+
+    assert store.get(handle, session_id="ada") == {"rows": [1, 2, 3]}
+    with pytest.raises(KeyError):
+        store.get(handle, session_id="bob")
+
+
+def test_named_keys_replace_their_value() -> None:
+    """Test storing twice under one key."""
+    store = SessionDataStore()
+    store.put(np.zeros(10), key="data", session_id="ada")
+    store.put(np.ones(20), key="data", session_id="ada")
+
+    assert store.get("data", session_id="ada").tolist() == [1.0] * 20
+    assert store.memory_bytes == 160
+    with pytest.raises(ValueError, match="key"):
+        store.put(1, key="../etc", session_id="ada")
+
+
+def test_evicts_least_recently_used() -> None:
+    """Test the byte bound without a spill directory."""
+    store = SessionDataStore(max_bytes=2000)
+    first = store.put(np.zeros(100), session_id="ada")
+    second = store.put(np.zeros(100), session_id="ada")
+    store.get(first, session_id="ada")
+    store.put(np.zeros(100), session_id="bob")
+
+    assert store.memory_bytes == 1600
+    with pytest.raises(KeyError):
+        store.get(second, session_id="ada")
+    with pytest.raises(ValueError, match="exceeds"):
+        store.put(np.zeros(1000), session_id="ada")
+
+
+def test_spilled_arrays_are_memory_mapped(tmp_path: Path) -> None:
+    """Test that evicted arrays and tables come back without copying."""
+    store = SessionDataStore(max_bytes=1000, spill_dir=tmp_path)
+    array = store.put(np.arange(100, dtype=np.int64), session_id="ada")
+    table = store.put(
+        {"x": np.arange(50.0), "y": np.ones(50, dtype=np.float32)},
+        session_id="ada",
+    )
+    other = store.put({"note": "pickled"}, session_id="ada")
+    store.put(np.zeros(125), session_id="bob")
+
+    assert store.stats()["spills"] == 3
+    loaded = store.get(array, session_id="ada")
+    assert isinstance(loaded, np.memmap)
+    assert loaded.tolist() == list(range(100))
+    assert not loaded.flags.writeable
+    columns = store.get(table, session_id="ada")
+    assert list(columns) == ["x", "y"]
+    assert isinstance(columns["y"], np.memmap)
+    assert columns["y"].dtype == np.float32
+    assert store.get(other, session_id="ada") == {"note": "pickled"}
+    assert store.stats()["spill_hits"] == 3
+
+
+def test_spill_is_bounded_and_cleaned_up(tmp_path: Path) -> None:
+    """Test deleting old spilled entries and the spill directory."""
+    store = SessionDataStore(
+        max_bytes=800, spill_dir=tmp_path, max_spill_bytes=1600
+    )
+    handles = [store.put(np.zeros(100), session_id="ada") for _ in range(4)]
+    [spill_dir] = tmp_path.iterdir()
+
+    assert store.spill_bytes == 1600
+    with pytest.raises(KeyError):
+        store.get(handles[0], session_id="ada")
+    assert len(list(spill_dir.iterdir())) == 2
+
+    store.clear_session("ada")
+    assert len(store) == 0 and not list(spill_dir.iterdir())
+    del store
+    assert not spill_dir.exists()
+
+
+def test_deleted_while_spilling_stays_deleted(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test entries read, deleted or cleared while being written out."""
+    store = SessionDataStore(max_bytes=1600, spill_dir=tmp_path)
+    deleted = store.put(np.zeros(100), session_id="ada")
+    cleared = store.put(np.ones(100), session_id="ada")
+    write = datastore._write
+    # What another request thread does while each eviction is written
+    races = [
+        (deleted, partial(store.delete, deleted, session_id="ada")),
+        (cleared, partial(store.clear_session, "ada")),
+    ]
+    seen = []
+
+    def racing_write(path: Path, value: object) -> None:
+        handle, race = races.pop(0)
+        seen.append(float(store.get(handle, session_id="ada")[0]))
+        race()
+        write(path, value)
+
+    monkeypatch.setattr(datastore, "_write", racing_write)
+    store.put(np.zeros(100), session_id="bob")
+    store.put(np.zeros(100), session_id="bob")
+    [spill_dir] = tmp_path.iterdir()
+
+    assert seen == [0.0, 1.0]
+    assert len(store) == 2 and store.spill_bytes == 0
+    assert not list(spill_dir.iterdir())
+    for handle in (deleted, cleared):
+        with pytest.raises(KeyError):
+            store.get(handle, session_id="ada")
+
+
+def test_failed_spill_evicts_only_that_entry(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test a batch of evictions whose first file cannot be written."""
+    store = SessionDataStore(max_bytes=1600, spill_dir=tmp_path)
+    lost = store.put(np.zeros(100), session_id="ada")
+    kept = store.put(np.ones(100), session_id="ada")
+    write = datastore._write
+    failures = [OSError(28, "No space left on device")]
+
+    def failing_write(path: Path, value: object) -> None:
+        if failures:
+            raise failures.pop()
+        write(path, value)
+
+    monkeypatch.setattr(datastore, "_write", failing_write)
+    # Evicts both entries at once
+    handle = store.put(np.zeros(200), session_id="bob")
+
+    assert store.get(handle, session_id="bob").shape == (200,)
+    assert store.get(kept, session_id="ada")[0] == 1.0
+    with pytest.raises(KeyError):
+        store.get(lost, session_id="ada")
+    assert not store._spilling
+    assert (store.spills, store.spill_bytes) == (1, 800)
+    assert "could not spill" in caplog.text
+
+
+def _app(store: SessionDataStore | None):
+    """App whose two callbacks share a dataset, through the store or not."""
+    layout = html.Div(
+        [
+            dmc.MantineProvider(create_layout()),
+            dcc.Input(id="rows", type="number"),
+            dcc.Store(id="dataset"),
+            html.Div(id="summary"),
+        ]
+    )
+    app = create_app(layout=layout, data_store=store)
+
+    @app.callback(Output("dataset", "data"), Input("rows", "value"))
+    def load(rows: int) -> object:
+        columns = {
+            "x": np.arange(rows, dtype=np.float64),
+            "y": np.random.default_rng(0).random(rows),
+        }
+        if store is None:
+            return {name: column.tolist() for name, column in columns.items()}
+        return get_data_store().put(columns, key="dataset")
+
+    @app.callback(Output("summary", "children"), Input("dataset", "data"))
+    def summarize(dataset: object) -> str:
+        if store is not None:
+            dataset = get_data_store().get(dataset)
+        return f"{len(dataset['x'])} rows, mean {np.mean(dataset['y']):.3f}"
+
+    return app
+
+
+def _call(
+    client, output: str, input_id: str, prop: str, value, status: int = 200
+) -> tuple:
+    """Run a callback; returns its response, request body and seconds."""
+    body = json.dumps(
+        {
+            "output": output,
+            "outputs": dict(
+                zip(("id", "property"), output.split("."), strict=True)
+            ),
+            "inputs": [{"id": input_id, "property": prop, "value": value}],
+            "changedPropIds": [f"{input_id}.{prop}"],
+            "state": [],
+        }
+    )
+    start = time.perf_counter()
+    response = client.post(
+        "/_dash-update-component",
+        data=body,
+        content_type="application/json",
+    )
+    elapsed = time.perf_counter() - start
+    assert response.status_code == status, response.text
+    return response, len(body), elapsed
+
+
+def _round_trip(store: SessionDataStore | None, rows: int) -> dict:
+    """Load a dataset and summarize it as the browser would."""
+    client = _app(store).server.test_client()
+    client.get("/")
+    loaded, _, load_seconds = _call(
+        client, "dataset.data", "rows", "value", rows
+    )
+    data = loaded.json["response"]["dataset"]["data"]
+    summary, body, summary_seconds = _call(
+        client, "summary.children", "dataset", "data", data
+    )
+    return {
+        "summary": summary.json["response"]["summary"]["children"],
+        "response_bytes": len(loaded.data),
+        "body_bytes": body,
+        "seconds": load_seconds + summary_seconds,
+    }
+
+
+def test_callbacks_exchange_handles() -> None:
+    """Test the same result with a handle instead of the data."""
+    shipped = _round_trip(None, 1000)
+    stored = _round_trip(SessionDataStore(), 1000)
+
+    assert stored["summary"] == shipped["summary"] == "1000 rows, mean 0.517"
+    assert stored["body_bytes"] < 500 < shipped["body_bytes"] / 10
+
+
+def test_store_is_per_browser() -> None:
+    """Test that another browser's cookie cannot read the handle."""
+    app = _app(SessionDataStore())
+    ada, bob = app.server.test_client(), app.server.test_client()
+    ada.get("/")
+    bob.get("/")
+    _call(ada, "dataset.data", "rows", "value", 10)
+
+    _call(ada, "summary.children", "dataset", "data", "dataset")
+    _call(bob, "summary.children", "dataset", "data", "dataset", status=500)
+
+
+def test_no_store_by_default() -> None:
+    """Test that get_data_store fails loudly without a store."""
+    app = create_app()
+    with app.server.test_request_context(), pytest.raises(RuntimeError):
+        get_data_store()
+
+
+def test_configured_from_environment(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test DASH_LITE_DATA_STORE and DASH_LITE_DATA_STORE_MB."""
+    assert _data_store_from_env() is None
+
+    monkeypatch.setenv("DASH_LITE_DATA_STORE", "memory")
+    monkeypatch.setenv("DASH_LITE_DATA_STORE_MB", "64")
+    store = _data_store_from_env()
+    assert store.max_bytes == 64 * 2**20 and store.spill_dir is None
+
+    monkeypatch.setenv("DASH_LITE_DATA_STORE", str(tmp_path))
+    assert _data_store_from_env().spill_dir.parent == tmp_path
+
+
+# 50 MB of float64: two columns of 3.1M rows
+DATASET_ROWS = 50 * 2**20 // 16
+
+
+@pytest.mark.slow
+def test_fifty_megabyte_dataset() -> None:
+    """Measure shipping a 50 MB dataset through the browser vs the store."""
+    shipped = _round_trip(None, DATASET_ROWS)
+    stored = _round_trip(SessionDataStore(), DATASET_ROWS)
+    # Evicted at once, so the second callback reads the memory-mapped copy
+    spilled = _round_trip(
+        SessionDataStore(max_bytes=1, spill_dir=True), DATASET_ROWS
+    )
+
+    for label, result in (
+        ("through the browser", shipped),
+        ("in the store", stored),
+        ("spilled to disk", spilled),
+    ):
+        print(
+            f"\n50 MB dataset {label}: "
+            f"{result['response_bytes']:,} bytes down, "
+            f"{result['body_bytes']:,} bytes posted back, "
+            f"{result['seconds'] * 1000:.0f} ms in both callbacks"
+        )
+
+    assert stored["summary"] == spilled["summary"] == shipped["summary"]
+    assert stored["body_bytes"] < 1024
+    assert stored["seconds"] * 10 < shipped["seconds"]
+    assert spilled["seconds"] * 10 < shipped["seconds"]
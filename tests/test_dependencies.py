@@ -0,0 +1,264 @@
+"""Tests for the compiled ``/_dash-dependencies`` endpoint and its checks."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+
+import pytest
+from dash import Dash, Input, Output, State, html
+from dash._utils import to_json
+
+from dash_lite.app import create_app
+from dash_lite.dependencies import (
+    DependencyCache,
+    dependency_problems,
+)
+from dash_lite.jobs import SUPPORTED, LocalJobManager
+from dash_lite.pages import settings
+
+
+@pytest.fixture
+def serialize_calls(monkeypatch: pytest.MonkeyPatch) -> list[None]:
+    """Count every serialization of the callbacks."""
+    calls: list[None] = []
+    original = DependencyCache.serialize
+
+    def counting(self: DependencyCache) -> bytes:
+        calls.append(None)
+        return original(self)
+
+    monkeypatch.setattr(DependencyCache, "serialize", counting)
+    return calls
+
+
+def test_dependencies_match_dash_serialization(dash_app: Dash) -> None:
+    """Test that the cached body is what Dash itself would send."""
+    response = dash_app.server.test_client().get("/_dash-dependencies")
+
+    assert response.status_code == 200
+    assert response.data.decode() == to_json(dash_app._callback_list)
+
+
+def test_compiled_once_at_creation(serialize_calls: list[None]) -> None:
+    """Test that page loads reuse the bytes compiled by create_app."""
+    app = create_app()
+    etag = app.server.extensions["dash_lite.dependencies"].etag
+    client = app.server.test_client()
+    responses = [client.get("/_dash-dependencies") for _ in range(3)]
+
+    assert len(serialize_calls) == 1
+    # Dash's first-request setup leaves the compiled bytes unchanged
+    assert {response.headers["ETag"] for response in responses} == {
+        f'"{etag}"'
+    }
+
+
+def test_strong_etag_and_304(dash_app: Dash) -> None:
+    """Test that a revalidation with the ETag gets an empty 304."""
+    client = dash_app.server.test_client()
+    etag = client.get("/_dash-dependencies").headers["ETag"]
+    response = client.get(
+        "/_dash-dependencies", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_compressed_copy_is_served_when_accepted() -> None:
+    """Test the gzip copy, kept for graphs above the size threshold."""
+    app = create_app(compress_layout=True, compression_min_size=100)
+    response = app.server.test_client().get(
+        "/_dash-dependencies", headers={"Accept-Encoding": "gzip"}
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.data))
+
+
+def test_recompiled_when_callbacks_are_added() -> None:
+    """Test that callbacks registered after creation reach the browser."""
+    app = create_app(pages=True)
+    client = app.server.test_client()
+
+    def outputs() -> list[str]:
+        response = client.get("/_dash-dependencies")
+        return [callback["output"] for callback in response.json]
+
+    assert "late.children" not in outputs()
+    app.callback(Output("late", "children"), Input("url", "pathname"))(
+        lambda _: ""
+    )
+    assert "late.children" in outputs()
+
+
+def test_refresh_swaps_body_and_etag_together(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test a request served while another thread re-serializes."""
+    app = create_app(compress_layout=True)
+    cache = app.server.extensions["dash_lite.dependencies"]
+    client = app.server.test_client()
+    etag = client.get("/_dash-dependencies").headers["ETag"]
+    compressing, resume = threading.Event(), threading.Event()
+    original = DependencyCache.compressed
+
+    def slow(self: DependencyCache, body: bytes) -> bytes | None:
+        compressing.set()
+        resume.wait(5)
+        return original(self, body)
+
+    monkeypatch.setattr(DependencyCache, "serialize", lambda _: b"[]")
+    monkeypatch.setattr(DependencyCache, "compressed", slow)
+    refresh = threading.Thread(target=cache.refresh)
+    refresh.start()
+    assert compressing.wait(5)
+    during = client.get("/_dash-dependencies", headers={"If-None-Match": etag})
+    resume.set()
+    refresh.join()
+    after = client.get("/_dash-dependencies", headers={"If-None-Match": etag})
+
+    # The previous graph, whole, until the new one is ready
+    assert during.status_code == 304
+    assert (after.status_code, after.data) == (200, b"[]")
+
+
+@pytest.mark.parametrize("greeting_mode", ["server", "client"])
+@pytest.mark.parametrize(
+    "jobs",
+    [
+        False,
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(not SUPPORTED, reason="jobs need Linux"),
+        ),
+    ],
+)
+def test_every_configuration_is_valid(greeting_mode: str, jobs: bool) -> None:
+    """Test that create_app's own callbacks match its layout."""
+    app = create_app(
+        greeting_mode=greeting_mode,
+        job_manager=LocalJobManager(workers=1) if jobs else None,
+    )
+    assert dependency_problems(app, app.layout) == []
+
+
+def test_every_page_is_valid() -> None:
+    """Test the callbacks of all pages against the shell and every page."""
+    app = create_app(pages=True)
+    router = app.server.extensions["dash_lite.router"]
+
+    assert dependency_problems(app, router.complete_layout()) == []
+    # Checking them built no page for serving
+    assert router.loaded() == []
+
+
+def test_dangling_page_ids_fail_app_creation(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that page callbacks are checked when the app is created."""
+
+    def register_callbacks(app: Dash) -> None:
+        app.callback(
+            Output("nowhere", "children"), Input("settings-save", "n_clicks")
+        )(lambda clicks: clicks)
+
+    monkeypatch.setattr(settings, "register_callbacks", register_callbacks)
+    with pytest.raises(ValueError, match="'nowhere'"):
+        create_app(pages=True)
+
+
+def test_dangling_ids_fail_app_creation() -> None:
+    """Test that callbacks without their components are refused."""
+    with pytest.raises(ValueError, match="'greeting-output'") as error:
+        create_app(layout=html.Div())
+    assert "'burger-button'" in str(error.value)
+
+
+def test_duplicate_outputs_are_reported() -> None:
+    """Test overlapping outputs of multi-output callbacks."""
+    app = Dash(__name__)
+    app.layout = html.Div(
+        [html.Button(id="button"), html.Div(id="a"), html.Div(id="b")]
+    )
+    app.callback(
+        Output("a", "children"),
+        Output("b", "children"),
+        Input("button", "n_clicks"),
+    )(lambda _: ("", ""))
+    app.callback(Output("b", "children"), Input("button", "n_clicks"))(
+        lambda _: ""
+    )
+    app.callback(
+        Output("a", "children", allow_duplicate=True),
+        Input("button", "n_clicks"),
+        prevent_initial_call=True,
+    )(lambda _: "")
+
+    assert dependency_problems(app, app.layout) == [
+        "b.children: written by 2 callbacks"
+    ]
+
+
+def test_ids_in_component_props_are_found() -> None:
+    """Test ids outside of ``children``, e.g. in the AppShell's navbar."""
+    app = Dash(__name__)
+    app.layout = html.Div(title="x", children=[html.Div(id="source")])
+    app.callback(Output("source", "title"), Input("source", "n_clicks"))(
+        lambda _: ""
+    )
+    assert dependency_problems(app, app.layout) == []
+
+    app.callback(Output("target", "title"), Input("source", "id"))(
+        lambda _: ""
+    )
+    assert dependency_problems(app, app.layout) == [
+        "target.title: no component with id 'target' in the layout"
+    ]
+
+
+EXTRA_CALLBACKS = 300
+
+
+@pytest.mark.slow
+def test_cached_against_dash_serialization() -> None:
+    """Compare per-request time of the compiled graph with Dash's."""
+    app = create_app(pages=True)
+    client = app.server.test_client()
+    for path in ("/", "/analytics", "/settings"):
+        client.get(path)
+
+    def per_request() -> float:
+        start = time.perf_counter()
+        for _ in range(200):
+            assert client.get("/_dash-dependencies").status_code == 200
+        return (time.perf_counter() - start) / 200
+
+    def compare() -> tuple[float, float]:
+        cache = app.server.extensions["dash_lite.dependencies"]
+        views = app.server.view_functions
+        views["/_dash-dependencies"] = cache.serve
+        cached = per_request()
+        views["/_dash-dependencies"] = app.dependencies
+        return cached, per_request()
+
+    results = {len(app._callback_list): compare()}
+    # A larger app: a form of many fields, each with its own callback
+    for i in range(EXTRA_CALLBACKS):
+        app.callback(
+            Output(f"field-{i}", "error"),
+            Input(f"field-{i}", "value"),
+            State("app-shell", "navbar"),
+        )(lambda _: None)
+    results[len(app._callback_list)] = compare()
+
+    for callbacks, (cached, dash) in results.items():
+        print(
+            f"\n/_dash-dependencies of {callbacks} callbacks: "
+            f"{cached * 1e6:.0f} us cached, {dash * 1e6:.0f} us from Dash"
+        )
+    cached, dash = results[len(app._callback_list)]
+    assert cached < dash
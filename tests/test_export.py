@@ -0,0 +1,266 @@
+"""Tests for the bulk greeting export."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import subprocess
+import sys
+import textwrap
+import timeit
+from pathlib import Path
+
+import pytest
+from dash import Dash
+
+from dash_lite.app import create_app
+from dash_lite.export import BATCH_SIZE, export_greetings, read_names
+from dash_lite.greeting import build_greeting, build_greetings
+
+CASES_FILE = Path(__file__).parent / "greeting_cases.json"
+
+
+@pytest.fixture
+def app() -> Dash:
+    """App serving /api/greetings."""
+    return create_app(greeting_export=True)
+
+
+def test_batch_matches_single_greetings() -> None:
+    """Test that build_greetings agrees with build_greeting case by case."""
+    cases = json.loads(CASES_FILE.read_text(encoding="utf-8"))
+    for style, name, expected in cases:
+        assert build_greetings(style, [name]) == [expected]
+    assert build_greetings("short", ["Ada", " ", "Bob"]) == [
+        build_greeting("short", name) for name in ("Ada", " ", "Bob")
+    ]
+
+
+class TestReadNames:
+    """Tests for parsing uploaded name lists."""
+
+    def test_csv_skips_header_and_blank_lines(self) -> None:
+        """Test that the first column of each non-empty row is a name."""
+        lines = io.StringIO('name,greeting\nAda,x\n\n"Lovelace, A",y\n')
+        assert list(read_names(lines, "csv")) == ["Ada", "Lovelace, A"]
+
+    def test_csv_without_header(self) -> None:
+        """Test that a first row other than the export's header is kept."""
+        assert list(read_names(io.StringIO("Name\nBob\n"), "csv")) == [
+            "Name",
+            "Bob",
+        ]
+
+    def test_ndjson_strings_and_objects(self) -> None:
+        """Test that lines may be strings or objects with a name."""
+        lines = io.StringIO('"Ada"\n\n{"name": "Zoë", "id": 2}\n')
+        assert list(read_names(lines, "ndjson")) == ["Ada", "Zoë"]
+
+    def test_ndjson_rejects_other_values(self) -> None:
+        """Test that a line without a name is an error."""
+        with pytest.raises(ValueError, match="line 2"):
+            list(read_names(io.StringIO('"Ada"\n{"id": 1}\n'), "ndjson"))
+
+
+def test_export_is_chunked_by_batch() -> None:
+    """Test that each batch becomes one chunk, with the header first."""
+    chunks = list(
+        export_greetings(iter(["Ada", "Bob", "Cy"]), "short", "csv", 2)
+    )
+
+    assert chunks == [
+        b'name,greeting\nAda,"Hi, Ada!"\nBob,"Hi, Bob!"\n',
+        b'Cy,"Hi, Cy!"\n',
+    ]
+
+
+def test_csv_route_streams_greetings(app: Dash) -> None:
+    """Test the CSV round trip through the route."""
+    response = app.server.test_client().post(
+        "/api/greetings?style=formal",
+        data="Ada\nZoë O'Brien\n",
+        content_type="text/csv",
+    )
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "text/csv"
+    rows = list(csv.reader(io.StringIO(response.data.decode("utf-8"))))
+    assert rows == [
+        ["name", "greeting"],
+        ["Ada", build_greeting("formal", "Ada")],
+        ["Zoë O'Brien", build_greeting("formal", "Zoë O'Brien")],
+    ]
+
+
+def test_ndjson_route_streams_greetings(app: Dash) -> None:
+    """Test the NDJSON round trip, format chosen by query parameter."""
+    response = app.server.test_client().post(
+        "/api/greetings?format=ndjson",
+        data='"Ada"\n{"name": "李雷"}\n',
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.data.splitlines()]
+    assert lines == [
+        {"name": "Ada", "greeting": build_greeting("friendly", "Ada")},
+        {"name": "李雷", "greeting": build_greeting("friendly", "李雷")},
+    ]
+
+
+@pytest.mark.parametrize(
+    ("body", "fmt"),
+    [(b'"Ada"\n{"id": 1}\n', "ndjson"), (b"Ada\n\xff\n", "csv")],
+)
+def test_invalid_upload_is_refused(app: Dash, body: bytes, fmt: str) -> None:
+    """Test a 400 for errors found before the response starts."""
+    response = app.server.test_client().post(
+        f"/api/greetings?format={fmt}", data=body
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("bad_line", "fmt"), [(b"Ada, not JSON", "ndjson"), (b"\xff", "csv")]
+)
+def test_late_error_ends_the_stream_with_a_record(
+    app: Dash, bad_line: bytes, fmt: str
+) -> None:
+    """Test the error record after the first batch was sent."""
+    name = b'"Ada"' if fmt == "ndjson" else b"Ada"
+    response = app.server.test_client().post(
+        f"/api/greetings?format={fmt}",
+        data=(name + b"\n") * BATCH_SIZE * 2 + bad_line + b"\n",
+    )
+
+    assert response.status_code == 200
+    lines = response.data.decode("utf-8").splitlines()
+    if fmt == "ndjson":
+        assert len(lines) == BATCH_SIZE * 2 + 1
+        assert list(json.loads(lines[-1])) == ["error"]
+    else:
+        # Rows decoded before the bad byte, then the single-field row
+        assert len(lines) > BATCH_SIZE
+        [record] = list(csv.reader([lines[-1]]))
+        assert record[0].startswith("error: ") and len(record) == 1
+        assert all(len(row) == 2 for row in csv.reader(lines[:-1]))
+
+
+def test_unknown_format_is_refused(app: Dash) -> None:
+    """Test that an upload of unknown type gets 415."""
+    response = app.server.test_client().post(
+        "/api/greetings", data="Ada", content_type="text/plain"
+    )
+    assert response.status_code == 415
+
+
+def test_streamed_response_is_not_compressed() -> None:
+    """Test that compression leaves the streamed export alone."""
+    app = create_app(greeting_export=True, compression=True)
+    response = app.server.test_client().post(
+        "/api/greetings",
+        data="Ada\n" * 2000,
+        content_type="text/csv",
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert "Content-Encoding" not in response.headers
+    assert response.data.count(b"\n") == 2001
+
+
+def test_export_is_opt_in() -> None:
+    """Test that the route only exists when enabled."""
+    response = create_app().server.test_client().post("/api/greetings")
+    assert response.status_code == 405
+
+
+# Runs in a fresh process so ru_maxrss measures this export alone
+EXPORT_SCRIPT = textwrap.dedent(
+    """
+    import io, resource, sys, time
+    from werkzeug.test import EnvironBuilder
+    from dash_lite.app import create_app
+
+    rows = int(sys.argv[1])
+
+    class Names(io.RawIOBase):
+        # "name<i>" lines generated on the fly, never held in memory
+        def __init__(self):
+            self.lines = (f"name{i}\\n".encode() for i in range(rows))
+            self.pending = b""
+
+        def readable(self):
+            return True
+
+        def readinto(self, buffer):
+            while len(self.pending) < len(buffer):
+                chunk = b"".join(
+                    line for _, line in zip(range(4096), self.lines)
+                )
+                if not chunk:
+                    break
+                self.pending += chunk
+            size = min(len(buffer), len(self.pending))
+            buffer[:size] = self.pending[:size]
+            self.pending = self.pending[size:]
+            return size
+
+    server = create_app(greeting_export=True).server
+    environ = EnvironBuilder(
+        "/api/greetings?style=short", method="POST", content_type="text/csv"
+    ).get_environ()
+    # A chunked upload of unknown length, like a large file from curl
+    environ["wsgi.input"] = io.BufferedReader(Names(), 1 << 16)
+    environ["wsgi.input_terminated"] = True
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    body = server(environ, lambda status, headers: None)
+    lines = out = 0
+    for chunk in body:
+        lines += chunk.count(b"\\n")
+        out += len(chunk)
+    elapsed = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(lines - 1, out, elapsed, before, after)
+    """
+)
+
+
+@pytest.mark.slow
+def test_export_benchmark() -> None:
+    """Measure throughput and peak RSS of a 10-million-name export."""
+    rows = 10_000_000
+    result = subprocess.run(
+        [sys.executable, "-c", EXPORT_SCRIPT, str(rows)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    exported, out_bytes, elapsed, before_kib, after_kib = map(
+        float, result.stdout.split()
+    )
+
+    names = [f"name{i}" for i in range(BATCH_SIZE)]
+    number = 20
+    single = timeit.timeit(
+        lambda: [build_greeting("short", name) for name in names],
+        number=number,
+    )
+    batch = timeit.timeit(
+        lambda: build_greetings("short", names), number=number
+    )
+    per_name = 1e9 / (BATCH_SIZE * number)
+    print(
+        f"\nexport of {rows:,} names: {rows / elapsed:,.0f} names/s, "
+        f"{out_bytes / elapsed / 1e6:.0f} MB/s out, "
+        f"peak RSS {before_kib / 1024:.0f} -> {after_kib / 1024:.0f} MiB"
+        f"\nformatting: build_greeting {single * per_name:.0f} ns/name, "
+        f"build_greetings {batch * per_name:.0f} ns/name"
+    )
+
+    assert exported == rows
+    # Input is ~110 MB and output ~200 MB; memory stays flat
+    assert after_kib - before_kib < 64 * 1024
+    assert batch < single
@@ -0,0 +1,139 @@
+"""Tests for icons served from local icon sets."""
+
+from __future__ import annotations
+
+import json
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from dash import Dash, html
+from dash_iconify import DashIconify
+
+from dash_lite.app import create_app
+from dash_lite.icons import (
+    ICON_SETS_DIR,
+    build_preload,
+    collect_icons,
+    install_icons,
+    load_icon_sets,
+)
+
+LAYOUT_ICONS = {
+    "tabler:brand-github",
+    "tabler:chart-bar",
+    "tabler:help",
+    "tabler:home",
+    "tabler:moon",
+    "tabler:settings",
+    "tabler:sun",
+}
+
+
+def _preload(script: bytes) -> list[dict]:
+    """Extract the icon data from the preload script."""
+    match = re.search(rb"\.concat\((.*)\);\n$", script, re.DOTALL)
+    assert match is not None
+    return json.loads(match.group(1))
+
+
+def test_collects_icons_from_all_properties(dash_app: Dash) -> None:
+    """Test that icons in children and sections (NavLinks, Switch) count."""
+    assert collect_icons(dash_app.layout) == LAYOUT_ICONS
+    assert collect_icons(
+        html.Div([html.Span(DashIconify(icon="tabler:home"))])
+    ) == {"tabler:home"}
+
+
+def test_bundled_icons_are_valid_svg() -> None:
+    """Test that every bundled icon body parses as SVG markup."""
+    icon_set = load_icon_sets()["tabler"]
+    assert set(icon_set["icons"]) >= {
+        name.partition(":")[2] for name in LAYOUT_ICONS
+    }
+    for icon in icon_set["icons"].values():
+        ET.fromstring(
+            f'<svg xmlns="http://www.w3.org/2000/svg">{icon["body"]}</svg>'
+        )
+
+
+def test_preload_holds_only_requested_icons() -> None:
+    """Test that the script carries the named icons and set defaults."""
+    script = build_preload(["tabler:home", "tabler:sun"], load_icon_sets())
+    [entry] = _preload(script.encode())
+
+    assert entry["prefix"] == "tabler"
+    assert set(entry["icons"]) == {"home", "sun"}
+    assert (entry["width"], entry["height"]) == (24, 24)
+
+
+def test_missing_icons_fail_at_startup() -> None:
+    """Test that icons missing from the local sets are reported."""
+    with pytest.raises(ValueError, match="radix-icons:sun, tabler:nope"):
+        build_preload(
+            ["tabler:home", "tabler:nope", "radix-icons:sun"],
+            load_icon_sets(),
+        )
+
+
+def test_first_directory_wins(tmp_path: Path) -> None:
+    """Test that an extra icon set folder can override the bundled set."""
+    (tmp_path / "tabler.json").write_text(
+        json.dumps({"prefix": "tabler", "icons": {"x": {"body": "<g/>"}}})
+    )
+    sets = load_icon_sets([tmp_path, ICON_SETS_DIR])
+
+    assert set(sets["tabler"]["icons"]) == {"x"}
+
+
+class TestLocalIconsApp:
+    """Tests for an app created with local icons."""
+
+    @pytest.fixture
+    def app(self) -> Dash:
+        """App serving its icons itself."""
+        return create_app(local_icons=True)
+
+    def test_index_loads_preload_before_components(self, app: Dash) -> None:
+        """Test that the script runs before DashIconify's bundle."""
+        index = app.server.test_client().get("/").data.decode()
+        scripts = re.findall(r'<script src="([^"]+)"', index)
+        icons = next(i for i, src in enumerate(scripts) if "icons." in src)
+        iconify = next(
+            i for i, src in enumerate(scripts) if "dash_iconify" in src
+        )
+
+        assert icons < iconify
+
+    def test_script_is_immutable_and_complete(self, app: Dash) -> None:
+        """Test the preload script response."""
+        [url] = [u for u in app.config.external_scripts if "icons." in u]
+        response = app.server.test_client().get(url)
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/javascript"
+        assert "immutable" in response.headers["Cache-Control"]
+        [entry] = _preload(response.data)
+        assert {f"tabler:{name}" for name in entry["icons"]} == LAYOUT_ICONS
+
+    def test_url_changes_with_the_icons(self) -> None:
+        """Test that different icons get a different URL."""
+        first = install_icons(create_app(), ["tabler:home"])
+        second = install_icons(create_app(), ["tabler:sun"])
+
+        assert first != second
+        assert first.startswith("/_dash-lite/icons.")
+
+    def test_pages_shell_icons_are_served(self) -> None:
+        """Test that the routed app's navbar icons are found as well."""
+        app = create_app(local_icons=True, pages=True)
+        [url] = app.config.external_scripts
+        [entry] = _preload(app.server.test_client().get(url).data)
+
+        assert {f"tabler:{name}" for name in entry["icons"]} == LAYOUT_ICONS
+
+
+def test_remote_lookup_by_default(dash_app: Dash) -> None:
+    """Test that without local_icons nothing is preloaded."""
+    assert dash_app.config.external_scripts == []
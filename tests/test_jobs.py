@@ -0,0 +1,292 @@
+"""Tests for the local background callback manager."""
+
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from dash_lite import callbacks, jobs
+from dash_lite.app import create_app
+from dash_lite.jobs import CANCELLED, DONE, LocalJobManager
+
+pytestmark = pytest.mark.skipif(
+    not jobs.SUPPORTED, reason="worker processes are forked on Linux only"
+)
+
+REPORT_BODY = {
+    "output": "job-output.children",
+    "outputs": {"id": "job-output", "property": "children"},
+    "inputs": [{"id": "job-run", "property": "n_clicks", "value": 1}],
+    "changedPropIds": ["job-run.n_clicks"],
+    "state": [],
+}
+
+
+@pytest.fixture
+def manager(tmp_path: Path) -> Iterator[LocalJobManager]:
+    """Manager with two worker processes, stopped after the test."""
+    job_manager = LocalJobManager(path=tmp_path / "jobs.sqlite", workers=2)
+    yield job_manager
+    job_manager.shutdown()
+
+
+def _wait_for(condition: Callable[[], Any], timeout: float = 10) -> Any:
+    """Poll ``condition`` until it returns something truthy."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = condition()
+        if value:
+            return value
+        time.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+def _register(
+    manager: LocalJobManager, fn: Callable[..., Any], progress: bool = False
+) -> str:
+    """Register ``fn`` as a job function; return its registry key."""
+    registry_key = f"{fn.__name__}-{id(fn)}"
+    manager.register(registry_key, fn, progress)
+    return registry_key
+
+
+def _queue(
+    manager: LocalJobManager, registry_key: str, *args: Any
+) -> tuple[str, str]:
+    """Queue one job; return (cache key, job id)."""
+    cache_key = f"result-{time.monotonic_ns()}"
+    return cache_key, manager.call_job_fn(cache_key, registry_key, args, {})
+
+
+def _submit(
+    manager: LocalJobManager,
+    fn: Callable[..., Any],
+    *args: Any,
+    progress: bool = False,
+) -> tuple[str, str]:
+    """Register ``fn`` and queue one job; return (cache key, job id)."""
+    return _queue(manager, _register(manager, fn, progress), *args)
+
+
+class TestLocalJobManager:
+    """Tests for running jobs on the process pool."""
+
+    def test_progress_then_result(
+        self, manager: LocalJobManager, tmp_path: Path
+    ) -> None:
+        """Test that progress is reported before the result arrives."""
+        release = tmp_path / "release"
+
+        def job(set_progress: Callable, value: int) -> int:
+            set_progress(50)
+            _wait_for(release.exists)
+            return value * 2
+
+        key, job_id = _submit(manager, job, 21, progress=True)
+
+        assert _wait_for(lambda: manager.get_progress(key)) == [50]
+        assert manager.job_running(job_id)
+        assert manager.get_result(key, job_id) is manager.UNDEFINED
+
+        release.touch()
+        _wait_for(lambda: manager.result_ready(key))
+        assert manager.get_result(key, job_id) == 42
+        assert not manager.job_running(job_id)
+        assert manager.store.job(job_id)["status"] == DONE
+
+    def test_cancel_running_job(self, tmp_path: Path) -> None:
+        """Test that a running job stops at its next progress report."""
+        manager = LocalJobManager(path=tmp_path / "jobs.sqlite", workers=1)
+
+        def endless(set_progress: Callable) -> None:
+            for step in range(1000):
+                set_progress(step)
+                time.sleep(0.01)
+
+        endless_key = _register(manager, endless, progress=True)
+        identity_key = _register(manager, _identity)
+        try:
+            key, job_id = _queue(manager, endless_key)
+            _wait_for(lambda: manager.get_progress(key))
+            manager.terminate_job(job_id)
+
+            assert not manager.job_running(job_id)
+            assert manager.store.job(job_id)["status"] == CANCELLED
+            # The only worker is free again long before the job would end
+            other_key, _ = _queue(manager, identity_key, "next")
+            _wait_for(lambda: manager.result_ready(other_key), timeout=2)
+            assert manager.get_result(key, job_id) is manager.UNDEFINED
+        finally:
+            manager.shutdown()
+
+    def test_cancel_queued_job(self, tmp_path: Path) -> None:
+        """Test that a job cancelled while queued never starts."""
+        manager = LocalJobManager(path=tmp_path / "jobs.sqlite", workers=1)
+        release = tmp_path / "release"
+
+        def blocker() -> None:
+            _wait_for(release.exists)
+
+        # Both registered first: registering retires running workers
+        blocker_key = _register(manager, blocker)
+        identity_key = _register(manager, _identity)
+        try:
+            _queue(manager, blocker_key)
+            _, queued = _queue(manager, identity_key, "never")
+            manager.terminate_job(queued)
+        finally:
+            release.touch()
+            manager.shutdown()
+
+        record = manager.store.job(queued)
+        assert record["status"] == CANCELLED
+        assert record["started"] is None
+
+    def test_error_is_returned_to_dash(self, manager: LocalJobManager) -> None:
+        """Test that an exception becomes Dash's background error value."""
+
+        def broken() -> None:
+            raise ValueError("no data")
+
+        key, job_id = _submit(manager, broken)
+        _wait_for(lambda: manager.result_ready(key))
+
+        error = manager.get_result(key, job_id)["background_callback_error"]
+        assert error["msg"] == "no data"
+        assert "ValueError" in error["tb"]
+
+    def test_no_process_per_job(self, manager: LocalJobManager) -> None:
+        """Test that jobs share the fixed pool of worker processes."""
+        keys = [_submit(manager, _identity, n)[0] for n in range(20)]
+        for key in keys:
+            _wait_for(lambda key=key: manager.result_ready(key))
+
+        assert len(manager.worker_pids()) <= manager.workers
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class TestReportJob:
+    """Tests for the background job demo served by the app."""
+
+    def test_result_is_delivered_by_polling(
+        self, manager: LocalJobManager, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test the request/poll round trips Dash's renderer makes."""
+        monkeypatch.setattr(callbacks, "REPORT_LIMIT", 100)
+        client = create_app(job_manager=manager).server.test_client()
+
+        started = client.post("/_dash-update-component", json=REPORT_BODY)
+        job = started.get_json()
+        assert set(job) >= {"cacheKey", "job", "cancel"}
+
+        def poll() -> dict | None:
+            response = client.post(
+                "/_dash-update-component"
+                f"?cacheKey={job['cacheKey']}&job={job['job']}",
+                json=REPORT_BODY,
+            )
+            assert response.status_code == 200
+            return response.get_json().get("response")
+
+        response = _wait_for(poll)
+        assert response["job-output"]["children"] == (
+            "There are 25 primes below 100."
+        )
+
+    def test_demo_only_with_a_manager(self) -> None:
+        """Test that the demo is not part of the default app."""
+        app = create_app()
+        assert "job-output.children" not in app.callback_map
+        assert (
+            b"job-run"
+            not in app.server.test_client().get("/_dash-layout").data
+        )
+
+
+@pytest.mark.slow
+def test_concurrent_jobs_stress(tmp_path: Path) -> None:
+    """Measure queue latency and memory per job for many queued jobs."""
+    jobs, workers = 200, 4
+    manager = LocalJobManager(path=tmp_path / "jobs.sqlite", workers=workers)
+
+    def work(set_progress: Callable, n: int) -> int:
+        set_progress(0)
+        time.sleep(0.02)
+        set_progress(100)
+        return n
+
+    try:
+        registry_key = _register(manager, work, progress=True)
+        # Start the worker processes before measuring
+        warm_up, _ = _queue(manager, registry_key, 0)
+        _wait_for(lambda: manager.result_ready(warm_up))
+        # Latency of a job submitted to an idle pool
+        _, idle_job = _queue(manager, registry_key, 0)
+        _wait_for(lambda: manager.store.job(idle_job)["started"])
+        rss_before = _rss_kib()
+        start = time.perf_counter()
+        submitted = [_queue(manager, registry_key, n) for n in range(jobs)]
+        for _, job_id in submitted:
+            _wait_for(
+                lambda job_id=job_id: not manager.job_running(job_id),
+                timeout=60,
+            )
+        elapsed = time.perf_counter() - start
+        rss_after = _rss_kib()
+        worker_pss = sum(_pss_kib(pid) for pid in manager.worker_pids())
+        pool_size = len(manager.worker_pids())
+    finally:
+        manager.shutdown()
+
+    idle = manager.store.job(idle_job)
+    idle_latency = idle["started"] - idle["enqueued"]
+    records = [manager.store.job(job_id) for _, job_id in submitted]
+    latencies = sorted(r["started"] - r["enqueued"] for r in records)
+    per_job_kib = (rss_after - rss_before) / jobs
+    print(
+        f"\n{jobs} jobs on {workers} workers in {elapsed:.2f}s\n"
+        f"queue latency: idle pool {idle_latency * 1000:.1f}ms, "
+        f"burst p50={statistics.median(latencies) * 1000:.0f}ms "
+        f"p95={latencies[int(jobs * 0.95)] * 1000:.0f}ms\n"
+        f"memory: app +{per_job_kib:.1f}KiB/job, "
+        f"workers {worker_pss / 1024:.0f}MiB PSS in total"
+    )
+    assert all(r["status"] == DONE for r in records)
+    assert pool_size <= workers
+    assert idle_latency < 0.1
+    assert per_job_kib < 64
+
+
+def _rss_kib() -> int:
+    """Resident memory of this process in KiB (Linux)."""
+    return _proc_kib("/proc/self/status", "VmRSS:")
+
+
+def _pss_kib(pid: int) -> int:
+    """Memory of a process in KiB, shared pages split between sharers."""
+    return _proc_kib(f"/proc/{pid}/smaps_rollup", "Pss:")
+
+
+def _proc_kib(path: str, field: str) -> int:
+    """Read one ``<field> <n> kB`` line of a /proc file."""
+    for line in Path(path).read_text().splitlines():
+        if line.startswith(field):
+            return int(line.split()[1])
+    return 0
+
+
+def test_refused_off_linux(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the clear error where worker processes cannot be forked."""
+    monkeypatch.setattr(jobs, "SUPPORTED", False)
+    with pytest.raises(RuntimeError, match="only supported on Linux"):
+        LocalJobManager(path=tmp_path / "jobs.sqlite")
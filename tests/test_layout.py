@@ -108,3 +108,24 @@ def test_layout_has_default_values() -> None:
     # Check default values
     assert find_component_value(layout, "greeting-style") == "friendly"
     assert find_component_value(layout, "name-input") == "Friend"
+
+
+def test_name_input_debounce_is_configurable() -> None:
+    """Test that the name input debounce is passed to the TextInput."""
+
+    def find_name_input(component):
+        """Find the name-input component."""
+        if getattr(component, "id", None) == "name-input":
+            return component
+        children = getattr(component, "children", None)
+        if not isinstance(children, list):
+            children = [children] if children is not None else []
+        for child in children:
+            found = find_name_input(child)
+            if found is not None:
+                return found
+        return None
+
+    assert find_name_input(create_layout()).debounce is False
+    assert find_name_input(create_layout(name_debounce=300)).debounce == 300
+    assert find_name_input(create_layout(name_debounce=True)).debounce is True
@@ -0,0 +1,101 @@
+"""Tests for the cached ``/_dash-layout`` endpoint."""
+
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+from dash import Dash
+from dash._utils import to_json
+
+from dash_lite.app import create_app
+from dash_lite.layout_cache import LayoutCache
+
+
+@pytest.fixture
+def serialize_calls(monkeypatch: pytest.MonkeyPatch) -> list[None]:
+    """Count every layout serialization done by the cache."""
+    calls: list[None] = []
+    original = LayoutCache.serialize
+
+    def counting(self: LayoutCache) -> bytes:
+        calls.append(None)
+        return original(self)
+
+    monkeypatch.setattr(LayoutCache, "serialize", counting)
+    return calls
+
+
+def test_layout_matches_dash_serialization(dash_app: Dash) -> None:
+    """Test that the cached body is what Dash itself would send."""
+    client = dash_app.server.test_client()
+    response = client.get("/_dash-layout")
+
+    assert response.status_code == 200
+    assert response.data.decode() == to_json(dash_app._layout_value())
+
+
+def test_repeat_fetches_skip_serialization(
+    serialize_calls: list[None],
+) -> None:
+    """Test that the layout is serialized once, at startup only."""
+    app = create_app()
+    assert len(serialize_calls) == 1
+
+    client = app.server.test_client()
+    for _ in range(5):
+        assert client.get("/_dash-layout").status_code == 200
+
+    assert len(serialize_calls) == 1
+
+
+def test_strong_etag_and_304(dash_app: Dash) -> None:
+    """Test that a matching If-None-Match gets an empty 304."""
+    client = dash_app.server.test_client()
+    first = client.get("/_dash-layout")
+    etag = first.headers["ETag"]
+
+    assert not etag.startswith("W/")
+    second = client.get("/_dash-layout", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.data == b""
+
+    stale = client.get("/_dash-layout", headers={"If-None-Match": '"old"'})
+    assert stale.status_code == 200
+
+
+def test_compressed_copy_is_served_when_accepted() -> None:
+    """Test that the gzip copy is sent only to clients accepting gzip."""
+    app = create_app(compress_layout=True)
+    client = app.server.test_client()
+
+    plain = client.get("/_dash-layout")
+    packed = client.get(
+        "/_dash-layout", headers={"Accept-Encoding": "gzip, br"}
+    )
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert len(packed.data) < len(plain.data)
+    assert json.loads(gzip.decompress(packed.data)) == json.loads(plain.data)
+    assert packed.headers["ETag"] != plain.headers["ETag"]
+
+
+def test_etag_is_per_representation() -> None:
+    """Test that one encoding's ETag never revalidates the other."""
+    app = create_app(compress_layout=True)
+    client = app.server.test_client()
+    gzip_headers = {"Accept-Encoding": "gzip"}
+    plain = client.get("/_dash-layout").headers["ETag"]
+    packed = client.get("/_dash-layout", headers=gzip_headers).headers["ETag"]
+
+    assert packed == plain[:-1] + '-gzip"'
+    revalidated = client.get(
+        "/_dash-layout", headers={**gzip_headers, "If-None-Match": packed}
+    )
+    assert revalidated.status_code == 304
+    # A cache holding the gzip copy must not pass it off as the other
+    crossed = client.get("/_dash-layout", headers={"If-None-Match": packed})
+    assert crossed.status_code == 200
+    assert "Content-Encoding" not in crossed.headers
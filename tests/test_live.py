@@ -0,0 +1,215 @@
+"""Tests for the live metrics chart and its ingestion endpoint."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pytest
+from dash import Dash
+
+from dash_lite.app import _live_feed_from_env, create_app
+from dash_lite.dependencies import dependency_problems
+from dash_lite.live import LIVE_POINTS, live_figure
+from dash_lite.ringbuffer import RingBuffer
+
+OUTPUT = "..live-chart.figure...live-chart.extendData...live-cursor.data.."
+
+
+@pytest.fixture
+def feed(tmp_path: Path) -> RingBuffer:
+    """Empty ring buffer of one column."""
+    return RingBuffer(tmp_path / "live.ring", capacity=10_000)
+
+
+@pytest.fixture
+def live_app(feed: RingBuffer) -> Dash:
+    """App showing ``feed`` on its Dashboard."""
+    return create_app(live_feed=feed)
+
+
+def _poll(client, cursor: int | None):
+    """Run the live chart's callback as its interval would."""
+    return client.post(
+        "/_dash-update-component",
+        json={
+            "output": OUTPUT,
+            "outputs": [
+                {"id": "live-chart", "property": "figure"},
+                {"id": "live-chart", "property": "extendData"},
+                {"id": "live-cursor", "property": "data"},
+            ],
+            "inputs": [
+                {"id": "live-interval", "property": "n_intervals", "value": 1}
+            ],
+            "changedPropIds": ["live-interval.n_intervals"],
+            "state": [
+                {"id": "live-cursor", "property": "data", "value": cursor}
+            ],
+        },
+    )
+
+
+def test_first_poll_draws_the_figure(live_app: Dash, feed: RingBuffer) -> None:
+    """Test that a new page gets the latest samples as a figure."""
+    feed.extend((i, i * 2) for i in range(5))
+    response = _poll(live_app.server.test_client(), None).json["response"]
+
+    assert response["live-cursor"] == {"data": 5}
+    assert "extendData" not in response["live-chart"]
+    [trace] = response["live-chart"]["figure"]["data"]
+    assert trace["x"] == [0, 1, 2, 3, 4]
+    assert trace["y"] == [0, 2, 4, 6, 8]
+
+
+def test_later_polls_append_new_samples(
+    live_app: Dash, feed: RingBuffer
+) -> None:
+    """Test that only the samples since the cursor are sent."""
+    client = live_app.server.test_client()
+    feed.extend((i, i) for i in range(100))
+    cursor = _poll(client, None).json["response"]["live-cursor"]["data"]
+    feed.extend([(100, 1.5), (101, 2.5)])
+    response = _poll(client, cursor).json["response"]
+
+    assert "figure" not in response["live-chart"]
+    assert response["live-chart"]["extendData"] == [
+        {"x": [[100, 101]], "y": [[1.5, 2.5]]},
+        [0],
+        LIVE_POINTS,
+    ]
+    assert response["live-cursor"] == {"data": 102}
+    # Nothing new: no update at all
+    assert _poll(client, 102).status_code == 204
+
+
+def test_missed_samples_redraw_the_figure(
+    live_app: Dash, feed: RingBuffer
+) -> None:
+    """Test a page too far behind for its chart to be extended."""
+    feed.extend((i, i) for i in range(LIVE_POINTS + 10))
+    response = _poll(live_app.server.test_client(), 5).json["response"]
+
+    [trace] = response["live-chart"]["figure"]["data"]
+    assert len(trace["x"]) == LIVE_POINTS
+    assert trace["x"][-1] == LIVE_POINTS + 9
+
+
+SECRET = "s3cret"
+
+
+def test_ingestion_endpoint(feed: RingBuffer) -> None:
+    """Test posting one sample, several, and invalid ones."""
+    app = create_app(live_feed=feed, live_secret=SECRET)
+    client = app.server.test_client()
+    headers = {"Authorization": f"Bearer {SECRET}"}
+    one = client.post(
+        "/api/live", json={"values": 1.0, "timestamp": 10}, headers=headers
+    )
+    several = client.post(
+        "/api/live",
+        json=[{"values": [2.0]}, {"values": [3.0]}],
+        headers=headers,
+    )
+
+    assert (one.json, several.json) == ({"written": 1}, {"written": 3})
+    assert feed.read().values == [[1.0, 2.0, 3.0]]
+    for body in ({"value": 1}, {"values": [1, 2]}, ["x"], {"values": "x"}):
+        response = client.post("/api/live", json=body, headers=headers)
+        assert response.status_code == 400
+    assert feed.written == 3
+
+
+def test_ingestion_needs_the_secret(live_app: Dash, feed: RingBuffer) -> None:
+    """Test that samples cannot be posted without the bearer token."""
+    secured = create_app(live_feed=feed, live_secret=SECRET).server
+    for headers in ({}, {"Authorization": "Bearer guess"}):
+        response = secured.test_client().post(
+            "/api/live", json={"values": 1.0}, headers=headers
+        )
+        assert response.status_code == 401
+    # Without a secret the endpoint is not served at all
+    assert "/api/live" not in {
+        rule.rule for rule in live_app.server.url_map.iter_rules()
+    }
+    assert feed.written == 0
+
+
+def test_chart_only_with_a_feed(live_app: Dash) -> None:
+    """Test the layout and callbacks with and without a feed."""
+    plain = create_app()
+    assert "live-chart" not in json.dumps(
+        plain.layout.to_plotly_json(), default=str
+    )
+    assert "/api/live" not in {
+        rule.rule for rule in plain.server.url_map.iter_rules()
+    }
+
+    assert dependency_problems(live_app, live_app.layout) == []
+    router = create_app(
+        pages=True, live_feed=live_app.server.extensions["dash_lite.live"]
+    )
+    pages = router.server.extensions["dash_lite.router"]
+    assert "live-chart" in json.dumps(
+        pages.content(pages.home).to_plotly_json(), default=str
+    )
+
+
+def test_configured_from_environment(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test DASH_LITE_LIVE_FEED and DASH_LITE_LIVE_CAPACITY."""
+    monkeypatch.delenv("DASH_LITE_LIVE_FEED", raising=False)
+    assert _live_feed_from_env() is None
+
+    monkeypatch.setenv("DASH_LITE_LIVE_FEED", str(tmp_path / "live.ring"))
+    monkeypatch.setenv("DASH_LITE_LIVE_CAPACITY", "60")
+    assert _live_feed_from_env().capacity == 60
+
+
+def _samples(start: int, stop: int) -> list[tuple[float, float]]:
+    """Samples of a 10 Hz collector, timestamped in milliseconds."""
+    return [(1.7e12 + i * 100, i % 100) for i in range(start, stop)]
+
+
+@pytest.mark.slow
+def test_update_cost_does_not_grow_with_history(tmp_path: Path) -> None:
+    """Compare updates by extendData with full figures as history grows."""
+    feed = RingBuffer(tmp_path / "live.ring", capacity=1_000_000)
+    client = create_app(live_feed=feed).server.test_client()
+    cursor = _poll(client, None).json["response"]["live-cursor"]["data"]
+    results = {}
+    for history in (1_000, 10_000, 100_000, 1_000_000):
+        feed.extend(_samples(feed.written, history))
+        cursor = feed.written
+        sizes, seconds = [], []
+        for _ in range(20):
+            # One second of samples per poll
+            feed.extend(_samples(feed.written, feed.written + 10))
+            start = time.process_time()
+            response = _poll(client, cursor)
+            seconds.append(time.process_time() - start)
+            sizes.append(len(response.data))
+            cursor = response.json["response"]["live-cursor"]["data"]
+        # A full redraw of every sample kept, for comparison
+        start = time.process_time()
+        full = len(json.dumps(live_figure(feed.read())))
+        full_seconds = time.process_time() - start
+        results[history] = (
+            sorted(sizes)[10],
+            sorted(seconds)[10],
+            full,
+            full_seconds,
+        )
+        print(
+            f"\n{history:>9,} samples: {results[history][0]} B and "
+            f"{results[history][1] * 1e3:.2f} ms CPU per update; full "
+            f"figure {full / 1024:,.0f} KiB, {full_seconds * 1e3:.0f} ms"
+        )
+
+    smallest, largest = results[1_000], results[1_000_000]
+    # Only the cursor's digits differ
+    assert abs(largest[0] - smallest[0]) <= 5
+    assert largest[1] < max(smallest[1] * 3, 0.005)
+    assert largest[2] > 500 * largest[0]
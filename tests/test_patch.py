@@ -0,0 +1,134 @@
+"""Tests for partial output updates."""
+
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any
+
+import pytest
+from dash import Dash, Patch, no_update
+from dash._utils import to_json
+
+from dash_lite.patch import diff_patch
+
+NAVBAR = {"width": 250, "breakpoint": "sm", "collapsed": {"mobile": True}}
+
+# Request the old toggle_navbar sent per click: the whole navbar as State
+FULL_TOGGLE_BODY = {
+    "output": "..burger-button.opened...app-shell.navbar..",
+    "outputs": [
+        {"id": "burger-button", "property": "opened"},
+        {"id": "app-shell", "property": "navbar"},
+    ],
+    "inputs": [{"id": "burger-button", "property": "n_clicks", "value": 1}],
+    "changedPropIds": ["burger-button.n_clicks"],
+    "state": [{"id": "app-shell", "property": "navbar", "value": NAVBAR}],
+}
+
+TOGGLE_BODY = {
+    "output": "app-shell.navbar",
+    "outputs": {"id": "app-shell", "property": "navbar"},
+    "inputs": [{"id": "burger-button", "property": "opened", "value": True}],
+    "changedPropIds": ["burger-button.opened"],
+    "state": [],
+}
+
+
+def _apply(value: Any, patch: Patch) -> Any:
+    """Apply a patch the way the Dash renderer does."""
+    value = copy.deepcopy(value)
+    for operation in patch.to_plotly_json()["operations"]:
+        *parents, last = operation["location"] or [None]
+        target = value
+        for key in parents:
+            target = target[key]
+        params = operation["params"]
+        if operation["operation"] == "Assign":
+            target[last] = params["value"]
+        elif operation["operation"] == "Delete":
+            del target[last]
+        elif operation["operation"] == "Extend":
+            (target if last is None else target[last]).extend(params["value"])
+        else:  # pragma: no cover - diff_patch uses no other operation
+            raise AssertionError(operation)
+    return value
+
+
+@pytest.mark.parametrize(
+    ("old", "new"),
+    [
+        (NAVBAR, {**NAVBAR, "collapsed": {"mobile": False}}),
+        ({"a": 1, "b": 2}, {"a": 1, "c": 3}),
+        ({"points": [1, 2]}, {"points": [1, 2, 3, 4]}),
+        ([1, [2, 3], 4, 5], [1, [2, 9], 4]),
+        ([{"x": 1}, {"x": 2}], [{"x": 1}, {"x": 5, "y": 0}]),
+    ],
+)
+def test_patch_reproduces_new_value(old: Any, new: Any) -> None:
+    """Test that applying the patch to the old value gives the new one."""
+    patch = diff_patch(old, new)
+
+    assert isinstance(patch, Patch)
+    assert _apply(old, patch) == new
+
+
+def test_patch_holds_only_the_delta() -> None:
+    """Test that unchanged keys are not sent."""
+    old = {"rows": list(range(1000)), "title": "Sales"}
+    patch = diff_patch(old, {**old, "title": "Revenue"})
+
+    assert patch.to_plotly_json()["operations"] == [
+        {
+            "operation": "Assign",
+            "location": ["title"],
+            "params": {"value": "Revenue"},
+        }
+    ]
+
+
+def test_unchanged_output_is_not_updated() -> None:
+    """Test that an equal value becomes no_update."""
+    assert diff_patch(dict(NAVBAR), dict(NAVBAR)) is no_update
+
+
+def test_values_of_other_types_are_sent_whole() -> None:
+    """Test that scalars and type changes replace the value."""
+    assert diff_patch(1, 2) == 2
+    assert diff_patch({"a": 1}, [1]) == [1]
+
+
+def test_navbar_toggle_bytes(dash_app: Dash) -> None:
+    """Measure the bytes per navbar toggle, full round trip vs patch."""
+    full_request = len(json.dumps(FULL_TOGGLE_BODY))
+    full_response = len(
+        to_json(
+            {
+                "multi": True,
+                "response": {
+                    "burger-button": {"opened": True},
+                    "app-shell": {
+                        "navbar": {**NAVBAR, "collapsed": {"mobile": False}}
+                    },
+                },
+            }
+        )
+    )
+
+    response = dash_app.server.test_client().post(
+        "/_dash-update-component", json=TOGGLE_BODY
+    )
+    assert response.status_code == 200
+    navbar = response.get_json()["response"]["app-shell"]["navbar"]
+    assert navbar["operations"] == [
+        {
+            "operation": "Assign",
+            "location": ["collapsed", "mobile"],
+            "params": {"value": False},
+        }
+    ]
+
+    before = full_request + full_response
+    after = len(json.dumps(TOGGLE_BODY)) + len(response.data)
+    print(f"\nbytes per navbar toggle: full={before}  patch={after}")
+    assert after < before
@@ -0,0 +1,230 @@
+"""Tests for the prerendered app shell."""
+
+from __future__ import annotations
+
+import http.client
+import re
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import dash_mantine_components as dmc
+import pytest
+from dash import Dash, html
+
+from dash_lite.app import create_app
+from dash_lite.prerender import build_prerender, render_shell
+from tests.helpers import local_server
+
+# Browsers open about this many connections per host
+CONNECTIONS = 6
+
+# First meaningful content: the page heading
+TEXT = "Welcome to Your Dashboard"
+
+
+def _overlay(index: str) -> str:
+    """Extract the prerendered overlay from an index page."""
+    match = re.search(
+        r'<div id="dash-lite-prerender".*?</div>(?=\s*<div id="react-entry)',
+        index,
+        re.DOTALL,
+    )
+    assert match is not None
+    return match.group(0)
+
+
+@pytest.fixture
+def app() -> Dash:
+    """App with the prerendered shell."""
+    return create_app(prerender=True)
+
+
+def test_index_contains_the_shell(app: Dash) -> None:
+    """Test that header, navbar, main skeleton and footer are in the HTML."""
+    overlay = _overlay(app.server.test_client().get("/").data.decode())
+
+    for section in ("header", "nav", "main", "footer"):
+        assert f"<{section}>" in overlay
+    assert "dash-lite" in overlay
+    assert "Navigation" in overlay
+    assert "Welcome to Your Dashboard" in overlay
+    assert 'class="dl-skeleton"' in overlay
+    # Icons are inline SVG from the bundled set
+    assert overlay.count("<svg") >= 3
+
+
+def test_shell_is_well_formed(dash_app: Dash) -> None:
+    """Test that the markup parses and text is escaped."""
+    markup = render_shell(
+        [dash_app.layout, dmc.Text("<b>Tom & Jerry</b>", size="sm")]
+    )
+    root = ET.fromstring(f"<body>{markup}</body>")
+
+    assert root.findall(".//p")[-1].text == "<b>Tom & Jerry</b>"
+
+
+def test_overlay_sizes_follow_the_app_shell() -> None:
+    """Test that the header, navbar and footer sizes come from the layout."""
+    layout = dmc.AppShell(
+        [dmc.AppShellHeader("Header"), dmc.AppShellMain("Main")],
+        id="shell",
+        header={"height": 72},
+        navbar={"width": 300, "breakpoint": "sm"},
+    )
+    overlay, script = build_prerender(layout)
+
+    assert "height:72px" in overlay
+    assert "width:300px" in overlay
+    assert "getElementById('shell')" in script
+
+
+def test_layout_without_app_shell_is_refused() -> None:
+    """Test that there must be an AppShell whose rendering ends the overlay."""
+    with pytest.raises(ValueError, match="AppShell"):
+        build_prerender(html.Div("no shell"))
+
+
+def test_overlay_precedes_entry_point_and_script(app: Dash) -> None:
+    """Test the order: overlay, Dash's entry point, removal script."""
+    index = app.server.test_client().get("/").data.decode()
+
+    overlay = index.index('id="dash-lite-prerender"')
+    entry = index.index('id="react-entry-point"')
+    script = index.index("MutationObserver")
+    assert overlay < entry < script < index.index("_dash-renderer")
+
+
+def test_pages_mark_the_current_link() -> None:
+    """Test that the routed app prerenders its shell on every path."""
+    app = create_app(prerender=True, pages=True)
+    overlay = _overlay(app.server.test_client().get("/settings").data.decode())
+
+    assert "Settings" in overlay
+    assert 'class="dl-navlink dl-active" href="/"' in overlay
+
+
+def test_prerender_is_opt_in(dash_app: Dash) -> None:
+    """Test that the default index has no prerendered shell."""
+    index = dash_app.server.test_client().get("/").data.decode()
+    assert "dash-lite-prerender" not in index
+
+
+def _get(port: int, path: str) -> bytes:
+    """GET ``path`` from the local server."""
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    try:
+        connection.request("GET", path)
+        response = connection.getresponse()
+        assert response.status == 200, path
+        return response.read()
+    finally:
+        connection.close()
+
+
+def critical_path(port: int, text: str) -> list[list[int]]:
+    """
+    Follow a browser's requests until ``text`` can be painted.
+
+    The index comes first; if it lacks ``text``, its scripts are fetched
+    and then the layout (with the callback dependencies), which is when
+    Dash can render. JavaScript parsing and React rendering are not
+    counted, so without a prerendered shell this is a lower bound.
+
+    Returns:
+        The response sizes of each round of requests.
+    """
+    index = _get(port, "/")
+    rounds = [[len(index)]]
+    if text not in index.decode():
+        scripts = re.findall(r'<script src="([^"]+)"', index.decode())
+        layout = ["/_dash-layout", "/_dash-dependencies"]
+        with ThreadPoolExecutor(CONNECTIONS) as pool:
+            for paths in (scripts, layout):
+                rounds.append(
+                    [
+                        len(body)
+                        for body in pool.map(
+                            lambda path: _get(port, path), paths
+                        )
+                    ]
+                )
+    return rounds
+
+
+def modeled_ms(rounds: list[list[int]], rtt_ms: float, mbps: float) -> float:
+    """
+    Time of the request rounds over a network link.
+
+    Each round costs a round trip per request a connection makes in it
+    (:data:`CONNECTIONS` in parallel) plus its bytes at ``mbps``.
+    """
+    return sum(
+        -(-len(sizes) // CONNECTIONS) * rtt_ms + sum(sizes) * 8 / (mbps * 1000)
+        for sizes in rounds
+    )
+
+
+@pytest.mark.slow
+def test_first_meaningful_content() -> None:
+    """Compare when the heading can first be painted, with and without."""
+    results = {}
+    for prerender in (False, True):
+        with local_server(create_app(prerender=prerender).server) as port:
+            critical_path(port, TEXT)  # warm up
+            timings = []
+            for _ in range(21):
+                start = time.perf_counter()
+                rounds = critical_path(port, TEXT)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[prerender] = (sorted(timings)[10], rounds)
+
+    for prerender, (local, rounds) in results.items():
+        print(
+            f"\n{'with' if prerender else 'without'} prerender: "
+            f"{len(rounds)} round(s), {sum(map(sum, rounds)):,} bytes, "
+            f"local {local:.1f} ms, "
+            f"4G {modeled_ms(rounds, 50, 10):.0f} ms, "
+            f"3G {modeled_ms(rounds, 150, 1.6):.0f} ms"
+        )
+
+    [[shell_index]] = rounds = results[True][1]
+    [[index], *_] = results[False][1]
+    # The shell costs a few kilobytes on the index, not a round trip
+    assert shell_index - index < 20_000
+    for rtt_ms, mbps in ((50, 10), (150, 1.6)):
+        assert modeled_ms(rounds, rtt_ms, mbps) < modeled_ms(
+            results[False][1], rtt_ms, mbps
+        )
+
+
+@pytest.mark.slow
+def test_first_meaningful_content_in_browser() -> None:
+    """Measure the same in headless Chromium, where Playwright is set up."""
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as playwright:
+        try:
+            browser = playwright.chromium.launch()
+        except sync_api.Error as error:
+            pytest.skip(f"no headless Chromium: {error}")
+        results = {}
+        for prerender in (False, True):
+            server = create_app(prerender=prerender, local_icons=True).server
+            with local_server(server) as port:
+                page = browser.new_page()
+                start = time.perf_counter()
+                page.goto(f"http://127.0.0.1:{port}/", wait_until="commit")
+                page.get_by_text(TEXT).first.wait_for()
+                results[prerender] = (time.perf_counter() - start) * 1000
+                # And the overlay goes once the app is up
+                page.locator("#app-shell").wait_for()
+                page.locator("#dash-lite-prerender").wait_for(state="detached")
+                page.close()
+        browser.close()
+    print(
+        f"\nfirst meaningful content (Chromium): "
+        f"{results[False]:.0f} ms without prerender, {results[True]:.0f} ms"
+        " with"
+    )
+
+    assert results[True] < results[False]
@@ -0,0 +1,270 @@
+"""Tests for the on-demand request profiler."""
+
+from __future__ import annotations
+
+import json
+import time
+import timeit
+from pathlib import Path
+
+import pytest
+from dash import Dash, Input, Output, html
+from werkzeug.test import EnvironBuilder
+
+from dash_lite.app import _profiler_from_env, create_app
+from dash_lite.profiling import (
+    HEADER,
+    RequestProfiler,
+    install_profiler,
+    sign_profile_header,
+)
+from tests.helpers import greeting_body
+
+SECRET = "s3cret"
+AUTH = {"Authorization": f"Bearer {SECRET}"}
+
+
+def slow_body(value: str = "x") -> dict:
+    """Request body of the ``slow_echo`` callback."""
+    return {
+        "output": "out.children",
+        "outputs": {"id": "out", "property": "children"},
+        "inputs": [{"id": "in", "property": "value", "value": value}],
+        "changedPropIds": ["in.value"],
+        "state": [],
+    }
+
+
+@pytest.fixture
+def profiler(tmp_path: Path) -> RequestProfiler:
+    """Profiler writing to a temporary directory."""
+    return RequestProfiler(SECRET, tmp_path)
+
+
+@pytest.fixture
+def app(profiler: RequestProfiler) -> Dash:
+    """App with a callback slow enough to be sampled."""
+    # Callbacks run on the request thread, as in create_app
+    app = Dash(__name__, use_async=False)
+    app.layout = html.Div([html.Div(id="in"), html.Div(id="out")])
+
+    @app.callback(Output("out", "children"), Input("in", "value"))
+    def slow_echo(value: str) -> str:
+        time.sleep(0.05)
+        return value
+
+    install_profiler(app, profiler)
+    return app
+
+
+def _call(app: Dash, headers: dict | None = None) -> None:
+    """Run the slow callback once, closing the response like a server."""
+    response = app.server.test_client().post(
+        "/_dash-update-component",
+        json=slow_body(),
+        headers=headers or {},
+        buffered=True,
+    )
+    assert response.status_code == 200
+
+
+def _profiles(profiler: RequestProfiler) -> list[Path]:
+    return sorted(profiler.directory.glob("*.collapsed"))
+
+
+def test_idle_profiler_writes_nothing(
+    app: Dash, profiler: RequestProfiler
+) -> None:
+    """Test that without a trigger no request is profiled."""
+    _call(app)
+    assert not profiler.armed
+    assert _profiles(profiler) == []
+
+
+def test_signed_header_profiles_one_request(
+    app: Dash, profiler: RequestProfiler
+) -> None:
+    """Test the collapsed stack file of a profiled callback."""
+    _call(app, {HEADER: sign_profile_header(SECRET)})
+
+    [path] = _profiles(profiler)
+    assert "-slow_echo-" in path.name
+    stacks = dict(
+        line.rsplit(" ", 1) for line in path.read_text().splitlines()
+    )
+    # 50 ms asleep, sampled every millisecond
+    assert sum(map(int, stacks.values())) >= 10
+    # Root first, down to the sleeping callback
+    deepest = max(stacks, key=lambda stack: stacks[stack])
+    assert deepest.split(";")[-1].startswith("slow_echo (test_profiling.py")
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        sign_profile_header("wrong"),
+        sign_profile_header(SECRET, ttl=-10),
+        "garbage",
+    ],
+)
+def test_bad_signatures_are_ignored(
+    app: Dash, profiler: RequestProfiler, header: str
+) -> None:
+    """Test that wrong, expired and malformed headers do nothing."""
+    _call(app, {HEADER: header})
+    assert _profiles(profiler) == []
+
+
+class TestTriggerEndpoint:
+    """Tests for /_dash-lite/profile."""
+
+    def test_needs_the_secret(self, app: Dash) -> None:
+        """Test that the endpoint refuses missing or wrong tokens."""
+        client = app.server.test_client()
+        assert client.post("/_dash-lite/profile").status_code == 401
+        assert (
+            client.post(
+                "/_dash-lite/profile",
+                json={"requests": 1},
+                headers={"Authorization": "Bearer nope"},
+            ).status_code
+            == 401
+        )
+
+    def test_profiles_the_next_requests(
+        self, app: Dash, profiler: RequestProfiler
+    ) -> None:
+        """Test that requests=N profiles exactly N requests."""
+        client = app.server.test_client()
+        response = client.post(
+            "/_dash-lite/profile", json={"requests": 2}, headers=AUTH
+        )
+        assert response.json["requests"] == 2
+        assert response.json["directory"] == str(profiler.directory)
+
+        for _ in range(3):
+            _call(app)
+
+        assert len(_profiles(profiler)) == 2
+        state = client.get("/_dash-lite/profile", headers=AUTH).json
+        assert state["requests"] == 0
+        assert not profiler.armed
+
+    def test_delete_disarms(
+        self, app: Dash, profiler: RequestProfiler
+    ) -> None:
+        """Test that DELETE stops a running trigger."""
+        client = app.server.test_client()
+        client.post("/_dash-lite/profile", json={"fraction": 1}, headers=AUTH)
+        client.delete("/_dash-lite/profile", headers=AUTH)
+        _call(app)
+
+        assert _profiles(profiler) == []
+
+    def test_rejects_bad_options(self, app: Dash) -> None:
+        """Test that a fraction above 1 is a bad request."""
+        response = app.server.test_client().post(
+            "/_dash-lite/profile", json={"fraction": 2}, headers=AUTH
+        )
+        assert response.status_code == 400
+
+
+def test_sampled_fraction_ends(tmp_path: Path) -> None:
+    """Test that sampling stops once its time is up."""
+    now = [1000.0]
+    profiler = RequestProfiler(SECRET, tmp_path, clock=lambda: now[0])
+    profiler.trigger(fraction=1.0, seconds=10)
+
+    assert profiler.select(None)
+    now[0] = 1010.0
+    assert not profiler.select(None)
+    assert not profiler.armed
+
+
+def test_greeting_and_layout_requests_are_labelled(
+    profiler: RequestProfiler,
+) -> None:
+    """Test the file names for the app's own callback and its layout."""
+    app = create_app(profiler=profiler)
+    client = app.server.test_client()
+    profiler.trigger(requests=2)
+    client.post(
+        "/_dash-update-component", json=greeting_body("Ada"), buffered=True
+    )
+    client.get("/_dash-layout", buffered=True)
+
+    names = sorted(path.name.split("-")[1] for path in _profiles(profiler))
+    assert names == ["layout", "update_greeting"]
+
+
+def test_other_requests_are_not_profiled(
+    app: Dash, profiler: RequestProfiler
+) -> None:
+    """Test that pages and the trigger itself use up no profile."""
+    profiler.trigger(requests=1)
+    app.server.test_client().get("/")
+
+    assert profiler.state()["requests"] == 1
+
+
+def test_configured_from_environment(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    """Test DASH_LITE_PROFILE_SECRET and DASH_LITE_PROFILE_DIR."""
+    assert _profiler_from_env() is None
+
+    monkeypatch.setenv("DASH_LITE_PROFILE_SECRET", SECRET)
+    monkeypatch.setenv("DASH_LITE_PROFILE_DIR", str(tmp_path))
+    profiler = _profiler_from_env()
+    assert profiler is not None
+    assert profiler.directory == tmp_path
+
+
+def test_profiler_is_opt_in(dash_app: Dash) -> None:
+    """Test that the default app has no profiler."""
+    assert "dash_lite.profiler" not in dash_app.server.extensions
+    assert "dash_lite_profile" not in dash_app.server.view_functions
+
+
+@pytest.mark.slow
+def test_idle_overhead(tmp_path: Path) -> None:
+    """Measure the cost of an installed but idle profiler per request."""
+    client = create_app().server.test_client()
+    body = json.dumps(greeting_body("Ada"))
+
+    def request() -> None:
+        client.post(
+            "/_dash-update-component",
+            data=body,
+            content_type="application/json",
+        )
+
+    request()
+    per_request = min(timeit.repeat(request, number=100, repeat=5)) / 100
+
+    # The profiler's wrapper alone, around an app doing nothing
+    app = Dash(__name__)
+    app.server.wsgi_app = lambda *_: []
+    install_profiler(app, RequestProfiler(SECRET, tmp_path))
+    environ = EnvironBuilder(
+        "/_dash-update-component", method="POST", data=body
+    ).get_environ()
+    number = 100_000
+    per_call = (
+        min(
+            timeit.repeat(
+                lambda: app.server.wsgi_app(environ, None),
+                number=number,
+                repeat=5,
+            )
+        )
+        / number
+    )
+    print(
+        f"\nidle profiler: {per_call * 1e9:.0f} ns per request, "
+        f"{per_call / per_request:.3%} of a greeting callback request "
+        f"({per_request * 1e6:.0f} us)"
+    )
+
+    assert per_call < 0.001 * per_request
+    assert list(tmp_path.iterdir()) == []
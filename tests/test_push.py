@@ -0,0 +1,375 @@
+"""Tests for server-initiated updates over Server-Sent Events."""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import os
+import re
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+from dash import Dash
+
+from dash_lite.app import create_app
+from dash_lite.asgi import create_asgi_app
+from dash_lite.push import PushHub
+from dash_lite.session import SESSION_COOKIE
+from tests.helpers import greeting_body
+
+uvicorn = pytest.importorskip("uvicorn")
+pytest.importorskip("asgiref")
+
+ROOT = Path(__file__).parents[1]
+STREAM = "/_dash-lite/push"
+
+
+@contextmanager
+def serve(app: Dash) -> Iterator[int]:
+    """Serve ``app`` through the ASGI entry point; yields the port."""
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_asgi_app(app.server), port=0, log_level="warning"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield server.servers[0].sockets[0].getsockname()[1]
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+class Stream:
+    """An open push stream, read event by event."""
+
+    def __init__(self, port: int, session: str | None = None) -> None:
+        self.connection = http.client.HTTPConnection(
+            "127.0.0.1", port, timeout=5
+        )
+        headers = {"Cookie": f"{SESSION_COOKIE}={session}"} if session else {}
+        self.connection.request("GET", STREAM, headers=headers)
+        self.response = self.connection.getresponse()
+        assert self.response.status == 200
+        assert self.response.headers["Content-Type"] == "text/event-stream"
+        assert self.event() == "retry: 5000"
+
+    def event(self) -> str:
+        """Read the next event."""
+        lines = []
+        while (line := self.response.readline().decode()) != "\n":
+            lines.append(line.rstrip("\n"))
+        return "\n".join(lines)
+
+    def updates(self) -> dict:
+        """Read the next event, which must be data."""
+        event = self.event()
+        assert event.startswith("data: ")
+        return json.loads(event.removeprefix("data: "))
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_updates_reach_topic_and_session() -> None:
+    """Test that topics reach everyone and sessions only their pages."""
+    hub = PushHub(topics=["news"])
+    with serve(create_app(push=hub)) as port:
+        ada, bob = Stream(port, "ada"), Stream(port, "bob")
+        _wait_for(lambda: hub.connections == 2)
+
+        hub.publish("news", {"headline": {"children": "Hello"}})
+        hub.publish_to_session("bob", {"status": {"color": "red"}})
+        hub.publish_to_session("ada", {"status": {"color": "green"}})
+
+        assert ada.updates() == {"headline": {"children": "Hello"}}
+        assert ada.updates() == {"status": {"color": "green"}}
+        assert bob.updates() == {"headline": {"children": "Hello"}}
+        assert bob.updates() == {"status": {"color": "red"}}
+        ada.close()
+        bob.close()
+        _wait_for(lambda: hub.connections == 0)
+
+
+def test_publishing_from_a_callback() -> None:
+    """Test a callback pushing to its own session, on a worker thread."""
+    hub = PushHub()
+    app = create_app(push=hub)
+    greet = app.callback_map["greeting-output.children"]["callback"]
+
+    def pushing_greet(*args, **kwargs):
+        from dash_lite.session import get_session_id
+
+        hub.publish_to_session(get_session_id(), {"seen": {"children": 1}})
+        return greet(*args, **kwargs)
+
+    app.callback_map["greeting-output.children"]["callback"] = pushing_greet
+    with serve(app) as port:
+        stream = Stream(port, "ada")
+        _wait_for(lambda: hub.connections == 1)
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request(
+            "POST",
+            "/_dash-update-component",
+            body=json.dumps(greeting_body("Ada")),
+            headers={
+                "Content-Type": "application/json",
+                "Cookie": f"{SESSION_COOKIE}=ada",
+            },
+        )
+        assert connection.getresponse().status == 200
+
+        assert stream.updates() == {"seen": {"children": 1}}
+        stream.close()
+
+
+def test_keepalive_comments() -> None:
+    """Test that idle streams get comments to stay open."""
+    hub = PushHub(keepalive=0.05)
+    with serve(create_app(push=hub)) as port:
+        stream = Stream(port)
+        assert stream.event() == ": ping"
+        stream.close()
+
+
+def test_new_event_loop_cancels_old_heartbeat() -> None:
+    """Test that only the latest event loop keeps pinging."""
+    hub = PushHub(keepalive=0.05)
+
+    async def subscribe() -> None:
+        hub.unsubscribe(hub.subscribe([]))
+
+    old = asyncio.new_event_loop()
+    thread = threading.Thread(target=old.run_forever)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(subscribe(), old).result()
+        first = hub._heartbeat
+        asyncio.run(subscribe())
+        _wait_for(first.cancelled)
+    finally:
+        old.call_soon_threadsafe(old.stop)
+        thread.join()
+        old.close()
+
+
+def test_stuck_stream_is_closed() -> None:
+    """Test that a stream falling too far behind is dropped."""
+
+    async def scenario() -> None:
+        hub = PushHub(topics=["news"], max_pending=2)
+        subscription = hub.subscribe(["news"])
+        for i in range(3):
+            hub.publish("news", {"n": {"children": i}})
+
+        assert subscription.closed
+        assert await subscription.next() == (
+            b'data: {"n":{"children":0}}\n\ndata: {"n":{"children":1}}\n\n'
+        )
+        assert await subscription.next() == b""
+
+    asyncio.run(scenario())
+
+
+def test_session_topics_cannot_be_public() -> None:
+    """Test that public topics may not reach into sessions."""
+    with pytest.raises(ValueError, match="per session"):
+        PushHub(topics=["session:ada"])
+
+
+def test_page_loads_the_push_script() -> None:
+    """Test the browser script and its immutable URL."""
+    app = create_app(push=PushHub())
+    client = app.server.test_client()
+    [url] = re.findall(
+        r'src="([^"]*push\.[0-9a-f]+\.js)"', client.get("/").text
+    )
+    script = client.get(url)
+
+    assert '"/_dash-lite/push"' in script.text
+    assert "set_props" in script.text
+    assert "immutable" in script.headers["Cache-Control"]
+
+
+def test_wsgi_servers_turn_streams_away() -> None:
+    """Test the 204 that stops EventSource retries without ASGI."""
+    app = create_app(push=PushHub())
+    assert app.server.test_client().get(STREAM).status_code == 204
+
+
+def test_push_is_opt_in(dash_app: Dash) -> None:
+    """Test that the default app has no push script or hub."""
+    assert "dash_lite.push" not in dash_app.server.extensions
+    assert "push." not in dash_app.server.test_client().get("/").text
+
+
+def test_counters_on_metrics_endpoint() -> None:
+    """Test the push gauges in the Prometheus output."""
+    app = create_app(push=PushHub(), metrics=True)
+    text = app.server.test_client().get("/metrics").text
+
+    assert "dash_lite_push_connections 0" in text
+    assert "dash_lite_push_messages_total 0" in text
+
+
+SERVER_SCRIPT = textwrap.dedent(
+    """
+    import sys, uvicorn
+    from dash_lite.app import create_app
+    from dash_lite.asgi import create_asgi_app
+    from dash_lite.push import PushHub
+
+    hub = PushHub(topics=["news"])
+    app = create_app(push=hub)
+
+    @app.server.post("/publish")
+    def publish():
+        hub.publish("news", {"clock": {"children": "tick"}})
+        return ""
+
+    uvicorn.run(
+        create_asgi_app(app.server), host="127.0.0.1",
+        port=int(sys.argv[1]), log_level="warning", backlog=4096,
+    )
+    """
+)
+
+IDLE_CONNECTIONS = 10_000
+# A dashboard polling with dcc.Interval(interval=1000)
+POLL_INTERVAL = 1.0
+
+
+def _proc(pid: int, name: str) -> list[str]:
+    with open(f"/proc/{pid}/{name}") as file:
+        return file.read().split()
+
+
+def _rss(pid: int) -> int:
+    status = _proc(pid, "status")
+    return int(status[status.index("VmRSS:") + 1]) * 1024
+
+
+def _cpu_seconds(pid: int) -> float:
+    # utime and stime; the command name before them has no spaces here
+    stat = _proc(pid, "stat")
+    return (int(stat[13]) + int(stat[14])) / os.sysconf("SC_CLK_TCK")
+
+
+def _request(port: int, method: str, path: str, body: dict | None = None):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request(
+        method,
+        path,
+        body=json.dumps(body) if body else None,
+        headers={"Content-Type": "application/json"},
+    )
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status
+
+
+async def _open_streams(port: int, count: int) -> list:
+    """Open ``count`` streams, a few hundred at a time."""
+
+    async def open_stream():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {STREAM} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+        await reader.readuntil(b"retry: 5000\n\n")
+        return reader, writer
+
+    streams = []
+    for start in range(0, count, 500):
+        streams += await asyncio.gather(
+            *(open_stream() for _ in range(min(500, count - start)))
+        )
+    return streams
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not Path("/proc/self/stat").exists(), reason="needs /proc for RSS"
+)
+def test_idle_connections() -> None:
+    """Measure memory and CPU of 10k idle streams, and one broadcast."""
+    port = 18000 + os.getpid() % 1000
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT, str(port)], cwd=ROOT
+    )
+    try:
+        _wait_for(lambda: _server_up(port), timeout=30)
+        for path in ("/", "/_dash-layout", "/_dash-dependencies"):
+            _request(port, "GET", path)
+
+        # The cost of what push replaces: one polling callback request
+        before = _cpu_seconds(process.pid)
+        for _ in range(200):
+            _request(
+                port, "POST", "/_dash-update-component", greeting_body("Ada")
+            )
+        per_poll = (_cpu_seconds(process.pid) - before) / 200
+
+        async def scenario() -> tuple[float, float, float, float]:
+            base = _rss(process.pid)
+            start = time.perf_counter()
+            streams = await _open_streams(port, IDLE_CONNECTIONS)
+            connect = time.perf_counter() - start
+            await asyncio.sleep(1.0)
+            per_stream = (_rss(process.pid) - base) / IDLE_CONNECTIONS
+
+            before = _cpu_seconds(process.pid)
+            await asyncio.sleep(5.0)
+            idle = (_cpu_seconds(process.pid) - before) / 5.0
+
+            start = time.perf_counter()
+            await asyncio.to_thread(_request, port, "POST", "/publish")
+            await asyncio.gather(
+                *(reader.readuntil(b"tick") for reader, _ in streams)
+            )
+            fan_out = time.perf_counter() - start
+            for _, writer in streams:
+                writer.close()
+            return connect, per_stream, idle, fan_out
+
+        connect, per_stream, idle, fan_out = asyncio.run(scenario())
+    finally:
+        process.terminate()
+        process.wait()
+
+    polling = IDLE_CONNECTIONS / POLL_INTERVAL * per_poll
+    print(
+        f"\n{IDLE_CONNECTIONS:,} idle streams: opened in {connect:.1f} s, "
+        f"{per_stream / 1024:.1f} KiB each, {idle:.1%} of a core idle, "
+        f"broadcast to all in {fan_out * 1000:.0f} ms; polling every "
+        f"{POLL_INTERVAL:g} s instead would need {polling:.1f} cores "
+        f"({per_poll * 1e3:.2f} ms CPU per request)"
+    )
+
+    assert per_stream < 64 * 1024
+    assert idle < 0.05
+    assert fan_out < 10
+
+
+def _server_up(port: int) -> bool:
+    try:
+        return _request(port, "GET", "/") == 200
+    except OSError:
+        return False
@@ -0,0 +1,154 @@
+"""Tests for the memory-mapped ring buffer of live samples."""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+from dash_lite import ringbuffer
+from dash_lite.ringbuffer import RingBuffer
+
+
+@pytest.fixture
+def path(tmp_path: Path) -> Path:
+    """Path of a new buffer file."""
+    return tmp_path / "live.ring"
+
+
+def test_reads_only_samples_since_the_cursor(path: Path) -> None:
+    """Test cursors, timestamps and columns."""
+    buffer = RingBuffer(path, capacity=10, columns=2)
+    buffer.append((1.0, 10.0), timestamp=100)
+    first = buffer.read()
+    buffer.extend([(200, (2.0, 20.0)), (300, (3.0, 30.0))])
+    second = buffer.read(first.cursor)
+
+    assert (first.cursor, first.timestamps) == (1, [100.0])
+    assert second.cursor == 3
+    assert second.timestamps == [200.0, 300.0]
+    assert second.values == [[2.0, 3.0], [20.0, 30.0]]
+    assert buffer.read(second.cursor).timestamps == []
+
+
+def test_oldest_samples_are_overwritten(path: Path) -> None:
+    """Test the wrap-around, in single and bulk writes."""
+    buffer = RingBuffer(path, capacity=5)
+    for i in range(7):
+        buffer.append(i, timestamp=i)
+    assert len(buffer) == 5
+    everything = buffer.read(0)
+    assert everything.values == [[2.0, 3.0, 4.0, 5.0, 6.0]]
+    assert everything.skipped == 2
+
+    # More than the capacity at once: only the latest are kept, in order
+    buffer.extend((i, i) for i in range(100, 112))
+    assert buffer.read().values == [[107.0, 108.0, 109.0, 110.0, 111.0]]
+
+
+def test_limit_keeps_the_latest(path: Path) -> None:
+    """Test that a reader far behind gets the latest samples only."""
+    buffer = RingBuffer(path, capacity=100)
+    buffer.extend((i, i) for i in range(50))
+    samples = buffer.read(10, limit=5)
+
+    assert samples.values == [[45.0, 46.0, 47.0, 48.0, 49.0]]
+    assert samples.skipped == 35
+
+
+def test_timestamps_default_to_now(path: Path) -> None:
+    """Test that samples without a timestamp get the current time."""
+    buffer = RingBuffer(path)
+    buffer.append(1.0)
+    [timestamp] = buffer.read().timestamps
+    assert timestamp > 1.7e12
+
+
+def test_reopened_file_keeps_its_samples(path: Path) -> None:
+    """Test that a second mapping sees the same buffer."""
+    writer = RingBuffer(path, capacity=10)
+    reader = RingBuffer(path, capacity=10)
+    writer.append(42.0, timestamp=1)
+
+    assert reader.read().values == [[42.0]]
+    writer.close()
+    assert RingBuffer(path, capacity=10).written == 1
+
+
+def test_shape_mismatch_is_refused(path: Path) -> None:
+    """Test opening a file with another capacity or columns."""
+    RingBuffer(path, capacity=10)
+    with pytest.raises(ValueError, match="holds 10 samples"):
+        RingBuffer(path, capacity=20)
+    path.with_suffix(".txt").write_bytes(b"x" * 64)
+    with pytest.raises(ValueError, match="not a ring buffer"):
+        RingBuffer(path.with_suffix(".txt"))
+    with pytest.raises(ValueError, match="expected 1 values"):
+        RingBuffer(path, capacity=10).append((1.0, 2.0))
+
+
+def test_reads_skip_a_write_in_progress(path: Path) -> None:
+    """Test a read while a writer has overwritten, not yet published."""
+    buffer = RingBuffer(path, capacity=5)
+    buffer.extend((i, i) for i in range(5))
+    # What extend() does before publishing the sixth sample
+    buffer._header[ringbuffer._WRITING] = 6
+    buffer._records[0:2] = array("d", [5.0, 5.0])
+
+    samples = buffer.read()
+    assert samples.values == [[1.0, 2.0, 3.0, 4.0]]
+    assert (samples.cursor, samples.skipped) == (5, 1)
+
+
+def test_works_without_posix_calls(
+    path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test the calls available on Windows: no pread, pwrite or flock."""
+    monkeypatch.delattr(os, "pread")
+    monkeypatch.delattr(os, "pwrite")
+    monkeypatch.setattr(ringbuffer, "fcntl", None)
+    RingBuffer(path, capacity=10).append(1.0, timestamp=1)
+
+    assert RingBuffer(path, capacity=10).read().values == [[1.0]]
+
+
+WRITES = 2000
+
+
+def _write(path: Path, offset: int, buffer: RingBuffer | None) -> None:
+    buffer = buffer or RingBuffer(path, capacity=10_000)
+    for i in range(WRITES):
+        buffer.append(offset + i, timestamp=offset + i)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs flock")
+@pytest.mark.parametrize("inherited", [False, True])
+def test_processes_share_the_buffer(path: Path, inherited: bool) -> None:
+    """Test concurrent writers in forked processes losing no sample."""
+    buffer = RingBuffer(path, capacity=10_000)
+    context = multiprocessing.get_context("fork")
+    writers = [
+        # Opening the file, or using the parent's mapping like forked
+        # server workers
+        context.Process(
+            target=_write, args=(path, offset, buffer if inherited else None)
+        )
+        for offset in (0, 100_000, 200_000)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    samples = buffer.read()
+    assert samples.cursor == 3 * WRITES
+    assert sorted(samples.values[0]) == sorted(
+        float(offset + i)
+        for offset in (0, 100_000, 200_000)
+        for i in range(WRITES)
+    )
+    assert samples.timestamps == samples.values[0]
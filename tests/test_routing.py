@@ -0,0 +1,229 @@
+"""Tests for multi-page routing with lazily built pages."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from dash import Dash
+
+from dash_lite.app import create_app
+from dash_lite.layout_cache import LayoutCache
+from dash_lite.routing import PageRouter
+
+ROUTE_BODY = {
+    "output": "..page-content.children...page-rendered.data..",
+    "outputs": [
+        {"id": "page-content", "property": "children"},
+        {"id": "page-rendered", "property": "data"},
+    ],
+    "inputs": [{"id": "url", "property": "pathname", "value": "/settings"}],
+    "changedPropIds": ["url.pathname"],
+    "state": [{"id": "page-rendered", "property": "data", "value": "/"}],
+}
+
+SAVE_BODY = {
+    "output": "settings-status.children",
+    "outputs": {"id": "settings-status", "property": "children"},
+    "inputs": [{"id": "settings-save", "property": "n_clicks", "value": 1}],
+    "changedPropIds": ["settings-save.n_clicks"],
+    "state": [
+        {"id": "settings-display-name", "property": "value", "value": "Ada"},
+        {"id": "settings-notifications", "property": "checked", "value": 1},
+    ],
+}
+
+
+@pytest.fixture
+def app() -> Dash:
+    """App with the navbar routed to pages."""
+    return create_app(pages=True)
+
+
+def _layout(app: Dash, path: str) -> bytes:
+    """Fetch /_dash-layout as the browser does after loading ``path``."""
+    client = app.server.test_client()
+    assert client.get(path).status_code == 200
+    response = client.get(
+        "/_dash-layout", headers={"Referer": f"http://localhost{path}"}
+    )
+    assert response.status_code == 200
+    return response.data
+
+
+def _component_ids(node: object) -> set[str]:
+    """Collect the ids in a serialized component tree."""
+    return {
+        component["props"]["id"]
+        for component in _walk(node)
+        if isinstance(component["props"].get("id"), str)
+    }
+
+
+def test_layout_holds_only_the_requested_page(app: Dash) -> None:
+    """Test that another page's layout is smaller than the dashboard's."""
+    dashboard = _layout(app, "/")
+    analytics = _layout(app, "/analytics")
+
+    ids = _component_ids(json.loads(analytics))
+    assert "analytics-chart" in ids
+    assert "greeting-output" not in ids
+    assert len(analytics) < len(dashboard)
+
+
+def test_only_visited_pages_are_built(app: Dash) -> None:
+    """Test that visiting one page builds none of the other layouts."""
+    router: PageRouter = app.server.extensions["dash_lite.router"]
+    assert router.loaded() == []
+
+    app.server.test_client().get("/settings")
+    _layout(app, "/settings")
+    assert router.loaded() == ["/settings"]
+
+
+# Visits the Analytics page, then zooms its history chart
+DEFERRED_IMPORT_SCRIPT = textwrap.dedent(
+    """
+    import json, sys
+    from dash_lite.app import create_app
+
+    client = create_app(pages=True).server.test_client()
+    client.get("/analytics")
+    client.get(
+        "/_dash-layout", headers={"Referer": "http://localhost/analytics"}
+    )
+    visited = "dash_lite.timeseries" in sys.modules
+    response = client.post("/_dash-update-component", json=json.loads(
+        sys.argv[1]
+    ))
+    print(json.dumps([visited, "dash_lite.timeseries" in sys.modules,
+                      response.status_code]))
+    """
+)
+
+
+def test_page_imports_wait_for_their_use() -> None:
+    """Test that the history's modules load with its first figure."""
+    pytest.importorskip("numpy")
+    body = {
+        "output": "analytics-history.figure",
+        "outputs": {"id": "analytics-history", "property": "figure"},
+        "inputs": [
+            {"id": "analytics-history-view", "property": "data"},
+            {"id": "analytics-metric", "property": "value", "value": "visits"},
+        ],
+        "changedPropIds": ["analytics-history-view.data"],
+        "state": [],
+    }
+    # A fresh interpreter, as other tests import the modules
+    result = subprocess.run(
+        [sys.executable, "-c", DEFERRED_IMPORT_SCRIPT, json.dumps(body)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout) == [False, True, 200]
+
+
+def test_page_callbacks_are_registered_at_creation(app: Dash) -> None:
+    """Test that /_dash-dependencies holds every page's callbacks."""
+    response = app.server.test_client().get("/_dash-dependencies")
+    outputs = {callback["output"] for callback in response.get_json()}
+
+    assert "analytics-chart.series" in outputs
+    assert "settings-status.children" in outputs
+
+
+def test_any_worker_runs_any_page_callback() -> None:
+    """Test a callback served by a process that never served its page."""
+    first, second = create_app(pages=True), create_app(pages=True)
+    first.server.test_client().get("/settings")
+    dependencies = [
+        app.server.test_client().get("/_dash-dependencies").data
+        for app in (first, second)
+    ]
+    response = second.server.test_client().post(
+        "/_dash-update-component", json=SAVE_BODY
+    )
+
+    assert dependencies[0] == dependencies[1]
+    assert response.status_code == 200, response.text
+
+
+def test_repeat_layout_requests_are_cached(
+    app: Dash, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a page's layout is serialized only once."""
+    calls: list[None] = []
+    original = LayoutCache.serialize
+
+    def counting(self: LayoutCache) -> bytes:
+        calls.append(None)
+        return original(self)
+
+    monkeypatch.setattr(LayoutCache, "serialize", counting)
+    first = _layout(app, "/analytics")
+    second = _layout(app, "/analytics")
+
+    assert first == second
+    assert len(calls) == 1
+
+
+def test_missing_referer_falls_back_to_router_callback(app: Dash) -> None:
+    """Test that the router callback renders the page of the URL."""
+    client = app.server.test_client()
+    home = json.loads(client.get("/_dash-layout").data)
+    assert "greeting-output" in _component_ids(home)
+
+    response = client.post("/_dash-update-component", json=ROUTE_BODY)
+    result = response.get_json()["response"]
+    assert result["page-rendered"]["data"] == "/settings"
+    assert "settings-save" in _component_ids(result["page-content"])
+
+
+def test_nav_links_point_to_pages(app: Dash) -> None:
+    """Test that the navbar links reload the app on their page."""
+    layout = json.loads(_layout(app, "/analytics"))
+    links = [
+        node["props"]
+        for node in _walk(layout)
+        if node.get("type") == "NavLink"
+    ]
+
+    assert [link["href"] for link in links] == ["/", "/analytics", "/settings"]
+    assert [link["active"] for link in links] == [False, True, False]
+    assert all(link["refresh"] for link in links)
+
+
+def test_unknown_path_shows_home_page(app: Dash) -> None:
+    """Test that unknown URLs are routed to the first page."""
+    router: PageRouter = app.server.extensions["dash_lite.router"]
+
+    assert router.page("/nowhere") is router.home
+    assert router.page("/analytics/").path == "/analytics"
+
+
+def test_pages_are_opt_in() -> None:
+    """Test that the default app keeps the single-page layout."""
+    app = create_app()
+
+    assert "dash_lite.router" not in app.server.extensions
+    assert not app.config.suppress_callback_exceptions
+
+
+def _walk(node: object) -> list[dict]:
+    """Return every component in a serialized tree."""
+    found: list[dict] = []
+    if isinstance(node, dict):
+        if "type" in node and "props" in node:
+            found.append(node)
+        for value in node.values():
+            found.extend(_walk(value))
+    elif isinstance(node, list):
+        for value in node:
+            found.extend(_walk(value))
+    return found
@@ -0,0 +1,220 @@
+"""Tests for the production server mode."""
+
+from __future__ import annotations
+
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Any
+
+import pytest
+from dash import Dash
+
+from dash_lite import app as app_module
+from dash_lite.server import build_options, default_workers
+
+GREETING_PAYLOAD = json.dumps(
+    {
+        "output": "greeting-output.children",
+        "outputs": {"id": "greeting-output", "property": "children"},
+        "inputs": [
+            {"id": "greeting-style", "property": "value", "value": "formal"},
+            {"id": "name-input", "property": "value", "value": "Ada"},
+        ],
+        "changedPropIds": ["name-input.value"],
+        "state": [],
+    }
+)
+
+
+class TestBuildOptions:
+    """Tests for the gunicorn option builder."""
+
+    def test_preloads_app_before_fork(self) -> None:
+        """Test that the app is built once in the master process."""
+        options = build_options("127.0.0.1", 8000, workers=2, threads=4)
+        assert options["preload_app"] is True
+
+    def test_bind_address(self) -> None:
+        """Test that host and port are combined into the bind address."""
+        options = build_options("127.0.0.1", 8000, workers=1, threads=1)
+        assert options["bind"] == "127.0.0.1:8000"
+
+    def test_threads_select_gthread_worker(self) -> None:
+        """Test that more than one thread uses the threaded worker."""
+        assert (
+            build_options("h", 1, workers=1, threads=4)["worker_class"]
+            == "gthread"
+        )
+        assert (
+            build_options("h", 1, workers=1, threads=1)["worker_class"]
+            == "sync"
+        )
+
+    def test_env_defaults(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that worker and thread counts fall back to env vars."""
+        monkeypatch.setenv("DASH_LITE_WORKERS", "3")
+        monkeypatch.setenv("DASH_LITE_THREADS", "8")
+        options = build_options("h", 1)
+        assert options["workers"] == 3
+        assert options["threads"] == 8
+
+    def test_default_workers(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that workers default to 2 * cores + 1."""
+        monkeypatch.delenv("DASH_LITE_WORKERS", raising=False)
+        assert build_options("h", 1)["workers"] == default_workers()
+
+    def test_rejects_empty_pool(self) -> None:
+        """Test that a pool without workers or threads is refused."""
+        with pytest.raises(ValueError):
+            build_options("h", 1, workers=0, threads=1)
+
+
+class TestMain:
+    """Tests for mode selection in the ``dashlite`` entry point."""
+
+    @pytest.fixture
+    def calls(self, monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+        """Record how main() starts the server instead of starting it."""
+        recorded: dict[str, Any] = {}
+
+        def fake_run(_app: Dash, **kwargs: Any) -> None:
+            recorded["dev"] = kwargs
+
+        def fake_production(_server: Any, options: dict[str, Any]) -> None:
+            recorded["production"] = options
+
+        monkeypatch.setattr(Dash, "run", fake_run)
+        monkeypatch.setattr("dash_lite.server.run_production", fake_production)
+        for name in ("DASH_LITE_MODE", "DASH_LITE_DEBUG", "DASH_LITE_PORT"):
+            monkeypatch.delenv(name, raising=False)
+        return recorded
+
+    def test_development_is_default(self, calls: dict[str, Any]) -> None:
+        """Test that the dev server with debug is still the default."""
+        app_module.main([])
+        assert calls["dev"]["debug"] is True
+        assert "production" not in calls
+
+    def test_production_flag(self, calls: dict[str, Any]) -> None:
+        """Test that --production selects the WSGI runner."""
+        app_module.main(["--production", "--workers", "2", "--threads", "3"])
+        assert calls["production"]["workers"] == 2
+        assert calls["production"]["threads"] == 3
+        assert "dev" not in calls
+
+    def test_production_env_var(
+        self, calls: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that DASH_LITE_MODE=production selects the WSGI runner."""
+        monkeypatch.setenv("DASH_LITE_MODE", "production")
+        app_module.main([])
+        assert "production" in calls
+
+    @pytest.mark.usefixtures("calls")
+    def test_production_disables_debug_by_default(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that dev tools stay off in production unless requested."""
+        enabled: list[bool] = []
+        monkeypatch.setattr(
+            Dash,
+            "enable_dev_tools",
+            lambda _app, debug=None, **_: enabled.append(debug),
+        )
+        app_module.main(["--production"])
+        assert enabled == []
+
+        monkeypatch.setenv("DASH_LITE_DEBUG", "true")
+        app_module.main(["--production"])
+        assert enabled == [True]
+
+
+def _free_port() -> int:
+    """Return a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(args: list[str], port: int) -> subprocess.Popen:
+    """Launch ``python -m dash_lite.app`` and wait until it accepts."""
+    env = {
+        **os.environ,
+        "DASH_LITE_PORT": str(port),
+        "DASH_LITE_DEBUG": "false",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "dash_lite.app", *args],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def _measure_rps(port: int, concurrency: int, duration: float) -> float:
+    """Hammer the greeting callback and return completed requests/sec."""
+    completed = [0] * concurrency
+    stop_at = time.monotonic() + duration
+
+    def worker(index: int) -> None:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        headers = {"Content-Type": "application/json"}
+        while time.monotonic() < stop_at:
+            conn.request(
+                "POST", "/_dash-update-component", GREETING_PAYLOAD, headers
+            )
+            response = conn.getresponse()
+            response.read()
+            assert response.status == 200
+            completed[index] += 1
+        conn.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(i,)) for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(completed) / duration
+
+
+@pytest.mark.slow
+def test_load_benchmark_production_vs_dev() -> None:
+    """Compare callback requests/sec of the dev and production servers."""
+    results = {}
+    for mode, args in (
+        ("dev", []),
+        ("production", ["--production", "--workers", "2", "--threads", "4"]),
+    ):
+        port = _free_port()
+        process = _start_server(args, port)
+        try:
+            # Warm up (first request runs Dash's server setup)
+            _measure_rps(port, concurrency=1, duration=0.5)
+            results[mode] = _measure_rps(port, concurrency=16, duration=5.0)
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print(
+        f"\nrequests/sec  dev={results['dev']:.0f}  "
+        f"production={results['production']:.0f}"
+    )
+    assert results["dev"] > 0
+    assert results["production"] > 0
@@ -0,0 +1,112 @@
+"""Startup-time budget: import cost and ``create_app()`` cost."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Budgets in seconds, for a fresh interpreter. The first is what every
+# `import dash_lite` pays; the second what a worker pays before serving.
+IMPORT_BUDGET = 0.05
+STARTUP_BUDGET = 3.0
+# Checked in every run, loose enough for shared CI runners, so that a
+# regression of several times still fails without --run-slow
+CI_IMPORT_BUDGET = 10 * IMPORT_BUDGET
+CI_STARTUP_BUDGET = 4 * STARTUP_BUDGET
+
+HEAVY_MODULES = ("dash", "dash_mantine_components", "dash_iconify", "flask")
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import dash_lite, dash_lite.greeting
+imported = time.perf_counter()
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+dash_lite.create_app()
+created = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "create_app": created - imported,
+    "heavy_after_import": heavy,
+}}))
+"""
+
+
+def _measure_startup() -> tuple[dict, list[tuple[int, int, str]]]:
+    """
+    Import dash_lite and create the app in a fresh interpreter.
+
+    Returns:
+        The timings printed by the child, and its ``-X importtime``
+        breakdown as ``(cumulative microseconds, depth, module)``.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            STARTUP_SCRIPT.format(heavy=HEAVY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    breakdown = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        breakdown.append((int(cumulative), depth, module.strip()))
+    return json.loads(result.stdout.splitlines()[-1]), breakdown
+
+
+def test_import_is_light_and_startup_bounded() -> None:
+    """Test that importing leaves Dash unloaded, within loose budgets."""
+    timings, _ = _measure_startup()
+
+    assert timings["heavy_after_import"] == []
+    assert timings["import"] < CI_IMPORT_BUDGET
+    assert timings["import"] + timings["create_app"] < CI_STARTUP_BUDGET
+
+
+# The tight wall-clock budgets, too noisy for shared CI runners
+@pytest.mark.slow
+def test_startup_within_budget() -> None:
+    """Test that importing is cheap and startup stays within budget."""
+    timings, breakdown = _measure_startup()
+    top_level = sorted(
+        ((us, module) for us, depth, module in breakdown if depth == 0),
+        reverse=True,
+    )
+    print(
+        f"\nimport dash_lite: {timings['import'] * 1000:.1f}ms  "
+        f"create_app(): {timings['create_app'] * 1000:.0f}ms\n"
+        + "\n".join(
+            f"  {us / 1000:8.1f}ms  {module}" for us, module in top_level[:8]
+        )
+    )
+
+    assert timings["import"] < IMPORT_BUDGET
+    assert timings["import"] + timings["create_app"] < STARTUP_BUDGET
+
+
+def test_greeting_does_not_need_dash() -> None:
+    """Test that the greeting helper is usable without importing Dash."""
+    code = (
+        "import sys\n"
+        "from dash_lite.greeting import build_greeting\n"
+        "assert build_greeting('short', 'Ada') == 'Hi, Ada!'\n"
+        "print('dash' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,238 @@
+"""Tests for mounting many tenant apps in one process."""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+from werkzeug.test import Client
+
+from dash_lite import app as app_module
+from dash_lite.app import create_app
+from dash_lite.tenants import SHARED_PREFIX, Tenant, TenantDispatcher
+from tests.helpers import greeting_body
+
+ROOT = Path(__file__).parents[1]
+
+
+@pytest.fixture(scope="module")
+def dispatcher() -> TenantDispatcher:
+    """Two tenants with their own titles and options."""
+    return TenantDispatcher(
+        [
+            Tenant("acme", "Acme Analytics"),
+            Tenant("globex", "Globex", {"greeting_mode": "client"}),
+        ],
+        compression=True,
+    )
+
+
+@pytest.fixture
+def client(dispatcher: TenantDispatcher) -> Client:
+    """Client of the whole dispatcher."""
+    return Client(dispatcher)
+
+
+def _static_urls(index: str) -> list[str]:
+    """Script and stylesheet URLs of an index page."""
+    return re.findall(r'<(?:script|link)[^>]*(?:src|href)="([^"]+)"', index)
+
+
+def test_tenants_keep_their_titles(client: Client) -> None:
+    """Test that each tenant's index has its own title."""
+    assert "<title>Acme Analytics</title>" in client.get("/acme/").text
+    assert "<title>Globex</title>" in client.get("/globex/").text
+
+
+def test_tenants_keep_their_callbacks(client: Client) -> None:
+    """Test that callbacks run under the tenant's prefix, per its options."""
+    response = client.post(
+        "/acme/_dash-update-component", json=greeting_body("Ada")
+    )
+    assert response.status_code == 200
+    assert "Ada" in response.text
+
+    def greeting(tenant: str) -> dict:
+        dependencies = client.get(f"/{tenant}/_dash-dependencies").json
+        [dependency] = [
+            dependency
+            for dependency in dependencies
+            if dependency["output"] == "greeting-output.children"
+        ]
+        return dependency
+
+    assert greeting("acme")["clientside_function"] is None
+    assert greeting("globex")["clientside_function"] is not None
+
+
+def test_every_app_has_the_theme_switch() -> None:
+    """Test that the theme callback is not only on the first app created."""
+    for app in (create_app(), create_app()):
+        outputs = [
+            dependency["output"]
+            for dependency in app.server.test_client()
+            .get("/_dash-dependencies")
+            .json
+        ]
+        assert outputs.count("color-scheme-switch.id") == 1
+
+
+def test_bundles_come_from_the_shared_prefix(client: Client) -> None:
+    """Test that index pages link the shared bundles, which are served."""
+    urls = _static_urls(client.get("/acme/").text)
+    bundles = [url for url in urls if "_dash-component-suites" in url]
+    assets = [url for url in urls if "/assets/" in url]
+
+    assert bundles and assets
+    assert all(url.startswith(SHARED_PREFIX + "/") for url in bundles + assets)
+    assert set(bundles + assets) == {
+        url
+        for url in _static_urls(client.get("/globex/").text)
+        if url.startswith(SHARED_PREFIX)
+    }
+    for url in bundles + assets:
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200, url
+    assert response.headers["Cache-Control"].endswith("immutable")
+
+
+def test_shared_prefix_serves_nothing_else(client: Client) -> None:
+    """Test that the shared app exposes no page, layout or callbacks."""
+    for path in ("/", "/_dash-layout", "/_dash-dependencies", "/nope/"):
+        assert client.get(SHARED_PREFIX + path).status_code == 404
+    assert client.get("/").status_code == 404
+
+
+def test_tenants_share_one_layout(dispatcher: TenantDispatcher) -> None:
+    """Test that tenants with the same layout options share the tree."""
+    acme, globex = dispatcher.apps["acme"], dispatcher.apps["globex"]
+    assert acme.layout is globex.layout
+
+    debounced = dispatcher.add(
+        Tenant("initech", "Initech", {"name_debounce": 300})
+    )
+    assert debounced.layout is not acme.layout
+
+
+def test_pages_work_under_a_prefix() -> None:
+    """Test that the page router matches paths below the tenant prefix."""
+    dispatcher = TenantDispatcher([Tenant("acme", "Acme", {"pages": True})])
+    client = Client(dispatcher)
+
+    assert client.get("/acme/settings").status_code == 200
+    layout = client.get(
+        "/acme/_dash-layout",
+        headers={"Referer": "http://localhost/acme/settings"},
+    )
+    router = dispatcher.apps["acme"].server.extensions["dash_lite.router"]
+    assert router.loaded() == ["/settings"]
+    assert b"settings-save" in layout.data
+
+
+@pytest.mark.parametrize("name", ["_shared", "Acme", "a/b", "", "acme"])
+def test_bad_or_taken_names_are_refused(
+    dispatcher: TenantDispatcher, name: str
+) -> None:
+    """Test tenant name validation."""
+    with pytest.raises(ValueError, match="tenant"):
+        dispatcher.add(Tenant(name, "Title"))
+
+
+def test_layout_and_pages_exclude_each_other() -> None:
+    """Test that a prebuilt layout cannot be combined with pages."""
+    with pytest.raises(ValueError, match="pages"):
+        create_app(layout=object(), pages=True)
+
+
+def test_main_serves_tenants_from_environment(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that DASH_LITE_TENANTS serves a dispatcher of those tenants."""
+    served = []
+    monkeypatch.setattr(
+        "dash_lite.server.run_production",
+        lambda application, _options: served.append(application),
+    )
+    monkeypatch.setenv("DASH_LITE_TENANTS", "acme=Acme Analytics, globex")
+    app_module.main(["--production"])
+
+    [dispatcher] = served
+    assert isinstance(dispatcher, TenantDispatcher)
+    assert list(dispatcher.apps) == ["acme", "globex"]
+    assert "<title>globex</title>" in Client(dispatcher).get("/globex/").text
+
+
+RSS_SCRIPT = textwrap.dedent(
+    """
+    import gc, sys
+    from werkzeug.test import Client
+    from tests.helpers import greeting_body
+
+    def rss():
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+
+    def warm(client, prefix):
+        # Index, layout and dependencies cached, and a callback run
+        for path in ("", "_dash-layout", "_dash-dependencies"):
+            assert client.get(prefix + path).status_code == 200
+        assert client.post(
+            prefix + "_dash-update-component", json=greeting_body("Ada")
+        ).status_code == 200
+
+    tenants = int(sys.argv[1])
+    if not tenants:
+        from dash_lite.app import create_app
+        warm(Client(create_app().server), "/")
+        gc.collect()
+        print(rss())
+    else:
+        from dash_lite.tenants import Tenant, TenantDispatcher
+        dispatcher = TenantDispatcher()
+        client = Client(dispatcher)
+        for i in range(tenants + 2):
+            if i == 2:
+                # After the first tenants, whose requests import lazily
+                gc.collect()
+                before = rss()
+            dispatcher.add(Tenant(f"t{i}", f"Tenant {i}"))
+            warm(client, f"/t{i}/")
+        gc.collect()
+        print((rss() - before) / tenants)
+    """
+)
+
+
+def _run(tenants: int) -> float:
+    """Run the RSS script in a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", RSS_SCRIPT, str(tenants)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return float(output)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not Path("/proc/self/status").exists(), reason="needs /proc for RSS"
+)
+def test_rss_per_additional_tenant() -> None:
+    """Compare the memory of another tenant with another process."""
+    process = _run(0)
+    tenant = _run(40)
+    print(
+        f"\nRSS: {process / 2**20:.1f} MiB per standalone process, "
+        f"{tenant / 2**20:.2f} MiB per additional mounted tenant"
+    )
+
+    assert tenant < 1024 * 1024
+    assert tenant < process / 50
@@ -0,0 +1,315 @@
+"""Tests for downsampling large time series."""
+
+from __future__ import annotations
+
+import base64
+import json
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dash_lite.app import create_app  # noqa: E402
+from dash_lite.pages import analytics  # noqa: E402
+from dash_lite.timeseries import (  # noqa: E402
+    Pyramid,
+    lttb,
+    lttb_indices,
+    minmax,
+    minmax_indices,
+    typed_array,
+)
+from tests.helpers import percentile  # noqa: E402
+
+
+def _series(points: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Noisy sine wave with a few spikes."""
+    rng = np.random.default_rng(seed)
+    x = np.arange(points, dtype=np.float64)
+    y = np.sin(x / points * 20) + 0.1 * rng.standard_normal(points)
+    return x, y
+
+
+def _decode(array: dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(array["bdata"]), array["dtype"])
+
+
+def test_minmax_keeps_spikes_and_ends() -> None:
+    """Test that the envelope holds every bucket's extremes."""
+    x, y = _series(10_000)
+    y[1234], y[8765] = 50.0, -50.0
+    kept_x, kept_y = minmax(x, y, 100)
+
+    assert len(kept_x) <= 200
+    assert np.all(np.diff(kept_x) > 0)
+    assert 50.0 in kept_y and -50.0 in kept_y
+    assert kept_y.max() == y.max() and kept_y.min() == y.min()
+
+
+def test_minmax_returns_short_series_whole() -> None:
+    """Test that series within the budget are left alone."""
+    assert minmax_indices(np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_lttb_picks_one_point_per_bucket() -> None:
+    """Test the point count, the kept ends and a surviving spike."""
+    x, y = _series(10_000)
+    y[5000] = 50.0
+    kept_x, kept_y = lttb(x, y, 300)
+
+    assert len(kept_x) == 300
+    assert kept_x[0] == x[0] and kept_x[-1] == x[-1]
+    assert np.all(np.diff(kept_x) > 0)
+    assert 50.0 in kept_y
+    assert len(lttb_indices(x[:10], y[:10], 300)) == 10
+
+
+def test_lttb_matches_the_reference_algorithm() -> None:
+    """Test against a point-by-point implementation of LTTB."""
+    x, y = _series(1_003, seed=3)
+    points = 50
+    edges = np.linspace(1, len(x) - 1, points - 1).astype(int)
+    expected, chosen = [0], 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket == points - 3:
+            cx, cy = x[-1], y[-1]
+        else:
+            after = slice(stop, edges[bucket + 2])
+            cx, cy = x[after].mean(), y[after].mean()
+        areas = [
+            abs(
+                (x[chosen] - cx) * (y[i] - y[chosen])
+                - (x[chosen] - x[i]) * (cy - y[chosen])
+            )
+            for i in range(start, stop)
+        ]
+        chosen = start + int(np.argmax(areas))
+        expected.append(chosen)
+    expected.append(len(x) - 1)
+
+    assert lttb_indices(x, y, points).tolist() == expected
+
+
+def test_pyramid_levels_shrink_and_keep_extremes() -> None:
+    """Test that each level is coarser and holds the global extremes."""
+    x, y = _series(100_000)
+    pyramid = Pyramid(x, y, block=64, factor=4)
+    sizes = [len(level) for level in pyramid.levels]
+
+    assert sizes == sorted(sizes, reverse=True)
+    assert sizes[0] <= 2 * 100_000 // 64 + 2
+    for level in pyramid.levels:
+        assert np.all(np.diff(level) > 0)
+        assert y.argmax() in level and y.argmin() in level
+
+
+def test_pyramid_rejects_unsorted_x() -> None:
+    """Test the input validation."""
+    with pytest.raises(ValueError, match="sorted"):
+        Pyramid(np.array([0.0, 2.0, 1.0]), np.zeros(3))
+    with pytest.raises(ValueError, match="equal length"):
+        Pyramid(np.arange(3.0), np.zeros(4))
+    with pytest.raises(ValueError, match="method"):
+        Pyramid(np.arange(3.0), np.zeros(3)).view(method="mean")
+
+
+def test_view_of_a_zoom() -> None:
+    """Test that a zoomed view spans the range and keeps its extremes."""
+    x, y = _series(1_000_000)
+    pyramid = Pyramid(x, y)
+    view_x, view_y = pyramid.view(200_000, 300_000, width=500)
+    inside = y[200_000:300_001]
+
+    assert len(view_x) <= 2 * 500 + 2
+    assert view_x[0] <= 200_000 and view_x[-1] >= 300_000
+    assert view_x[1] > 200_000 - 1 and view_x[-2] < 300_000 + 1
+    assert inside.max() in view_y and inside.min() in view_y
+
+    lttb_x, _ = pyramid.view(200_000, 300_000, width=500, method="lttb")
+    assert len(lttb_x) == 500
+
+
+def test_deep_zoom_returns_raw_points() -> None:
+    """Test that a range narrower than the chart is drawn point by point."""
+    x, y = _series(1_000_000)
+    view_x, view_y = Pyramid(x, y).view(10.5, 20.5, width=500)
+
+    assert view_x.tolist() == list(range(10, 22))
+    assert view_y.tolist() == y[10:22].tolist()
+
+
+def test_typed_array_round_trip() -> None:
+    """Test the plotly.js binary encoding."""
+    values = np.array([1.5, -2.0, 1.7e12])
+    encoded = typed_array(values)
+
+    assert encoded["dtype"] == "f8"
+    assert _decode(encoded).tolist() == values.tolist()
+    assert _decode(typed_array(values[:2], "f4")).tolist() == [1.5, -2.0]
+
+
+@pytest.fixture
+def client():
+    """Client of the paged app, with the analytics page loaded."""
+    app = create_app(pages=True)
+    client = app.server.test_client()
+    assert client.get("/analytics").status_code == 200
+    return client
+
+
+def _history_body(view: dict | None) -> dict:
+    return {
+        "output": "analytics-history.figure",
+        "outputs": {"id": "analytics-history", "property": "figure"},
+        "inputs": [
+            {
+                "id": "analytics-history-view",
+                "property": "data",
+                "value": view,
+            },
+            {"id": "analytics-metric", "property": "value", "value": "visits"},
+        ],
+        "changedPropIds": ["analytics-history-view.data"],
+        "state": [],
+    }
+
+
+def test_history_callback_downsamples_to_the_width(client) -> None:
+    """Test the analytics chart through the callback endpoint."""
+    response = client.post(
+        "/_dash-update-component",
+        json=_history_body(
+            {
+                "dates": ["2024-01-03 00:00", "2024-01-04 12:00:00.5"],
+                "width": 400,
+            }
+        ),
+    )
+    assert response.status_code == 200
+    [trace] = response.json["response"]["analytics-history"]["figure"]["data"]
+    x = _decode(trace["x"])
+
+    assert trace["type"] == "scattergl"
+    assert len(x) <= 2 * 400 + 2
+    start = analytics.HISTORY_START_MS + 2 * 86_400_000
+    assert x[0] <= start < x[1]
+    assert x[-2] < start + 1.5 * 86_400_000 <= x[-1]
+
+
+def test_history_width_is_bounded(client) -> None:
+    """Test that a huge reported width is clamped."""
+    response = client.post(
+        "/_dash-update-component",
+        json=_history_body({"dates": None, "width": 10**9}),
+    )
+    [trace] = response.json["response"]["analytics-history"]["figure"]["data"]
+
+    assert len(_decode(trace["x"])) <= 2 * analytics.MAX_WIDTH + 2
+
+
+@pytest.mark.parametrize(
+    "view",
+    [
+        {"width": "wide"},
+        {"width": None},
+        {"dates": "2024-01-03", "width": 400},
+        {"dates": ["2024-01-03", "soon"], "width": 400},
+        ["not", "a", "view"],
+    ],
+)
+def test_history_ignores_invalid_views(client, view) -> None:
+    """Test views the page's own script never stores."""
+    response = client.post("/_dash-update-component", json=_history_body(view))
+
+    assert response.json["response"] == {}
+
+
+def test_history_ignores_other_view_keys(client) -> None:
+    """Test that only the dates and width of a view are read."""
+    response = client.post(
+        "/_dash-update-component",
+        json=_history_body({"dates": None, "width": 400, "height": 300}),
+    )
+
+    assert "figure" in response.json["response"]["analytics-history"]
+
+
+ZOOMS = 30
+WIDTH = 1200
+
+
+@pytest.mark.slow
+def test_zoom_latency_on_ten_million_points(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Measure callback latency and payload per zoom against raw points."""
+    monkeypatch.setattr(analytics, "HISTORY_POINTS", 10_000_000)
+    monkeypatch.setattr(analytics, "_histories", {})
+    client = create_app(pages=True).server.test_client()
+    client.get("/analytics")
+
+    start = time.perf_counter()
+    pyramid = analytics.history("visits")
+    build = time.perf_counter() - start
+    first, last = pyramid.x[0], pyramid.x[-1]
+
+    def zoom(i: int) -> dict:
+        # Narrower and narrower windows around the middle
+        span = (last - first) / 1.25**i
+        middle = (first + last) / 2
+        dates = [
+            str(np.datetime64(int(bound), "ms"))
+            for bound in (middle - span / 2, middle + span / 2)
+        ]
+        return {"dates": dates, "width": WIDTH}
+
+    results = {}
+    view = Pyramid.view
+    for method in ("minmax", "lttb"):
+        monkeypatch.setattr(Pyramid, "view", _with_method(view, method))
+        latencies, sizes = [], []
+        for i in range(ZOOMS):
+            start = time.perf_counter()
+            response = client.post(
+                "/_dash-update-component", json=_history_body(zoom(i))
+            )
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200
+            sizes.append(len(response.data))
+        results[method] = latencies, sizes
+
+    # What the callback would send without downsampling: every point
+    start = time.perf_counter()
+    raw = json.dumps(
+        {"x": pyramid.x.tolist(), "y": pyramid.y.astype(np.float32).tolist()}
+    )
+    raw_seconds = time.perf_counter() - start
+
+    print(f"\n10M points: levels built in {build:.2f} s")
+    for method, (latencies, sizes) in results.items():
+        print(
+            f"{method}: p50 {percentile(latencies, 50) * 1e3:.1f} ms, "
+            f"p95 {percentile(latencies, 95) * 1e3:.1f} ms per zoom, "
+            f"{max(sizes) / 1024:.0f} KiB at most"
+        )
+    print(
+        f"raw points: {len(raw) / 2**20:.0f} MiB of JSON, "
+        f"{raw_seconds:.1f} s to serialize"
+    )
+
+    minmax_latencies, minmax_sizes = results["minmax"]
+    assert percentile(minmax_latencies, 95) < 0.1
+    assert max(minmax_sizes) < 100 * 1024
+    assert max(minmax_sizes) * 1000 < len(raw)
+
+
+def _with_method(view, method: str):
+    """``Pyramid.view`` with the downsampling method fixed."""
+
+    def fixed(self, *args, **kwargs):
+        kwargs["method"] = method
+        return view(self, *args, **kwargs)
+
+    return fixed